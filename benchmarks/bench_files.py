@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+"""Benchmarks for project files rewriting pipeline
+
+Generates synthetic projects (many files, different sizes, encodings, match types
+and search patterns) and measures `update_project_files` and
+`save_version_and_update_files`: latency, throughput and peak memory.
+Results are saved as JSON, and can be compared with results from other commits:
+
+    python benchmarks/bench_files.py --preset quick --output before.json
+    python benchmarks/bench_files.py --preset quick --output after.json --compare before.json
+"""
+
+import argparse
+from collections import namedtuple
+import itertools
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+
+# pylint: disable=wrong-import-position
+from versionner import config
+from versionner import version
+from versionner.commands import files_management
+
+Scenario = namedtuple('Scenario', ['files', 'size', 'match', 'encoding', 'pattern'])
+
+# search/replace rules, for match types: line and file
+PATTERNS = {
+    'anchored': {
+        'line': (r'^__version__ = .*$', "__version__ = '%(version)s'"),
+        'file': (r'(?m)^__version__ = .*$', "__version__ = '%(version)s'"),
+    },
+    'unanchored': {
+        'line': (r'\bversion\s*=\s*\S+', "version = '%(version)s'"),
+        'file': (r'\bversion\s*=\s*\S+', "version = '%(version)s'"),
+    },
+    'multiline': {
+        'line': (r'^\d+\.\d+\.\d+\S*$', '%(version)s'),
+        'file': (r'\nCurrent stable version\n-+\n\s+[\w.-]+\n', '\nCurrent stable version\n---\n\n%(version)s\n'),
+    },
+}
+VERSION_LINES = {
+    'anchored': "__version__ = '0.1.0'\n",
+    'unanchored': "setup(name='x', version = '0.1.0', author='y')\n",
+    'multiline': "\nCurrent stable version\n---\n\n0.1.0\n",
+}
+FILLER_LINE = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit ząb 123 = 456\n'
+
+PRESETS = {
+    'quick': {
+        'files': [1, 100],
+        'sizes': ['1KB', '100KB'],
+        'matches': ['line', 'file'],
+        'encodings': ['utf-8'],
+        'patterns': ['anchored', 'unanchored'],
+    },
+    'default': {
+        'files': [1, 10, 100, 1000],
+        'sizes': ['1KB', '100KB', '1MB'],
+        'matches': ['line', 'file'],
+        'encodings': ['utf-8', 'utf-16', 'latin-1'],
+        'patterns': ['anchored', 'unanchored', 'multiline'],
+    },
+    'full': {
+        'files': [1, 10, 100, 1000, 10000],
+        'sizes': ['1KB', '100KB', '10MB', '500MB'],
+        'matches': ['line', 'file'],
+        'encodings': ['utf-8', 'utf-16', 'latin-1'],
+        'patterns': ['anchored', 'unanchored', 'multiline'],
+    },
+}
+
+# limit of data generated for single scenario, bigger scenarios are skipped
+MAX_TOTAL_SIZE = 2 * 1024 ** 3
+
+
+def parse_size(size):
+    """Parse size like 1KB, 10MB into number of bytes
+
+    :param size:str
+    :return:int
+    """
+    units = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'B': 1}
+    for unit, multiplier in units.items():
+        if size.upper().endswith(unit):
+            return int(float(size[:-len(unit)]) * multiplier)
+
+    return int(size)
+
+
+def generate_project(root, scenario):
+    """Generate synthetic project files and configuration for them
+
+    :param root: pathlib.Path: directory for project
+    :param scenario: Scenario
+    :return: Config
+    """
+    size = parse_size(scenario.size)
+    version_line = VERSION_LINES[scenario.pattern]
+    filler_count = max(0, (size - len(version_line)) // len(FILLER_LINE))
+    head = FILLER_LINE * (filler_count // 2)
+    tail = FILLER_LINE * (filler_count - filler_count // 2)
+
+    (search, replace) = PATTERNS[scenario.pattern][scenario.match]
+    cfg = config.Config()
+    cfg.version_file = root / 'VERSION'
+    version.VersionFile(cfg.version_file).write(version.Version('0.1.0'))
+
+    for i in range(scenario.files):
+        path = root / ('file_%05d.txt' % i)
+        with path.open('w', encoding=scenario.encoding) as fh:
+            fh.write(head)
+            fh.write(version_line)
+            fh.write(tail)
+
+        cfg.files.append(config.FileConfig.from_dict({
+            'filename': str(path),
+            'enabled': True,
+            'search': search,
+            'replace': replace,
+            'date_format': None,
+            'match': scenario.match,
+            'search_flags': 0,
+            'encoding': scenario.encoding,
+        }))
+
+    return cfg
+
+
+def measure(func, repeat):
+    """Call func `repeat` times, and once more with tracemalloc enabled
+
+    :param func: callable
+    :param repeat: int
+    :return: (list of times, peak memory in bytes, last result)
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        (_, peak) = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return times, peak, result
+
+
+def run_scenario(scenario, repeat):
+    """Run benchmarks for single scenario
+
+    :param scenario: Scenario
+    :param repeat: int
+    :return: dict
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = pathlib.Path(tmp_dir)
+        cfg = generate_project(root, scenario)
+        total_bytes = sum(project_file.file.stat().st_size for project_file in cfg.files)
+        version_file = version.VersionFile(cfg.version_file)
+        versions = itertools.cycle([version.Version('1.2.3'), version.Version('1.2.4')])
+
+        result = {'scenario': scenario._asdict(), 'bytes': total_bytes, 'benchmarks': {}}
+        benchmarks = {
+            'update_project_files': lambda: files_management.update_project_files(cfg, next(versions)),
+            'save_version_and_update_files': lambda: files_management.save_version_and_update_files(
+                cfg, version_file, next(versions)),
+        }
+        for name, func in benchmarks.items():
+            (times, peak, counters) = measure(func, repeat)
+            # every generated file contains version, scenario which doesn't change them measures nothing
+            if counters['files'] != scenario.files:
+                raise SystemExit('%s, %s: changed %d of %d files, search pattern doesn\'t match generated files' % (
+                    scenario_id(scenario), name, counters['files'], scenario.files))
+
+            median = statistics.median(times)
+            result['benchmarks'][name] = {
+                'times': times,
+                'min': min(times),
+                'median': median,
+                'files_per_second': scenario.files / median if median else None,
+                'bytes_per_second': total_bytes / median if median else None,
+                'peak_memory': peak,
+                'changes': counters['changes'],
+            }
+
+    return result
+
+
+def scenario_id(scenario):
+    """Build readable identifier of scenario
+
+    :param scenario: Scenario or dict
+    :return: str
+    """
+    if isinstance(scenario, dict):
+        scenario = Scenario(**scenario)
+    return '%(files)s files x %(size)s, match=%(match)s, %(encoding)s, %(pattern)s' % scenario._asdict()
+
+
+def git_revision():
+    """Return current git revision of versionner, if available
+
+    :return: str|None
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=str(pathlib.Path(__file__).absolute().parent)).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print comparison of results with baseline
+
+    :param results: dict
+    :param baseline: dict
+    """
+    old = {scenario_id(item['scenario']): item for item in baseline['results']}
+    print('\nComparison with %s:' % (baseline['meta'].get('revision') or 'baseline'))
+    for item in results['results']:
+        ident = scenario_id(item['scenario'])
+        if ident not in old:
+            continue
+        for name, bench in item['benchmarks'].items():
+            old_bench = old[ident]['benchmarks'].get(name)
+            if not old_bench or not old_bench['median']:
+                continue
+            print('  %-70s %-30s median x%.2f, peak memory x%.2f' % (
+                ident, name,
+                bench['median'] / old_bench['median'],
+                bench['peak_memory'] / old_bench['peak_memory'] if old_bench['peak_memory'] else 0))
+
+
+def parse_args(argv):
+    """Parse input arguments of script
+
+    :param argv: list
+    :return: argparse.Namespace
+    """
+    p = argparse.ArgumentParser(description='Benchmark rewriting of project files')
+    p.add_argument('--preset', choices=sorted(PRESETS), default='quick',
+        help="Set of scenarios to run (default: quick)")
+    p.add_argument('--files', type=int, nargs='+', help="Numbers of files (overrides preset)")
+    p.add_argument('--sizes', nargs='+', help="Sizes of files, ie. 1KB 10MB (overrides preset)")
+    p.add_argument('--matches', nargs='+', choices=['line', 'file'], help="Match types (overrides preset)")
+    p.add_argument('--encodings', nargs='+', help="Encodings of files (overrides preset)")
+    p.add_argument('--patterns', nargs='+', choices=sorted(PATTERNS), help="Search patterns (overrides preset)")
+    p.add_argument('--repeat', type=int, default=3, help="Number of measured runs per scenario (default: 3)")
+    p.add_argument('--output', '-o', type=str, help="Save results as JSON to this file")
+    p.add_argument('--compare', type=str, help="Compare results with JSON saved earlier")
+
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    """Main script
+
+    :return: exit code (for shell)
+    :rtype: int
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    preset = PRESETS[args.preset]
+
+    scenarios = [Scenario(*params) for params in itertools.product(
+        args.files or preset['files'],
+        args.sizes or preset['sizes'],
+        args.matches or preset['matches'],
+        args.encodings or preset['encodings'],
+        args.patterns or preset['patterns'],
+    )]
+
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': args.repeat,
+        },
+        'results': [],
+    }
+
+    for scenario in scenarios:
+        if scenario.files * parse_size(scenario.size) > MAX_TOTAL_SIZE:
+            print('%-70s skipped (more than %d bytes)' % (scenario_id(scenario), MAX_TOTAL_SIZE), file=sys.stderr)
+            continue
+
+        result = run_scenario(scenario, args.repeat)
+        results['results'].append(result)
+        for name, bench in result['benchmarks'].items():
+            print('%-70s %-30s median %9.4fs  %10.1f MB/s  peak %8.1f MB' % (
+                scenario_id(scenario), name, bench['median'],
+                (bench['bytes_per_second'] or 0) / 1024 ** 2, bench['peak_memory'] / 1024 ** 2), flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(results, json.load(fh))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+"""Startup and import-time benchmark for `ver` commands
+
+For every measured command starts fresh interpreter many times and measures:
+
+* cold startup: without any bytecode cache (PYTHONPYCACHEPREFIX points to empty directory)
+* warm startup: with bytecode cache already populated
+(best of all runs is taken, as the least affected by noise)
+* overhead: warm startup minus startup of bare interpreter (`python -c pass`), what makes
+  results comparable between machines
+
+Import costs are attributed to modules using `python -X importtime`.
+
+Results are compared with stored baseline, and script exits with code 1 if overhead of any
+command exceeds baseline by more than tolerance:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --update-baseline
+
+With `--zipapp` startup of commands is compared between distributions (always with bytecode of
+standard library cached): zipapp (see `tools/build_zipapp.py`), `ver` entry point installed with
+pip (or `python -m versionner` with cached bytecode, if it's not installed), and sources without
+bytecode (like first run after installation without compiling, or with bytecode disabled):
+
+    python benchmarks/bench_startup.py --zipapp dist/ver.pyz
+"""
+
+import argparse
+from collections import defaultdict
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).absolute().parent.parent
+BASELINE_FILE = pathlib.Path(__file__).absolute().parent / 'startup_baseline.json'
+
+# name: (arguments for ver, data for stdin)
+COMMANDS = {
+    'read': (['read'], None),
+    'read-full': (['--verbose', 'read'], None),
+    'up': (['up', '--patch'], None),
+    'set': (['set', '--build', 'bench'], None),
+    'batch': (['batch'], b'{"command": "up", "part": "patch"}\n'),
+}
+# modules reported always, even if they are not in top
+WATCHED_MODULES = ('argparse', 'semver', 'distutils', 'subprocess', 'tempfile', 'shutil', 'configparser',
+    'json', 'versionner')
+
+
+def _run(argv, cwd, env, stdin=None):
+    """Run process and return time of execution
+
+    :return: (seconds, stderr)
+    """
+    start = time.perf_counter()
+    process = subprocess.run(argv, cwd=cwd, env=env, input=stdin,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    return time.perf_counter() - start, process.stderr.decode()
+
+
+def _env(pycache_prefix):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONPYCACHEPREFIX=pycache_prefix)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def prepare_project(directory):
+    """Create project for benchmarks: version file, config with single project file
+
+    :param directory: pathlib.Path
+    """
+    (directory / 'VERSION').write_text('1.2.3')
+    (directory / 'README').write_text('version: 1.2.3\n')
+    (directory / '.versionner.rc').write_text(
+        '[file:README]\nsearch = ^version: .*$\nreplace = version: %(version)s\n')
+
+
+def measure_command(argv, stdin, cwd, repeat):
+    """Measure cold and warm startup of single command
+
+    :return: dict
+    """
+    cold = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as prefix:
+            cold.append(_run(argv, cwd, _env(prefix), stdin)[0])
+
+    with tempfile.TemporaryDirectory() as prefix:
+        env = _env(prefix)
+        _run(argv, cwd, env, stdin)
+        warm = [_run(argv, cwd, env, stdin)[0] for _ in range(repeat)]
+
+    return {'cold': min(cold), 'warm': min(warm)}
+
+
+def measure_imports(argv, stdin, cwd):
+    """Measure import time of modules using -X importtime
+
+    :return: dict: top-level module name -> self time in microseconds
+    """
+    with tempfile.TemporaryDirectory() as prefix:
+        env = _env(prefix)
+        cmd = [sys.executable, '-X', 'importtime'] + argv
+        _run(cmd, cwd, env, stdin)
+        (_, stderr) = _run(cmd, cwd, env, stdin)
+
+    return parse_importtime(stderr)
+
+
+def parse_importtime(output):
+    """Parse output of -X importtime, and sum self times per top-level package
+
+    :param output: str
+    :return: dict
+    """
+    modules = defaultdict(int)
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        (self_time, _, name) = line[len('import time:'):].split('|')
+        modules[name.strip().split('.')[0]] += int(self_time)
+
+    return dict(modules)
+
+
+def distributions(zipapp, directory):
+    """Commands starting versionner from compared distributions
+
+    :param zipapp: path to zipapp
+    :param directory: pathlib.Path: directory for copy of sources
+    :return: dict: name -> (argv, environment)
+    """
+    # separate copies, bytecode written by one distribution can't be used by the other one
+    sources = {}
+    for name in ('cached', 'nocache'):
+        sources[name] = directory / ('sources-%s' % name)
+        shutil.copytree(str(ROOT / 'versionner'), str(sources[name] / 'versionner'),
+            ignore=shutil.ignore_patterns('__pycache__'))
+
+    env = {name: value for (name, value) in os.environ.items()
+        if name not in ('PYTHONPATH', 'PYTHONPYCACHEPREFIX', 'PYTHONDONTWRITEBYTECODE')}
+    module = [sys.executable, '-m', 'versionner']
+
+    installed = shutil.which('ver')
+    return {
+        'zipapp': ([sys.executable, str(zipapp)], env),
+        'entry point': ([installed], env) if installed else (module, dict(env, PYTHONPATH=str(sources['cached']))),
+        'no bytecode': (module, dict(env, PYTHONPATH=str(sources['nocache']), PYTHONDONTWRITEBYTECODE='1')),
+    }
+
+
+def measure_distributions(zipapp, directory, cwd, repeat):
+    """Measure startup of all commands for every distribution (best of runs, after one warm up run)
+
+    :return: dict: command name -> distribution name -> seconds
+    """
+    results = {}
+    for (dist_name, (argv, env)) in distributions(zipapp, directory).items():
+        for name, (args, stdin) in COMMANDS.items():
+            _run(argv + args, cwd, env, stdin)
+            best = min(_run(argv + args, cwd, env, stdin)[0] for _ in range(repeat))
+            results.setdefault(name, {})[dist_name] = best
+
+    return results
+
+
+def run(repeat, zipapp=None):
+    """Run all benchmarks
+
+    :param repeat:int: number of runs per command
+    :param zipapp: path to zipapp, to compare its startup with other distributions
+    :return: dict
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cwd = pathlib.Path(tmp_dir) / 'project'
+        cwd.mkdir()
+        prepare_project(cwd)
+        os.environ['VERSIONNER_CACHE_DIR'] = str(pathlib.Path(tmp_dir) / 'cache')
+
+        bare = measure_command([sys.executable, '-c', 'pass'], None, str(cwd), repeat)
+        results = {'bare': bare, 'commands': {}}
+
+        for name, (args, stdin) in COMMANDS.items():
+            argv = [sys.executable, '-m', 'versionner'] + args
+            startup = measure_command(argv, stdin, str(cwd), repeat)
+            startup['overhead'] = max(0.0, startup['warm'] - bare['warm'])
+            startup['imports'] = measure_imports(['-m', 'versionner'] + args, stdin, str(cwd))
+            results['commands'][name] = startup
+
+        if zipapp:
+            results['distributions'] = measure_distributions(zipapp, pathlib.Path(tmp_dir), str(cwd), repeat)
+
+    return results
+
+
+def check(results, baseline, tolerance):
+    """Compare results with baseline
+
+    :return: list of error messages
+    """
+    errors = []
+    for name, startup in results['commands'].items():
+        expected = baseline.get('commands', {}).get(name)
+        if not expected:
+            continue
+
+        limit = expected['overhead'] * (1 + tolerance)
+        if startup['overhead'] > limit:
+            errors.append('%s: overhead %.1fms exceeds baseline %.1fms (limit %.1fms)' % (
+                name, startup['overhead'] * 1000, expected['overhead'] * 1000, limit * 1000))
+
+        for module in WATCHED_MODULES:
+            if module in startup['imports'] and module not in expected.get('imports', {}):
+                errors.append('%s: module %s is imported, but it was not in baseline' % (name, module))
+
+    return errors
+
+
+def report(results, top):
+    """Print results"""
+    print('bare interpreter: cold %6.1fms, warm %6.1fms' % (results['bare']['cold'] * 1000, results['bare']['warm'] * 1000))
+    for name, startup in results['commands'].items():
+        print('%-10s cold %6.1fms, warm %6.1fms, overhead %6.1fms' % (
+            name, startup['cold'] * 1000, startup['warm'] * 1000, startup['overhead'] * 1000))
+
+        imports = sorted(startup['imports'].items(), key=lambda item: -item[1])
+        shown = imports[:top]
+        shown += [item for item in imports[top:] if item[0] in WATCHED_MODULES]
+        for module, self_time in shown:
+            print('    %-20s %8.2fms' % (module, self_time / 1000))
+
+    for name, startup in results.get('distributions', {}).items():
+        print('%-10s %s' % (name, ', '.join('%s %6.1fms' % (dist_name, seconds * 1000)
+            for (dist_name, seconds) in startup.items())))
+
+
+def main(argv=None):
+    """Main script
+
+    :return: exit code (for shell)
+    :rtype: int
+    """
+    p = argparse.ArgumentParser(description='Benchmark startup time of ver commands')
+    p.add_argument('--repeat', type=int, default=10, help="Number of runs per command (default: 10)")
+    p.add_argument('--tolerance', type=float, default=1.0,
+        help="Allowed relative increase of overhead over baseline (default: 1.0)")
+    p.add_argument('--baseline', type=str, default=str(BASELINE_FILE), help="Path to baseline file")
+    p.add_argument('--update-baseline', action='store_true', help="Save results as new baseline")
+    p.add_argument('--output', '-o', type=str, help="Save results as JSON to this file")
+    p.add_argument('--top', type=int, default=8, help="Number of most expensive modules to show")
+    p.add_argument('--zipapp', type=str, help="Compare startup of zipapp with entry point and sources without bytecode")
+    args = p.parse_args(sys.argv[1:] if argv is None else argv)
+
+    results = run(args.repeat, args.zipapp and pathlib.Path(args.zipapp).absolute())
+    report(results, args.top)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.update_baseline:
+        results.pop('distributions', None)
+        for startup in results['commands'].values():
+            startup['imports'] = {module: self_time for (module, self_time) in startup['imports'].items()
+                if module in WATCHED_MODULES}
+        with open(args.baseline, 'w') as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+        return 0
+
+    try:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+    except FileNotFoundError:
+        print('No baseline found in %s, use --update-baseline to create one' % args.baseline, file=sys.stderr)
+        return 0
+
+    errors = check(results, baseline, args.tolerance)
+    for error in errors:
+        print('REGRESSION: %s' % error, file=sys.stderr)
+
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+import pytest
+
+from versionner import cache
+
+
+@pytest.fixture(autouse=True, scope='session')
+def cache_dir():
+    """Keep persistent cache of versionner outside of user's home directory"""
+    with tempfile.TemporaryDirectory() as dir:
+        old = os.environ.get(cache.ENV_VERSIONNER_CACHE_DIR)
+        os.environ[cache.ENV_VERSIONNER_CACHE_DIR] = dir
+        yield dir
+        if old is None:
+            del os.environ[cache.ENV_VERSIONNER_CACHE_DIR]
+        else:
+            os.environ[cache.ENV_VERSIONNER_CACHE_DIR] = old
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from versionner import api
+from versionner.errors import ConfigError
+from versionner.version import InvalidVersionError, Version
+
+from test.streamcatcher import catch_streams
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.2.3')
+    Path('README').write_text('version: 1.2.3\n')
+    Path('.versionner.rc').write_text(
+        '[versionner]\nup_part = patch\n\n'
+        '[file:README]\nsearch = ^version: .*$\nreplace = version: %(version)s\n'
+    )
+
+    return dir
+
+
+class TestApi:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+        self.root = Path(self.dir.name)
+        with catch_streams():
+            self.cfg = api.load_config()
+
+    def test_read(self):
+        result = api.read(self.cfg)
+
+        assert isinstance(result.current_version, Version)
+        assert result.current_version == '1.2.3'
+
+    def test_bump(self):
+        result = api.bump(cfg=self.cfg)
+
+        assert result.current_version == '1.2.4'
+        assert (result.modifications, result.modified_files) == (1, 1)
+        assert (self.root / 'README').read_text() == 'version: 1.2.4\n'
+
+        result = api.bump('major', 2, cfg=self.cfg)
+        assert result.current_version == '3.0.0'
+        assert (self.root / 'VERSION').read_text() == '3.0.0'
+
+    def test_bump_invalid_part(self):
+        with pytest.raises(ValueError):
+            api.bump('prerelease', cfg=self.cfg)
+
+    def test_set(self):
+        assert api.set('2.0.0-rc1', cfg=self.cfg).current_version == '2.0.0-rc1'
+        assert api.set(prerelease='rc2', build='b1', cfg=self.cfg).current_version == '2.0.0-rc2+b1'
+        assert api.set(Version('3.0.0'), cfg=self.cfg).current_version == '3.0.0'
+        assert (self.root / 'README').read_text() == 'version: 3.0.0\n'
+
+    def test_set_invalid(self):
+        with pytest.raises(InvalidVersionError):
+            api.set('1.a.3', cfg=self.cfg)
+
+        with pytest.raises(ValueError):
+            api.set(cfg=self.cfg)
+
+    def test_config_is_not_modified(self):
+        api.bump('major', cfg=self.cfg)
+        api.set('5.0.0', cfg=self.cfg)
+
+        assert self.cfg.command is None
+        assert self.cfg.value is None
+        assert self.cfg.up_part == 'patch'
+
+    def test_missing_version_file(self):
+        (self.root / 'VERSION').unlink()
+
+        with pytest.raises(ConfigError):
+            api.read(self.cfg)
+
+
+if __name__ == '__main__':
+    pytest.main()
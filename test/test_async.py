@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+import asyncio
+import os
+from pathlib import Path
+import subprocess
+import tempfile
+
+import pytest
+
+from versionner import api
+from versionner import commands
+from versionner import discovery
+from versionner import hooks
+
+from test.streamcatcher import catch_streams
+
+
+def git(cwd, *args):
+    return subprocess.check_output(('git', '-C', str(cwd)) + args).decode()
+
+
+def bootstrap_project(root):
+    root.mkdir()
+    (root / 'VERSION').write_text('1.2.3')
+    (root / 'README').write_text('version: 1.2.3\n')
+    # absolute paths, so projects can be bumped from any working directory
+    (root / '.versionner.rc').write_text(
+        '[versionner]\nfile = %s\nup_part = patch\n\n'
+        '[file:%s]\nsearch = ^version: .*$\nreplace = version: %%(version)s\n' % (root / 'VERSION', root / 'README')
+    )
+
+    git(root, 'init', '-q')
+    git(root, 'config', 'user.email', 'test@example.com')
+    git(root, 'config', 'user.name', 'Test')
+    git(root, 'add', '-A')
+    git(root, 'commit', '-q', '-m', 'initial')
+
+    os.chdir(str(root))
+    discovery.clear_cache()
+    with catch_streams():
+        return api.load_config()
+
+
+class TestAsync:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name)
+
+        yield
+
+        hooks.clear()
+
+    def test_bump_many_projects(self):
+        roots = [self.root / ('project%d' % idx) for idx in range(5)]
+        configs = [bootstrap_project(root) for root in roots]
+        os.chdir(self.dir.name)
+
+        async def bump_all():
+            return await asyncio.gather(*(api.bump_async(cfg=cfg, commit=True) for cfg in configs))
+
+        results = asyncio.run(bump_all())
+
+        assert [str(result.current_version) for result in results] == ['1.2.4'] * 5
+        for root in roots:
+            assert (root / 'VERSION').read_text() == '1.2.4'
+            assert (root / 'README').read_text() == 'version: 1.2.4\n'
+            assert git(root, 'log', '-1', '--format=%s').strip() == '1.2.4'
+            assert git(root, 'status', '--porcelain') == ''
+
+    def test_bumps_of_the_same_file_are_serialized(self):
+        cfg = bootstrap_project(self.root / 'project')
+
+        async def bump_all():
+            return await asyncio.gather(*(api.bump_async(cfg=cfg) for _ in range(10)))
+
+        results = asyncio.run(bump_all())
+
+        assert sorted(result.current_version.patch for result in results) == list(range(4, 14))
+        assert (self.root / 'project' / 'VERSION').read_text() == '1.2.13'
+        assert (self.root / 'project' / 'README').read_text() == 'version: 1.2.13\n'
+
+    def test_set_read_tag(self):
+        cfg = bootstrap_project(self.root / 'project')
+
+        async def run():
+            await api.set_async('2.0.0-rc1', cfg=cfg)
+            await api.set_async(prerelease='rc2', cfg=cfg)
+            await api.tag_async(cfg=cfg)
+            return await api.read_async(cfg)
+
+        assert asyncio.run(run()).current_version == '2.0.0-rc2'
+        assert git(self.root / 'project', 'tag', '--list').split() == ['2.0.0-rc2']
+        assert (self.root / 'project' / 'README').read_text() == 'version: 2.0.0-rc2\n'
+
+    def test_command_hooks(self):
+        cfg = bootstrap_project(self.root / 'project')
+        events = []
+        for event in hooks.EVENTS:
+            hooks.register(event, lambda event, **_: events.append(event))
+
+        result = asyncio.run(api.bump_async(cfg=cfg, commit=True))
+
+        assert result.current_version == '1.2.4'
+        assert events == [
+            'pre_command',
+            'pre_vcs', 'post_vcs',
+            'pre_file_rewrite', 'post_file_rewrite',
+            'pre_vcs', 'post_vcs',
+            'pre_vcs', 'post_vcs',
+            'post_command',
+        ]
+
+    def test_tag_command(self):
+        cfg = bootstrap_project(self.root / 'project')
+        cfg.command = 'tag'
+
+        with catch_streams() as streams:
+            asyncio.run(commands.get('tag', cfg).execute_async())
+            asyncio.run(commands.get('tag', cfg).execute_async())
+
+        assert streams.out.getvalue() == 'Git tag created\nGit tag failed, do it yourself\n'
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+from io import StringIO
+import json
+import os
+from pathlib import Path
+import tempfile
+
+import subprocess
+
+import pytest
+
+from versionner.cli import execute
+
+from test.streamcatcher import catch_streams
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('README').write_text('version: 1.2.3\n')
+    Path('.versionner.rc').write_text('[file:README]\nsearch = ^version: .*$\nreplace = version: %(version)s\n')
+    with catch_streams():
+        execute('ver', ['init', '1.2.3'])
+
+    return dir
+
+
+class TestBatch:
+    @pytest.fixture(autouse=True)
+    def set_env(self, monkeypatch):
+        self.dir = bootstrap_env()
+        self.root = Path(self.dir.name)
+        self.monkeypatch = monkeypatch
+
+    def run(self, *operations, args=()):
+        self.monkeypatch.setattr('sys.stdin', StringIO('\n'.join(json.dumps(op) for op in operations)))
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['batch'] + list(args))
+
+        return ret_code, [json.loads(line) for line in streams.out.getvalue().splitlines()], streams.err.getvalue()
+
+    def test_operations(self):
+        (ret_code, report, _) = self.run(
+            {'command': 'set', 'prerelease': 'rc1'},
+            {'command': 'set', 'build': 'b7'},
+            {'command': 'up', 'part': 'patch', 'value': 2},
+        )
+
+        assert ret_code == 0
+        assert [step['current_version'] for step in report] == ['1.2.3-rc1', '1.2.3-rc1+b7', '1.2.5-rc1+b7', '1.2.5-rc1+b7']
+        assert report[-1]['modifications'] == 1
+        assert (self.root / 'VERSION').read_text() == '1.2.5-rc1+b7'
+        assert (self.root / 'README').read_text() == 'version: 1.2.5-rc1+b7\n'
+
+    def test_set_value(self):
+        (ret_code, report, _) = self.run({'command': 'set', 'value': '2.0.0'}, {'command': 'up'})
+
+        assert ret_code == 0
+        assert report[-1]['current_version'] == '2.1.0'
+        assert (self.root / 'VERSION').read_text() == '2.1.0'
+
+    def test_failed_step(self):
+        (ret_code, report, err) = self.run(
+            {'command': 'up', 'part': 'patch'},
+            {'command': 'set', 'value': '1.a.3'},
+            {'command': 'up'},
+        )
+
+        assert ret_code == 2
+        assert report[-1] == {
+            'step': 2, 'command': 'set', 'ok': False, 'error': 'InvalidVersionError',
+            'message': 'Cannot parse version string: 1.a.3',
+        }
+        assert 'BatchError: Step 2 failed' in err
+        assert (self.root / 'VERSION').read_text() == '1.2.3'
+        assert (self.root / 'README').read_text() == 'version: 1.2.3\n'
+
+    @pytest.mark.parametrize('operation,message', [
+        ({'command': 'set', 'major': 'x'}, 'Field major must be int, not str'),
+        ({'command': 'set', 'prerelease': 1}, 'Field prerelease must be str, not int'),
+        ({'command': 'set', 'value': 2}, 'Field value must be str, not int'),
+        ({'command': 'up', 'value': 'a'}, 'Field value must be int, not str'),
+        ({'command': 'up', 'value': True}, 'Field value must be int, not bool'),
+    ])
+    def test_invalid_field_type(self, operation, message):
+        (ret_code, report, err) = self.run(operation)
+
+        assert ret_code == 2
+        assert report == [{
+            'step': 1, 'command': operation['command'], 'ok': False, 'error': 'BatchError', 'message': message,
+        }]
+        assert 'BatchError: Step 1 failed' in err
+        assert (self.root / 'VERSION').read_text() == '1.2.3'
+
+    def test_commit_failure(self):
+        for args in (['init', '-q'], ['add', '-A'], ['-c', 'user.name=Test', '-c', 'user.email=test@example.com',
+                'commit', '-q', '-m', 'initial']):
+            subprocess.check_call(['git'] + args)
+        # uncommitted changes
+        (self.root / 'README').write_text('version: 1.2.3\nchanged\n')
+
+        (ret_code, report, err) = self.run({'command': 'up'}, args=['--commit'])
+
+        assert ret_code == 2
+        assert (report[-1]['ok'], report[-1]['error']) == (False, 'VCSStateError')
+        assert 'BatchError: Saving version 1.3.0 failed' in err
+        assert (self.root / 'VERSION').read_text() == '1.2.3'
+
+    def test_invalid_json(self):
+        self.monkeypatch.setattr('sys.stdin', StringIO('{"command": "up"}\nnot json\n'))
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['batch'])
+
+        assert ret_code == 2
+        assert 'Invalid operation in step 2' in streams.err.getvalue()
+        assert (self.root / 'VERSION').read_text() == '1.2.3'
+
+    def test_no_changes(self):
+        (ret_code, report, _) = self.run()
+
+        assert ret_code == 0
+        assert report == [{
+            'ok': True, 'current_version': '1.2.3', 'modifications': 0, 'modified_files': 0, 'committed': False,
+        }]
+
+
+if __name__ == '__main__':
+    pytest.main()
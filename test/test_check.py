@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from versionner import discovery
+from versionner.cli import execute
+from versionner.commands.check import required_literal
+
+from test.streamcatcher import catch_streams
+
+RC = """
+[file:README]
+search = ^version: .*$
+replace = version: %(version)s
+
+[file:2:README]
+search = ^released: .*$
+replace = released: %(date)s
+
+[file:setup.py]
+search = version='.*'
+replace = version='%(version)s'
+match = file
+
+[file:package.json]
+search = "version": ".*"
+replace = "version": "%(version)s"
+encoding = utf-16
+"""
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.2.3')
+    Path('README').write_bytes(b'intro\r\nversion: 1.2.3\r\nreleased: 2020-01-01\r\n')
+    Path('setup.py').write_text("setup(\n    name='x',\n    version='1.2.3',\n)\n")
+    Path('package.json').write_text('{"version": "1.2.3"}\n', encoding='utf-16')
+    Path('.versionner.rc').write_text(RC)
+
+    discovery.clear_cache()
+
+    return dir
+
+
+class TestCheck:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+
+    def test_consistent(self):
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['check'])
+
+        assert ret_code == 0
+        assert streams.out.getvalue() == 'All 4 project files are consistent\n'
+
+    def test_inconsistent(self):
+        Path('setup.py').write_text("setup(\n    name='x',\n    version='1.2.2',\n)\n")
+        Path('package.json').write_text('{"name": "x"}\n', encoding='utf-16')
+        before = {path: Path(path).read_bytes() for path in ('VERSION', 'README', 'setup.py', 'package.json')}
+
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['check'])
+
+        assert ret_code == 1
+        assert streams.out.getvalue() == \
+            'setup.py:3: found "version=\'1.2.2\'", expected "version=\'1.2.3\'"\n' \
+            'package.json: version string not found\n'
+        assert 'ConsistencyError: 2 of 4 project files are inconsistent' in streams.err.getvalue()
+        assert before == {path: Path(path).read_bytes() for path in before}
+
+    def test_after_up(self):
+        with catch_streams():
+            execute('ver', ['up'])
+            ret_code = execute('ver', ['check'])
+
+        assert ret_code == 0
+
+    @pytest.mark.parametrize('pattern,literal', [
+        (r'^version: .*$', 'version: '),
+        (r'\bversion\s*=\s*\S+', 'version'),
+        (r'(?m)^__version__ = .*$', '__version__ = '),
+        (r'ab?cdef', 'cdef'),
+        (r'x{2}yz', 'yz'),
+        (r'(version)?: [0-9]+', ': '),
+        (r'a\.b[cd]', 'a.b'),
+        (r'version|release', None),
+        (r'(?i)version', None),
+        (r'.*', None),
+    ])
+    def test_required_literal(self, pattern, literal):
+        assert required_literal(pattern) == literal
+
+
+if __name__ == '__main__':
+    pytest.main()
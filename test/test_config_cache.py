@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from versionner import config
+
+from test.streamcatcher import catch_streams
+
+RC = """
+[versionner]
+file = ./VERSION.txt
+up_part = patch
+
+[file:README]
+search = version \\d+
+replace = version %(major)s
+search_flags = IGNORECASE, MULTILINE
+
+[file:MISSING]
+search = x
+replace = y
+"""
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('README').write_text('version 1\n')
+    Path('.versionner.rc').write_text(RC)
+
+    return dir
+
+
+class TestConfigCache:
+    @pytest.fixture(autouse=True)
+    def set_env(self, monkeypatch):
+        self.dir = bootstrap_env()
+        self.files = [Path(self.dir.name).absolute() / '.versionner.rc']
+        self.parsed = 0
+
+        parse = config.Config._parse_config_file
+
+        def counting_parse(cfg, files):
+            self.parsed += 1
+            return parse(cfg, files)
+
+        monkeypatch.setattr(config.Config, '_parse_config_file', counting_parse)
+
+    def test_cached(self):
+        with catch_streams() as streams:
+            cfg1 = config.load(self.files)
+            cfg2 = config.load(self.files)
+
+        assert self.parsed == 1
+        assert cfg1.to_dict() == cfg2.to_dict()
+        assert cfg2.up_part == 'patch'
+        assert cfg2.version_file == './VERSION.txt'
+        assert [project_file.filename for project_file in cfg2.files] == ['README']
+        assert cfg2.files[0].file == Path('README')
+        assert cfg2.files[0].search_flags == cfg1.files[0].search_flags != 0
+        assert streams.err.getvalue().count('Incorrect configuration for file "MISSING"') == 2
+
+    def test_created_project_file(self):
+        with catch_streams() as streams:
+            config.load(self.files)
+            Path(self.dir.name, 'MISSING').write_text('version\n')
+            cfg = config.load(self.files)
+
+        assert self.parsed == 1
+        assert 'File "MISSING" doesn\'t exists' in streams.err.getvalue()
+        assert streams.err.getvalue().count('Incorrect configuration for file "MISSING"') == 1
+        assert [project_file.filename for project_file in cfg.files] == ['README', 'MISSING']
+
+    def test_invalidated_when_changed(self):
+        with catch_streams():
+            config.load(self.files)
+
+            with self.files[0].open('a') as fh:
+                fh.write('\n[vcs]\ncommit_message = v%(version)s\n')
+
+            cfg = config.load(self.files)
+
+        assert self.parsed == 2
+        assert cfg.vcs_commit_message == 'v%(version)s'
+
+    def test_invalidated_when_created(self):
+        files = self.files + [Path(self.dir.name).absolute() / 'other.rc']
+        with catch_streams():
+            config.load(files)
+
+            files[1].write_text('[versionner]\nup_part = major\n')
+            cfg = config.load(files)
+
+        assert self.parsed == 2
+        assert cfg.up_part == 'major'
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv('VERSIONNER_NO_CACHE', '1')
+        with catch_streams():
+            config.load(self.files)
+            config.load(self.files)
+
+        assert self.parsed == 2
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from versionner import api
+from versionner import counter
+from versionner import discovery
+from versionner.cli import execute
+
+from test.streamcatcher import catch_streams
+
+ROOT = Path(__file__).absolute().parent.parent
+
+ALLOCATE = """
+import sys
+from versionner import counter
+c = counter.BuildCounter(sys.argv[1], batch=int(sys.argv[2]))
+print(' '.join(str(c.allocate()) for _ in range(int(sys.argv[3]))))
+"""
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.0.0')
+
+    discovery.clear_cache()
+
+    return dir
+
+
+class TestCounter:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+
+    def test_set_build_auto(self):
+        with catch_streams() as streams:
+            assert execute('ver', ['set', '--build', 'auto']) == 0
+            assert execute('ver', ['set', '--build', 'auto']) == 0
+
+        assert Path('VERSION').read_text() == '1.0.0+2'
+        assert 'Current version: 1.0.0+1\n' in streams.out.getvalue()
+        assert Path('.VERSION.build').read_text() == '3'
+        # lock of version file protects counter
+        assert sorted(path.name for path in Path('.').iterdir()) == ['.VERSION.build', '.VERSION.lock', 'VERSION']
+
+    def test_counter_in_repository(self):
+        subprocess.check_call(['git', 'init', '-q'])
+        discovery.clear_cache()
+
+        with catch_streams():
+            assert execute('ver', ['set', '--build', 'auto']) == 0
+
+        assert Path('VERSION').read_text() == '1.0.0+1'
+        assert sorted(path.name for path in Path('.').iterdir()) == ['.git', 'VERSION']
+        assert counter.counter_path('VERSION').read_text() == '2'
+
+    def test_counter_does_not_depend_on_environment(self, monkeypatch):
+        with catch_streams():
+            assert execute('ver', ['set', '--build', 'auto']) == 0
+
+        monkeypatch.setenv('XDG_CACHE_HOME', os.path.join(self.dir.name, 'cache'))
+        monkeypatch.setenv('HOME', os.path.join(self.dir.name, 'home'))
+        with catch_streams():
+            assert execute('ver', ['set', '--build', 'auto']) == 0
+
+        assert Path('VERSION').read_text() == '1.0.0+2'
+
+    def test_counter_file_from_config(self):
+        Path('.versionner.rc').write_text('[versionner]\nbuild_counter_file = build.counter\nbuild_counter_batch = 10\n')
+        Path('build.counter').write_text('100')
+
+        with catch_streams():
+            cfg = api.load_config()
+
+        assert api.set(build='auto', cfg=cfg).current_version.build == '100'
+        assert api.set(build='auto', cfg=cfg).current_version.build == '101'
+        assert Path('build.counter').read_text() == '110'
+
+    def test_concurrent_processes(self):
+        env = dict(os.environ, PYTHONPATH=str(ROOT))
+        processes = [subprocess.Popen([sys.executable, '-c', ALLOCATE, 'build.counter', '7', '50'], env=env,
+            stdout=subprocess.PIPE) for _ in range(6)]
+
+        numbers = []
+        for process in processes:
+            allocated = [int(number) for number in process.communicate()[0].split()]
+            assert allocated == sorted(allocated)
+            numbers.extend(allocated)
+
+        assert len(numbers) == len(set(numbers)) == 300
+        assert int(Path('build.counter').read_text()) > max(numbers)
+
+    def test_broken_counter_file(self):
+        Path('build.counter').write_text('abc')
+
+        with pytest.raises(counter.CounterError):
+            counter.BuildCounter('build.counter').allocate()
+
+
+if __name__ == '__main__':
+    pytest.main()
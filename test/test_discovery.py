@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from versionner import discovery
+from versionner.vcs.git import VCSCommandsBuilder
+
+
+class TestDiscovery:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name).resolve()
+        (self.root / 'project' / 'sub' / 'dir').mkdir(parents=True)
+        (self.root / '.git').mkdir()
+        (self.root / 'project' / '.versionner.rc').write_text('')
+        discovery.clear_cache()
+        yield
+        discovery.clear_cache()
+
+    def test_discover(self):
+        paths = discovery.discover(self.root / 'project' / 'sub' / 'dir')
+
+        assert paths.config_file == self.root / 'project' / '.versionner.rc'
+        assert paths.vcs_root == self.root
+
+    def test_discover_from_cwd(self):
+        cwd = os.getcwd()
+        os.chdir(str(self.root / 'project' / 'sub'))
+        try:
+            paths = discovery.discover()
+        finally:
+            os.chdir(cwd)
+
+        assert paths.config_file == self.root / 'project' / '.versionner.rc'
+        assert paths.vcs_root == self.root
+
+    def test_discover_nothing(self):
+        (self.root / '.git').rmdir()
+        (self.root / 'project' / '.versionner.rc').unlink()
+
+        paths = discovery.discover(self.root / 'project')
+
+        assert paths.vcs_root is None or self.root not in paths.vcs_root.parents
+        assert paths.config_file is None or self.root not in paths.config_file.parents
+
+    def test_memoized(self):
+        start = self.root / 'project' / 'sub'
+        paths = discovery.discover(start)
+        (self.root / 'project' / 'sub' / '.versionner.rc').write_text('')
+
+        assert discovery.discover(start) is paths
+
+        discovery.clear_cache()
+        assert discovery.discover(start).config_file == start / '.versionner.rc'
+
+    def test_git_uses_discovered_root(self):
+        assert VCSCommandsBuilder(self.root).status() == ['git', '-C', str(self.root), 'status', '--porcelain']
+        assert VCSCommandsBuilder().status() == ['git', 'status', '--porcelain']
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+import pytest
+
+from versionner import discovery
+from versionner.cli import execute
+from versionner.vcs import git as git_engine
+from versionner.vcs.errors import VCSError
+
+from test.streamcatcher import catch_streams
+
+
+def git(*args):
+    return subprocess.check_output(('git', ) + args).decode()
+
+
+def commit_version(version, message=None):
+    Path('VERSION').write_text(version + '\n')
+    git('add', 'VERSION')
+    git('commit', '-q', '-m', message or version)
+    return git('rev-parse', 'HEAD').strip()
+
+
+class TestHistory:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = tempfile.TemporaryDirectory()
+        os.chdir(self.dir.name)
+
+        git('init', '-q')
+        git('config', 'user.email', 'test@example.com')
+        git('config', 'user.name', 'Test')
+
+        self.commits = [commit_version('0.1.0')]
+        Path('README').write_text('readme\n')
+        git('add', 'README')
+        git('commit', '-q', '-m', 'readme')
+        self.commits.append(commit_version('0.2.0'))
+        self.commits.append(commit_version('1.0.0-rc.1'))
+
+        discovery.clear_cache()
+
+    def history(self, *args):
+        with catch_streams() as streams:
+            ret_code = execute('ver', list(args) + ['history'])
+
+        assert ret_code == 0, streams.err.getvalue()
+        return streams.out.getvalue().splitlines()
+
+    def test_history(self):
+        rows = [row.split() for row in self.history()]
+
+        assert [version for (_, _, version) in rows] == ['1.0.0-rc.1', '0.2.0', '0.1.0']
+        assert [commit for (_, commit, _) in rows] == [commit[:12] for commit in reversed(self.commits)]
+
+    def test_json(self):
+        rows = [json.loads(row) for row in self.history('--output', 'json')]
+
+        assert rows[0]['commit'] == self.commits[-1]
+        assert (rows[0]['version'], rows[0]['previous']) == ('1.0.0-rc.1', '0.2.0')
+        assert (rows[-1]['version'], rows[-1]['previous']) == ('0.1.0', None)
+
+    def test_follows_renames(self):
+        git('mv', 'VERSION', 'VERSION.txt')
+        git('commit', '-q', '-m', 'rename')
+        Path('.versionner.rc').write_text('[versionner]\nfile = VERSION.txt\n')
+        Path('VERSION.txt').write_text('1.0.0\n')
+        git('commit', '-q', '-a', '-m', '1.0.0')
+        discovery.clear_cache()
+
+        assert [row.split()[0] for row in self.history('--output', 'plain')] == ['1.0.0', '1.0.0-rc.1', '0.2.0', '0.1.0']
+
+    def test_only_new_commits_are_read(self):
+        self.history()
+        new = commit_version('1.0.0')
+
+        with mock.patch.object(git_engine.VCSEngine, 'log_file', autospec=True,
+                side_effect=git_engine.VCSEngine.log_file) as log_file:
+            rows = self.history('--output', 'plain')
+            assert rows == self.history('--output', 'plain')
+
+        assert rows[0] == '1.0.0 %s' % new
+        assert len(rows) == 4
+        # second call is answered from cache
+        assert log_file.call_count == 1
+        assert log_file.call_args[0][2] == self.commits[-1]
+
+    def test_large_stderr(self):
+        script = 'import sys; sys.stderr.write("warning\\n" * 100000); print("\\0%s 1"); sys.exit(1)' % self.commits[0]
+        result = []
+
+        def read_log():
+            try:
+                list(git_engine.VCSEngine().log_file('VERSION'))
+            except VCSError as exc:
+                result.append(exc)
+
+        with mock.patch.object(git_engine.VCSCommandsBuilder, 'log_file', return_value=[sys.executable, '-c', script]):
+            thread = threading.Thread(target=read_log, daemon=True)
+            thread.start()
+            thread.join(10)
+
+        assert not thread.is_alive()
+        assert 'exited with code 1 and message: warning\n' in str(result[0])
+
+    def test_rewritten_history(self):
+        self.history()
+        git('reset', '-q', '--hard', self.commits[1])
+        commit_version('0.3.0')
+
+        assert [row.split()[0] for row in self.history('--output', 'plain')] == ['0.3.0', '0.2.0', '0.1.0']
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import subprocess
+import tempfile
+
+import pytest
+
+from versionner import api
+from versionner import hooks
+from versionner.errors import ConfigError
+
+from test.streamcatcher import catch_streams
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.2.3')
+    Path('README').write_text('version: 1.2.3\n')
+    Path('.versionner.rc').write_text(
+        '[versionner]\nup_part = patch\n\n'
+        '[file:README]\nsearch = ^version: .*$\nreplace = version: %(version)s\n'
+    )
+
+    return dir
+
+
+def git(*args):
+    return subprocess.check_output(('git', ) + args).decode()
+
+
+class TestHooks:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+        self.events = []
+        with catch_streams():
+            self.cfg = api.load_config()
+
+        for event in hooks.EVENTS:
+            hooks.register(event, self.record)
+
+        yield
+
+        hooks.clear()
+
+    def record(self, event, **data):
+        self.events.append((event, data))
+
+    def test_events_order(self):
+        git('init', '-q')
+        git('config', 'user.email', 'test@example.com')
+        git('config', 'user.name', 'Test')
+        git('add', '-A')
+        git('commit', '-q', '-m', 'initial')
+
+        api.bump(cfg=self.cfg, commit=True)
+
+        assert [event for (event, _) in self.events] == [
+            'pre_command',
+            'pre_vcs', 'post_vcs',
+            'pre_file_rewrite', 'post_file_rewrite',
+            'pre_vcs', 'post_vcs',
+            'pre_vcs', 'post_vcs',
+            'post_command',
+        ]
+
+        (_, rewrite) = self.events[4]
+        assert rewrite['project_file'].filename == 'README'
+        assert str(rewrite['version']) == '1.2.4'
+        assert rewrite['changes'] == 1
+        assert rewrite['error'] is None
+        assert rewrite['duration'] >= 0
+
+        assert [data['action'] for (event, data) in self.events if event == 'post_vcs'] == \
+            ['raise_if_cant_commit', 'add_to_stage', 'create_commit']
+
+        (_, post_command) = self.events[-1]
+        assert str(post_command['result'].current_version) == '1.2.4'
+        assert post_command['error'] is None
+
+    def test_error(self):
+        self.cfg.files[0].match = 'unknown'
+        with pytest.raises(ConfigError):
+            api.bump(cfg=self.cfg)
+
+        assert [event for (event, _) in self.events] == \
+            ['pre_command', 'pre_file_rewrite', 'post_file_rewrite', 'post_command']
+        for (_, data) in self.events[2:]:
+            assert isinstance(data['error'], ConfigError)
+        assert self.events[-1][1]['result'] is None
+
+    def test_unregister(self):
+        for event in hooks.EVENTS:
+            hooks.unregister(event, self.record)
+
+        assert not hooks.enabled(*hooks.EVENTS)
+        api.bump(cfg=self.cfg)
+        assert self.events == []
+
+    def test_unknown_event(self):
+        with pytest.raises(ValueError):
+            hooks.register('unknown', self.record)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+HEAVY_MODULES = ('argparse', 'configparser', 'distutils', 'semver', 'shutil', 'subprocess', 'tempfile', 'versionner.version')
+ROOT = Path(__file__).absolute().parent.parent
+
+SCRIPT = '''
+import json, sys
+from versionner import cli
+ret = cli.execute('ver', sys.argv[1:])
+print(json.dumps([ret, sorted(sys.modules)]), file=sys.stderr)
+'''
+
+
+def run(*argv):
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    process = subprocess.run([sys.executable, '-c', SCRIPT] + list(argv),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, check=True)
+    (ret, modules) = json.loads(process.stderr.decode().splitlines()[-1])
+
+    return ret, process.stdout.decode(), set(modules)
+
+
+def imported(modules, name):
+    return any(module == name or module.startswith(name + '.') for module in modules)
+
+
+class TestImportTime:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.TemporaryDirectory()
+        os.chdir(self.dir.name)
+        Path('VERSION').write_text('1.2.3-rc.1+b7\n')
+        yield
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def test_import_cli(self):
+        env = dict(os.environ, PYTHONPATH=str(ROOT))
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import versionner.cli'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, check=True)
+        modules = {line.split('|')[-1].strip() for line in process.stderr.decode().splitlines()}
+
+        for name in HEAVY_MODULES:
+            assert not imported(modules, name), "%s imported with versionner.cli" % name
+
+    @pytest.mark.parametrize('argv', [(), ('read', ), ('r', )])
+    def test_fast_read(self, argv):
+        run(*argv)
+        (ret, stdout, modules) = run(*argv)
+
+        assert ret == 0
+        assert stdout == 'Current version: 1.2.3-rc.1+b7\n'
+        for name in HEAVY_MODULES:
+            assert not imported(modules, name), "%s imported by fast read" % name
+
+    def test_fallback_for_invalid_version(self):
+        Path('VERSION').write_text('1.a.3')
+
+        with pytest.raises(subprocess.CalledProcessError):
+            run('read')
+
+
+if __name__ == '__main__':
+    pytest.main()
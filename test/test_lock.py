@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from versionner import api
+from versionner import discovery
+from versionner import lock
+from versionner.cli import execute
+from versionner.version import VersionMismatchError
+
+from test.streamcatcher import catch_streams
+
+ROOT = Path(__file__).absolute().parent.parent
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.0.0')
+    Path('README').write_text('version: 1.0.0\n')
+    Path('.versionner.rc').write_text('[file:README]\nsearch = ^version: .*$\nreplace = version: %(version)s\n')
+
+    discovery.clear_cache()
+
+    return dir
+
+
+class TestLock:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+
+    def test_parallel_bumps(self):
+        env = dict(os.environ, PYTHONPATH=str(ROOT))
+        processes = [subprocess.Popen([sys.executable, '-m', 'versionner', 'up', '--patch'], env=env,
+            stdout=subprocess.DEVNULL) for _ in range(8)]
+
+        assert [process.wait() for process in processes] == [0] * 8
+        assert Path('VERSION').read_text() == '1.0.8'
+        assert Path('README').read_text() == 'version: 1.0.8\n'
+
+    def test_expect(self):
+        with catch_streams():
+            assert execute('ver', ['up', '--patch', '--expect', '1.0.0']) == 0
+            assert execute('ver', ['set', '--expect', '1.0.1', '2.0.0']) == 0
+
+        assert Path('VERSION').read_text() == '2.0.0'
+
+    def test_expect_mismatch(self):
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['up', '--expect', '0.9.0'])
+
+        assert ret_code == 3
+        assert 'Current version is 1.0.0, but 0.9.0 was expected' in streams.err.getvalue()
+        assert Path('VERSION').read_text() == '1.0.0'
+        assert Path('README').read_text() == 'version: 1.0.0\n'
+
+        with catch_streams(), \
+                pytest.raises(VersionMismatchError):
+            api.set('2.0.0', expect='0.9.0')
+
+    def test_timeout(self):
+        with lock.FileLock('VERSION'):
+            with pytest.raises(lock.LockError):
+                lock.FileLock('VERSION', timeout=0.05).acquire()
+
+        with lock.FileLock('VERSION', timeout=0):
+            pass
+
+    def test_lock_file_outside_of_repository(self):
+        with catch_streams():
+            execute('ver', ['up'])
+
+        assert sorted(path.name for path in Path('.').iterdir()) == ['.VERSION.lock', '.versionner.rc', 'README', 'VERSION']
+
+    def test_no_files_in_repository(self):
+        subprocess.check_call(['git', 'init', '-q'])
+        discovery.clear_cache()
+
+        with catch_streams():
+            execute('ver', ['up'])
+
+        assert subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=all']).decode().split() == \
+            ['??', '.versionner.rc', '??', 'README', '??', 'VERSION']
+        assert lock.lock_path('VERSION').parent == Path('.git', 'versionner').absolute()
+
+    def test_lock_path_does_not_depend_on_environment(self, monkeypatch):
+        path = lock.lock_path('VERSION')
+        monkeypatch.setenv('XDG_CACHE_HOME', os.path.join(self.dir.name, 'cache'))
+        monkeypatch.setenv('HOME', os.path.join(self.dir.name, 'home'))
+
+        assert lock.lock_path('VERSION') == path == Path(os.getcwd(), '.VERSION.lock')
+
+
+if __name__ == '__main__':
+    pytest.main()
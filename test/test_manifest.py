@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import tempfile
+from unittest import mock
+
+import pytest
+
+from versionner import discovery
+from versionner import manifests
+from versionner import version
+from versionner.cli import execute
+from versionner.errors import ConfigError
+
+from test.streamcatcher import catch_streams
+
+PYPROJECT = '''[build-system]
+requires = ["setuptools"]  # version = "0.0.1"
+
+[tool.poetry]
+version = "9.9.9"
+
+[tool.black]
+description = """
+[project]
+version = "6.6.6"
+"""
+
+[project]
+name = "pkg"
+version = "1.2.3"   # current
+dependencies = ["semver>=2.8"]
+'''
+
+PACKAGE_JSON = '''{
+  "name": "version",
+  "dependencies": {"version": "^1.0.0"},
+  "keywords": ["version", "\\"version\\""],
+  "version" : "1.2.3",
+  "scripts": {"test": "jest"}
+}
+'''
+
+CARGO = '''[workspace]
+members = ["a"]
+
+[[bin]]
+name = "x"
+version = "0.0.1"
+
+[package]
+name = "x"
+version = '1.2.3'
+edition = "2021"
+'''
+
+
+class TestManifests:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = tempfile.TemporaryDirectory()
+        version.clear_read_cache()
+        manifests.clear_offsets_cache()
+
+    def make(self, name, content):
+        path = Path(self.dir.name, name)
+        path.write_text(content)
+        return path
+
+    @pytest.mark.parametrize('name,content,fmt', [
+        ('pyproject.toml', PYPROJECT, 'pyproject'),
+        ('package.json', PACKAGE_JSON, 'npm'),
+        ('Cargo.toml', CARGO, 'cargo'),
+    ])
+    def test_read_write(self, name, content, fmt):
+        path = self.make(name, content)
+        version_file = version.VersionFile(path, fmt)
+
+        assert str(version_file.read()) == '1.2.3'
+
+        version_file.write(version.Version('1.10.0-rc.1'))
+
+        assert path.read_text() == content.replace('1.2.3', '1.10.0-rc.1')
+        assert str(version.VersionFile(path, fmt).read()) == '1.10.0-rc.1'
+
+    def test_poetry(self):
+        path = self.make('pyproject.toml', '[tool.poetry]\nname = "x"\nversion = "0.3.0"\n')
+
+        assert str(version.VersionFile(path, 'pyproject').read()) == '0.3.0'
+
+    def test_multiline_arrays(self):
+        path = self.make('pyproject.toml', '[project]\nname = "x"\nkeywords = [\n  "a]",\n  ["tool.poetry"],\n'
+            '  [\n    "b",\n  ],\n]\nversion = "0.3.0"\n\n[tool.poetry]\nversion = "9.9.9"\n')
+
+        assert str(version.VersionFile(path, 'pyproject').read()) == '0.3.0'
+
+    def test_not_found(self):
+        path = self.make('pyproject.toml', '[project]\nname = "x"\ndynamic = ["version"]\n')
+
+        with pytest.raises(manifests.ManifestError):
+            version.VersionFile(path, 'pyproject').read()
+
+    def test_unknown_format(self):
+        with pytest.raises(ConfigError):
+            version.VersionFile('setup.cfg', 'setup.cfg')
+
+    def test_write_uses_cached_offsets(self):
+        path = self.make('package.json', PACKAGE_JSON)
+        version_file = version.VersionFile(path, 'npm')
+        version_file.read()
+
+        with mock.patch.object(manifests.JsonManifest, 'locate') as locate:
+            version_file.write(version.Version('1.2.4'))
+            version_file.write(version.Version('1.2.10'))
+
+        assert not locate.called
+        assert '"version" : "1.2.10"' in path.read_text()
+
+    def test_external_change(self):
+        path = self.make('package.json', PACKAGE_JSON)
+        version_file = version.VersionFile(path, 'npm')
+        version_file.read()
+
+        path.write_text('{"version": "2.0.0", "name": "moved"}')
+        version_file.write(version.Version('2.1.0'))
+
+        assert path.read_text() == '{"version": "2.1.0", "name": "moved"}'
+
+
+class TestManifestCommands:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = tempfile.TemporaryDirectory()
+        os.chdir(self.dir.name)
+
+        Path('pyproject.toml').write_text(PYPROJECT)
+        Path('.versionner.rc').write_text('[versionner]\nfile = pyproject.toml\nformat = pyproject\n')
+
+        discovery.clear_cache()
+
+    def test_read(self):
+        with catch_streams() as streams:
+            ret_code = execute('ver', [])
+
+        assert ret_code == 0
+        assert 'Current version: 1.2.3' in streams.out.getvalue()
+
+    def test_up(self):
+        with catch_streams():
+            ret_code = execute('ver', ['up', '--patch'])
+
+        assert ret_code == 0
+        assert Path('pyproject.toml').read_text() == PYPROJECT.replace('1.2.3', '1.2.4')
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from versionner import discovery
+from versionner import hooks
+from versionner import metrics
+from versionner.cli import execute
+from versionner.vcs.errors import VCSError
+
+from test.streamcatcher import catch_streams
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.0.0')
+    Path('README').write_text('version: 1.0.0\n')
+    Path('.versionner.rc').write_text('[file:README]\nsearch = ^version: .*$\nreplace = version: %(version)s\n')
+
+    discovery.clear_cache()
+
+    return dir
+
+
+def samples(path):
+    return metrics.Registry.parse(Path(path).read_text()).samples
+
+
+class TestMetrics:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+
+    def test_accumulate(self):
+        with catch_streams():
+            assert execute('ver', ['--metrics-file', 'ver.prom', 'up']) == 0
+            assert execute('ver', ['--metrics-file', 'ver.prom', 'up', '--patch']) == 0
+
+        data = samples('ver.prom')
+        assert data[('versionner_commands_total', (('command', 'up'), ('status', 'ok')))] == 2
+        assert data[('versionner_command_duration_seconds_count', (('command', 'up'), ))] == 2
+        assert data[('versionner_command_duration_seconds_bucket', (('command', 'up'), ('le', '+Inf')))] == 2
+        assert data[('versionner_files_scanned_total', ())] == 2
+        assert data[('versionner_files_modified_total', ())] == 2
+        assert data[('versionner_substitutions_total', ())] == 2
+        assert data[('versionner_bytes_processed_total', ())] == 2 * len('version: 1.1.0\n')
+        assert not hooks.enabled(*hooks.EVENTS)
+
+        content = Path('ver.prom').read_text()
+        assert '# TYPE versionner_command_duration_seconds histogram\n' in content
+        assert '# TYPE versionner_commands_total counter\n' in content
+
+    def test_vcs_failure(self):
+        with catch_streams(), \
+                pytest.raises(VCSError):
+            execute('ver', ['--metrics-file', 'ver.prom', 'up', '--commit'])
+
+        data = samples('ver.prom')
+        assert data[('versionner_commands_total', (('command', 'up'), ('status', 'error')))] == 1
+        assert data[('versionner_vcs_call_failures_total', (('action', 'raise_if_cant_commit'), ))] == 1
+        assert data[('versionner_vcs_call_duration_seconds_count', (('action', 'raise_if_cant_commit'), ))] == 1
+
+    def test_concurrent_saves(self):
+        def save(_):
+            collector = metrics.Collector()
+            collector.registry.inc('versionner_commands_total', {'command': 'up', 'status': 'ok'})
+            collector.save('ver.prom')
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(save, range(40)))
+
+        assert samples('ver.prom')[('versionner_commands_total', (('command', 'up'), ('status', 'ok')))] == 40
+
+    def test_format_roundtrip(self):
+        registry = metrics.Registry()
+        registry.inc('versionner_commands_total', {'command': 'a "quoted"\\nname'})
+        registry.observe('versionner_command_duration_seconds', 0.02, {'command': 'up'})
+
+        parsed = metrics.Registry.parse(registry.format())
+        assert parsed.samples == registry.samples
+        assert parsed.samples[('versionner_command_duration_seconds_bucket', (('command', 'up'), ('le', '0.01')))] == 0
+        assert parsed.samples[('versionner_command_duration_seconds_bucket', (('command', 'up'), ('le', '0.025')))] == 1
+
+
+if __name__ == '__main__':
+    pytest.main()
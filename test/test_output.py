@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import tempfile
+
+import pytest
+
+from versionner import discovery
+from versionner import hooks
+from versionner.cli import execute
+
+from test.streamcatcher import catch_streams
+
+RC = """
+[file:README]
+search = ^version: .*$
+replace = version: %(version)s
+"""
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.2.3')
+    Path('README').write_text('version: 1.2.3\n')
+    Path('.versionner.rc').write_text(RC)
+
+    discovery.clear_cache()
+
+    return dir
+
+
+def run(*argv):
+    with catch_streams() as streams:
+        ret_code = execute('ver', list(argv))
+
+    return ret_code, streams.out.getvalue()
+
+
+class TestOutput:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+
+    def test_json_up(self):
+        (ret_code, out) = run('--output', 'json', 'up', '--patch')
+        data = json.loads(out)
+
+        assert ret_code == 0
+        assert data['ok'] is True
+        assert data['command'] == 'up'
+        assert data['current_version'] == '1.2.4'
+        assert (data['modifications'], data['modified_files']) == (1, 1)
+        assert [(info['file'], info['version'], info['changes']) for info in data['files']] == [('README', '1.2.4', 1)]
+        assert data['files'][0]['duration'] >= 0
+        assert data['duration'] >= data['files'][0]['duration']
+        assert not hooks.enabled(hooks.POST_FILE_REWRITE)
+
+    @pytest.mark.parametrize('argv', [(), ('read', )])
+    def test_json_read(self, argv):
+        (ret_code, out) = run('--output', 'json', *argv)
+
+        assert ret_code == 0
+        assert json.loads(out)['current_version'] == '1.2.3'
+
+    def test_json_error(self):
+        (ret_code, out) = run('--output', 'json', 'up', '--expect', '1.0.0')
+        data = json.loads(out)
+
+        assert ret_code == 3
+        assert (data['ok'], data['error'], data['ret_code']) == (False, 'VersionMismatchError', 3)
+
+    def test_json_vcs_error(self):
+        for args in (['init', '-q'], ['add', '-A'], ['-c', 'user.name=Test', '-c', 'user.email=test@example.com',
+                'commit', '-q', '-m', 'initial']):
+            subprocess.check_call(['git'] + args)
+        # uncommitted changes
+        Path('README').write_text('version: 1.2.3\nchanged\n')
+
+        (ret_code, out) = run('--output', 'json', 'up', '--commit')
+        data = json.loads(out)
+
+        assert ret_code == 2
+        assert (data['ok'], data['error'], data['ret_code']) == (False, 'VCSStateError', 2)
+        assert Path('VERSION').read_text() == '1.2.3'
+
+    @pytest.mark.parametrize('fmt', ['json', 'plain'])
+    def test_tag_failure(self, fmt):
+        # there is no repository, so tag can't be created
+        (ret_code, out) = run('--output', fmt, 'tag')
+
+        assert ret_code == 2
+        if fmt == 'json':
+            data = json.loads(out)
+            assert (data['ok'], data['error']) == (False, 'TagError')
+        else:
+            assert out == ''
+
+    @pytest.mark.parametrize('argv,expected', [
+        ((), '1.2.3\n'),
+        (('read', ), '1.2.3\n'),
+        (('set', '--prerelease', 'rc.1'), '1.2.3-rc.1\n'),
+    ])
+    def test_plain(self, argv, expected):
+        assert run('--output', 'plain', *argv) == (0, expected)
+
+
+if __name__ == '__main__':
+    pytest.main()
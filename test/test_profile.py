@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+import json
+import os
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from versionner import discovery
+from versionner import profiling
+from versionner.cli import execute
+
+from test.streamcatcher import catch_streams
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.0.0')
+    Path('README').write_text('version: 1.0.0\n')
+    Path('.versionner.rc').write_text('[file:README]\nsearch = ^version: .*$\nreplace = version: %(version)s\n')
+
+    discovery.clear_cache()
+
+    return dir
+
+
+class TestProfile:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+        self.root = Path(self.dir.name)
+
+    def test_json(self):
+        with catch_streams():
+            ret_code = execute('ver', ['--profile', '--profile-format', 'json', '--profile-file', 'profile.json', 'up'])
+
+        assert ret_code == 0
+        assert Path('VERSION').read_text().strip() == '1.1.0'
+        assert profiling.PROFILER is None
+
+        data = json.loads(Path('profile.json').read_text())
+        spans = {span['name']: span for span in data['spans']}
+        assert 'config load' in spans
+        assert 'parse arguments' in spans
+        assert 'command up' in spans
+        assert spans['rewrite README']['category'] == 'file'
+        assert spans['rewrite README']['args']['substitutions'] == 1
+        assert spans['rewrite README']['args']['bytes_read'] == len('version: 1.0.0\n')
+        assert spans['rewrite README']['args']['bytes_written'] == len('version: 1.1.0\n')
+        assert data['peak_memory'] > 0
+        assert data['total'] >= spans['command up']['duration']
+
+    def test_chrome(self):
+        with catch_streams():
+            ret_code = execute('ver', ['--profile', '--profile-format', 'chrome', '--profile-file', 'trace.json', 'read'])
+
+        assert ret_code == 0
+        data = json.loads(Path('trace.json').read_text())
+        assert {'command read'} <= {event['name'] for event in data['traceEvents']}
+        assert all(event['ph'] in ('X', 'C') for event in data['traceEvents'])
+
+    def test_table_on_stderr(self):
+        with catch_streams() as streams:
+            execute('ver', ['--profile', 'up'])
+
+        stderr = streams.err.getvalue()
+        assert 'command up' in stderr
+        assert 'rewrite README' in stderr
+        assert 'peak memory' in stderr
+
+    def test_disabled(self):
+        with profiling.span('test', 'io') as info:
+            assert info is None
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import re
+import subprocess
+import tempfile
+
+import pytest
+
+from versionner import discovery
+from versionner.cli import execute
+
+from test.streamcatcher import catch_streams
+
+RC = """
+[project:api]
+file = api/VERSION
+
+[project:api:file:api/setup.py]
+search = version='.*'
+replace = version='%(version)s'
+
+[project:api:file:2:api/setup.py]
+search = ^# release: .*$
+replace = # release: %(version)s
+
+[project:web]
+file = web/VERSION
+
+[project:web:file:web/package.json]
+search = "version": ".*"
+replace = "version": "%(version)s"
+
+[project:broken]
+"""
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    for name in ('api', 'web'):
+        Path(name).mkdir()
+        Path(name, 'VERSION').write_text('1.0.0')
+    Path('api', 'setup.py').write_text("# release: 1.0.0\nsetup(version='1.0.0')\n")
+    Path('web', 'package.json').write_text('{"version": "1.0.0"}\n')
+    Path('.versionner.rc').write_text(RC)
+
+    discovery.clear_cache()
+
+    return dir
+
+
+def git(*args):
+    return subprocess.check_output(('git', ) + args).decode()
+
+
+class TestProjects:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+        self.root = Path(self.dir.name)
+
+    def test_selected_projects(self):
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['up', '--patch', '--project', 'api'])
+
+        assert ret_code == 0
+        assert 'Current version of api: 1.0.1' in streams.out.getvalue()
+        assert 'Changed 2 files (2 changes)' in streams.out.getvalue()
+        assert (self.root / 'api' / 'VERSION').read_text() == '1.0.1'
+        assert (self.root / 'api' / 'setup.py').read_text() == "# release: 1.0.1\nsetup(version='1.0.1')\n"
+        assert (self.root / 'web' / 'VERSION').read_text() == '1.0.0'
+
+    def test_all_projects(self):
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['up', '--all'])
+
+        assert ret_code == 0
+        assert re.search(r'Version file .* doesn\'t exists', streams.err.getvalue()) is None
+        assert 'Incorrect configuration for project "broken"' in streams.err.getvalue()
+        assert (self.root / 'api' / 'VERSION').read_text() == '1.1.0'
+        assert (self.root / 'web' / 'VERSION').read_text() == '1.1.0'
+        assert (self.root / 'web' / 'package.json').read_text() == '{"version": "1.1.0"}\n'
+
+    def test_unknown_project(self):
+        with catch_streams() as streams, \
+                pytest.raises(SystemExit):
+            execute('ver', ['up', '--project', 'api,unknown'])
+
+        assert 'Unknown project: unknown' in streams.err.getvalue()
+
+    def test_single_commit(self):
+        git('init', '-q')
+        git('config', 'user.email', 'test@example.com')
+        git('config', 'user.name', 'Test')
+        git('add', '-A')
+        git('commit', '-q', '-m', 'initial')
+
+        with catch_streams():
+            ret_code = execute('ver', ['up', '--all', '--commit'])
+
+        assert ret_code == 0
+        assert git('log', '--format=%s') == 'api 1.1.0, web 1.1.0\ninitial\n'
+        assert git('status', '--porcelain') == ''
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import subprocess
+import tempfile
+from unittest import mock
+
+import pytest
+
+from versionner import discovery
+from versionner.cli import execute
+from versionner.vcs import git as git_engine
+
+from test.streamcatcher import catch_streams
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    Path('VERSION').write_text('1.2.3')
+    Path('README').write_text('Intro\nCurrent version: 1.2.3.\nOld versions: 1.2.34, 11.2.3, 1.2.3.4\n')
+    Path('src', 'pkg').mkdir(parents=True)
+    Path('src', 'pkg', '__init__.py').write_text("x = 1\n__version__ = '1.2.3'  # 100%\n")
+    Path('configured.txt').write_text('1.2.3\n')
+    Path('ignored.txt').write_text('version 1.2.3\n')
+    Path('binary.bin').write_bytes(b'\0\0version 1.2.3')
+    Path('.gitignore').write_text('ignored.txt\n')
+    Path('.versionner.rc').write_text('[file:configured.txt]\nsearch = .*\nreplace = %(version)s\n')
+
+    discovery.clear_cache()
+
+    return dir
+
+
+def git(*args):
+    return subprocess.check_output(('git', ) + args).decode()
+
+
+class TestScan:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = bootstrap_env()
+
+    def scan(self):
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['scan'])
+
+        assert ret_code == 0
+        return streams.out.getvalue()
+
+    def test_walk(self):
+        output = self.scan()
+
+        assert output == (
+            '; README:2: Current version: 1.2.3.\n'
+            '[file:README]\n'
+            'search = Current version: \\d+\\.\\d+\\.\\d+[\\w.+-]*\\.\n'
+            'replace = Current version: %(version)s.\n'
+            '\n'
+            '; ignored.txt:1: version 1.2.3\n'
+            '[file:ignored.txt]\n'
+            'search = version \\d+\\.\\d+\\.\\d+[\\w.+-]*\n'
+            'replace = version %(version)s\n'
+            '\n'
+            "; src/pkg/__init__.py:2: __version__ = '1.2.3'  # 100%\n"
+            '[file:src/pkg/__init__.py]\n'
+            "search = __version__ = '\\d+\\.\\d+\\.\\d+[\\w.+-]*'  \\# 100%\n"
+            "replace = __version__ = '%(version)s'  # 100%%\n"
+            '\n'
+        )
+
+    def test_git_ignored_files(self):
+        git('init', '-q')
+
+        output = self.scan()
+
+        assert '[file:README]' in output
+        assert '[file:src/pkg/__init__.py]' in output
+        assert 'ignored.txt' not in output
+
+    def test_git_timeout(self):
+        git('init', '-q')
+
+        with mock.patch.object(git_engine.VCSEngine, 'list_files',
+                side_effect=subprocess.TimeoutExpired(['git', 'ls-files'], 5)):
+            output = self.scan()
+
+        # files are listed by walking directories
+        assert '[file:ignored.txt]' in output
+
+    def test_suggested_rules_work(self):
+        Path('.versionner.rc').write_text(self.scan())
+
+        with catch_streams():
+            assert execute('ver', ['up', '--patch']) == 0
+            assert execute('ver', ['check']) == 0
+
+        assert Path('README').read_text().splitlines()[1] == 'Current version: 1.2.4.'
+        assert Path('src', 'pkg', '__init__.py').read_text() == "x = 1\n__version__ = '1.2.4'  # 100%\n"
+
+    def test_not_found(self):
+        Path('VERSION').write_text('7.7.7')
+
+        assert self.scan() == '; version 7.7.7 not found in any file\n'
+
+
+if __name__ == '__main__':
+    pytest.main()
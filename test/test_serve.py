@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+import pytest
+
+from versionner import config
+from versionner import server
+from versionner.cli import execute
+from versionner import client
+from versionner.client import Client, ServerError
+
+from test.streamcatcher import catch_streams
+
+
+def bootstrap_env():
+    dir = tempfile.TemporaryDirectory()
+    os.chdir(dir.name)
+
+    with catch_streams():
+        execute('ver', ['init', '1.2.3'])
+
+    return dir
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestServe:
+    @pytest.fixture(autouse=True, params=[False, True], ids=['inotify', 'polling'])
+    def set_env(self, request):
+        self.dir = bootstrap_env()
+        self.root = Path(self.dir.name).absolute()
+        self.rc = self.root / '.versionner.rc'
+        self.rc.write_text('[versionner]\nup_part = minor\n')
+
+        cfg = config.Config([self.rc])
+        cfg.version_file = self.root / 'VERSION'
+
+        self.socket = self.root / 'ver.sock'
+        self.server = server.Server(self.socket, cfg, polling=request.param)
+        self.thread = threading.Thread(target=self.server.serve)
+        self.thread.start()
+
+        self.client = Client(self.socket, timeout=5)
+        yield
+        if not self.server.stopped:
+            self.client.request('shutdown')
+        self.client.close()
+        self.thread.join()
+        self.server.server_close()
+
+    def test_read(self):
+        assert self.client.read() == '1.2.3'
+        assert self.client.read() == '1.2.3'
+
+    def test_many_connections(self):
+        # connection of first client stays open, and doesn't block others
+        assert self.client.read() == '1.2.3'
+
+        clients = [Client(self.socket, timeout=2) for _ in range(3)]
+        try:
+            assert [client.read() for client in clients] == ['1.2.3'] * 3
+            assert clients[0].request('up', part='patch')['current_version'] == '1.2.4'
+            assert self.client.read() == '1.2.4'
+        finally:
+            for client in clients:
+                client.close()
+
+    def test_up_and_set(self):
+        response = self.client.request('up', part='patch')
+        assert response['current_version'] == '1.2.4'
+        assert self.client.read() == '1.2.4'
+
+        self.client.request('set', prerelease='rc1')
+        assert self.client.read() == '1.2.4-rc1'
+
+        self.client.request('set', value='2.0.0')
+        assert (self.root / 'VERSION').read_text() == '2.0.0'
+
+    def test_external_change(self):
+        assert self.client.read() == '1.2.3'
+
+        (self.root / 'VERSION').write_text('3.2.1-dev')
+
+        assert wait_for(lambda: self.client.read() == '3.2.1-dev')
+
+    def test_config_reload(self):
+        self.rc.write_text('[versionner]\nup_part=major\n')
+
+        assert wait_for(lambda: self.client.read() and self.server.cfg.up_part == 'major')
+        assert self.client.request('up')['current_version'] == '2.0.0'
+
+    def test_errors(self):
+        with pytest.raises(ServerError) as exc:
+            self.client.request('set', value='1.a.3')
+        assert 'InvalidVersionError' in str(exc.value)
+
+        with pytest.raises(ServerError) as exc:
+            self.client.request('unknown')
+        assert 'Unknown command' in str(exc.value)
+
+        assert self.client.read() == '1.2.3'
+
+    @pytest.mark.parametrize('request_params,message', [
+        ({'command': 'set', 'major': 'x'}, 'Field major must be int, not str'),
+        ({'command': 'up', 'value': 'a'}, 'Field value must be int, not str'),
+    ])
+    def test_invalid_field_type(self, request_params, message):
+        with pytest.raises(ServerError) as exc:
+            self.client.request(**request_params)
+        assert str(exc.value) == 'RequestError: %s' % message
+
+        # connection is still open
+        assert self.client.read() == '1.2.3'
+
+    def test_client_usage(self):
+        with catch_streams() as streams:
+            assert client.main(['--socket']) == 1
+
+        assert streams.err.getvalue().startswith('usage:')
+
+    def test_shutdown(self):
+        self.client.request('shutdown')
+        self.thread.join(5)
+
+        assert not self.thread.is_alive()
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import subprocess
+import tempfile
+
+import pytest
+
+from versionner import discovery
+from versionner.cli import execute
+from versionner.vcs.errors import VCSStateError
+
+from test.streamcatcher import catch_streams
+
+RC = '[versionner]\nup_part = patch\n\n[file:README]\nsearch = ^version: .*$\nreplace = version: %(version)s\n'
+
+
+def git(cwd, *args):
+    return subprocess.check_output(('git', '-c', 'protocol.file.allow=always', '-C', str(cwd)) + args).decode()
+
+
+def make_repo(root, version=None):
+    root.mkdir()
+    if version:
+        (root / 'VERSION').write_text(version)
+        (root / 'README').write_text('version: %s\n' % version)
+        (root / '.versionner.rc').write_text(RC)
+    else:
+        (root / 'README').write_text('no version here\n')
+
+    git(root, 'init', '-q')
+    git(root, 'add', '-A')
+    git(root, 'commit', '-q', '-m', 'initial')
+
+
+class TestSubmodules:
+    @pytest.fixture(autouse=True)
+    def set_env(self, monkeypatch):
+        for name in ('GIT_AUTHOR_NAME', 'GIT_COMMITTER_NAME'):
+            monkeypatch.setenv(name, 'Test')
+        for name in ('GIT_AUTHOR_EMAIL', 'GIT_COMMITTER_EMAIL'):
+            monkeypatch.setenv(name, 'test@example.com')
+
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name)
+
+        make_repo(self.root / 'lib-a', '0.1.0')
+        make_repo(self.root / 'lib-b', '2.3.4')
+        make_repo(self.root / 'assets')
+        make_repo(self.root / 'product', '1.0.0')
+
+        self.product = self.root / 'product'
+        for name in ('lib-a', 'lib-b', 'assets'):
+            git(self.product, 'submodule', '-q', 'add', str(self.root / name), 'modules/%s' % name)
+        git(self.product, 'commit', '-q', '-m', 'submodules')
+
+        os.chdir(str(self.product))
+        discovery.clear_cache()
+
+    def test_up_and_commit(self):
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['up', '--minor', '--commit', '--recurse-submodules'])
+
+        assert ret_code == 0, streams.err.getvalue()
+        assert 'Current version of .: 1.1.0' in streams.out.getvalue()
+        assert 'Current version of modules/lib-a: 0.2.0' in streams.out.getvalue()
+        assert 'Current version of modules/lib-b: 2.4.0' in streams.out.getvalue()
+        assert 'Changed and committed 3 files (3 changes)' in streams.out.getvalue()
+
+        modules = self.product / 'modules'
+        assert (modules / 'lib-a' / 'VERSION').read_text() == '0.2.0'
+        assert (modules / 'lib-b' / 'README').read_text() == 'version: 2.4.0\n'
+        assert git(modules / 'lib-a', 'log', '-1', '--format=%s').strip() == '0.2.0'
+        assert git(modules / 'assets', 'log', '--format=%s').strip() == 'initial'
+
+        assert git(self.product, 'log', '-1', '--format=%s').strip() == '1.1.0'
+        assert sorted(git(self.product, 'show', '--name-only', '--format=', 'HEAD').split()) == \
+            ['README', 'VERSION', 'modules/lib-a', 'modules/lib-b']
+        assert git(self.product, 'status', '--porcelain') == ''
+
+    def test_up_without_commit(self):
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['up', '--recurse-submodules'])
+
+        assert ret_code == 0, streams.err.getvalue()
+        assert (self.product / 'VERSION').read_text() == '1.0.1'
+        assert (self.product / 'modules' / 'lib-a' / 'VERSION').read_text() == '0.1.1'
+        assert git(self.product / 'modules' / 'lib-a', 'log', '-1', '--format=%s').strip() == 'initial'
+
+    def test_failure_in_submodule(self):
+        (self.product / 'modules' / 'lib-b' / 'VERSION').write_text('broken')
+
+        with catch_streams() as streams:
+            ret_code = execute('ver', ['up', '--recurse-submodules'])
+
+        assert ret_code == 2
+        assert 'SubmoduleError: Failed in 1 of 2 submodules' in streams.err.getvalue()
+        assert 'modules/lib-b' in streams.err.getvalue()
+        # superproject isn't changed when any submodule failed
+        assert (self.product / 'VERSION').read_text() == '1.0.0'
+        assert (self.product / 'modules' / 'lib-a' / 'VERSION').read_text() == '0.1.1'
+
+    def test_requires_clean_superproject(self):
+        (self.product / 'README').write_text('changed\n')
+
+        with catch_streams(), pytest.raises(VCSStateError):
+            execute('ver', ['up', '--commit', '--recurse-submodules'])
+
+        assert (self.product / 'modules' / 'lib-a' / 'VERSION').read_text() == '0.1.0'
+
+
+if __name__ == '__main__':
+    pytest.main()
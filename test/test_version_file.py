@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import stat
+import tempfile
+from unittest import mock
+
+import pytest
+
+from versionner import version
+
+
+class TestVersionFileCache:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.dir.name, 'VERSION')
+        self.path.write_text('1.2.3\n')
+        self.version_file = version.VersionFile(self.path)
+        version.clear_read_cache()
+
+    def count_opens(self):
+        return mock.patch('versionner.version.open', side_effect=open, create=True)
+
+    def test_cached_read(self):
+        with self.count_opens() as opened:
+            assert str(self.version_file.read()) == '1.2.3'
+            assert str(self.version_file.read()) == '1.2.3'
+            assert str(version.VersionFile(self.path).read()) == '1.2.3'
+
+        assert opened.call_count == 1
+
+    def test_returned_versions_are_independent(self):
+        first = self.version_file.read()
+        first.major = 7
+
+        assert str(self.version_file.read()) == '1.2.3'
+
+    def test_external_change(self):
+        self.version_file.read()
+
+        self.path.write_text('1.2.4\n')
+        assert str(self.version_file.read()) == '1.2.4'
+
+        self.path.write_text('1.20.5\n')
+        assert str(self.version_file.read()) == '1.20.5'
+
+    def test_write_updates_cache(self):
+        self.version_file.read()
+
+        with self.count_opens() as opened:
+            self.version_file.write(version.Version('2.0.0'))
+            assert str(self.version_file.read()) == '2.0.0'
+
+        assert opened.call_count == 0
+        assert self.path.read_text() == '2.0.0'
+
+    def test_write_changes_mtime(self):
+        os.chmod(str(self.path), 0o600)
+        os.utime(str(self.path), (1, 1))
+
+        self.version_file.write(version.Version('2.0.0'))
+
+        assert stat.S_IMODE(self.path.stat().st_mode) == 0o600
+        assert self.path.stat().st_mtime > 1
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+from concurrent.futures import ThreadPoolExecutor
+import sys
+
+import pytest
+
+from versionner.version import Version, ParseCache, PARSE_CACHE
+
+
+class TestVersionParseCache:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        maxsize = PARSE_CACHE.maxsize
+        PARSE_CACHE.clear()
+        yield
+        PARSE_CACHE.maxsize = maxsize
+        PARSE_CACHE.clear()
+
+    def test_hits_and_misses(self):
+        v1 = Version('1.2.3-rc1+b7')
+        v2 = Version('1.2.3-rc1+b7')
+        Version('2.0.0')
+
+        assert v1 == v2
+        assert (v2.major, v2.minor, v2.patch, v2.prerelease, v2.build) == (1, 2, 3, 'rc1', 'b7')
+        assert PARSE_CACHE.info() == {'hits': 1, 'misses': 2, 'maxsize': PARSE_CACHE.maxsize, 'currsize': 2}
+
+    def test_parsed_instances_are_independent(self):
+        v1 = Version('1.2.3')
+        v1.major = 7
+        v2 = Version('1.2.3')
+
+        assert v2.major == 1
+
+    def test_lru_eviction(self):
+        cache = ParseCache(2)
+        cache.get('1.0.0')
+        cache.get('2.0.0')
+        cache.get('1.0.0')
+        cache.get('3.0.0')
+
+        assert len(cache) == 2
+        cache.get('1.0.0')
+        assert cache.hits == 2
+        cache.get('2.0.0')
+        assert cache.misses == 4
+
+    def test_resize(self):
+        for i in range(5):
+            Version('%d.0.0' % i)
+
+        PARSE_CACHE.maxsize = 2
+        assert len(PARSE_CACHE) == 2
+
+        with pytest.raises(ValueError):
+            PARSE_CACHE.maxsize = -1
+
+    def test_threads(self):
+        cache = ParseCache(4)
+
+        def parse(i):
+            for j in range(2000):
+                assert cache.get('%d.%d.0' % (j % 3, i % 2))[:2] == (j % 3, i % 2)
+                if j % 5 == 0:
+                    cache.maxsize = 1 + j % 3
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(parse, range(16)))
+        finally:
+            sys.setswitchinterval(interval)
+
+        assert len(cache) <= cache.maxsize
+        assert cache.hits + cache.misses == 16 * 2000
+
+    def test_disabled(self):
+        PARSE_CACHE.maxsize = 0
+        Version('1.2.3')
+        Version('1.2.3')
+
+        assert len(PARSE_CACHE) == 0
+        assert PARSE_CACHE.misses == 2
+
+    def test_invalid_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                Version('1.a.3')
+
+        assert len(PARSE_CACHE) == 0
+
+
+if __name__ == '__main__':
+    pytest.main()
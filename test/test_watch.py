@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+import io
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+import pytest
+
+from versionner import config
+from versionner import discovery
+from versionner.commands.watch import Watch
+
+RC = """
+[file:README]
+search = ^version: .*$
+replace = version: %(version)s
+"""
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestWatch:
+    @pytest.fixture(autouse=True, params=[False, True], ids=['inotify', 'polling'])
+    def set_env(self, request):
+        self.dir = tempfile.TemporaryDirectory()
+        os.chdir(self.dir.name)
+        self.root = Path(self.dir.name).absolute()
+
+        (self.root / 'VERSION').write_text('1.2.3')
+        (self.root / 'README').write_text('intro\nversion: 1.0.0\n')
+        (self.root / 'NEWS').write_text('version: 1.0.0\n')
+        self.rc = self.root / '.versionner.rc'
+        self.rc.write_text(RC)
+        discovery.clear_cache()
+
+        cfg = config.Config([self.rc])
+        cfg.version_file = self.root / 'VERSION'
+        cfg.value = (0.05, request.param)
+
+        self.output = io.StringIO()
+        self.watch = Watch(cfg, self.output)
+        self.thread = threading.Thread(target=self.watch.execute)
+        self.thread.start()
+        yield
+        self.watch.stopped.set()
+        self.thread.join()
+
+    def test_initial_sync(self):
+        assert wait_for(lambda: (self.root / 'README').read_text() == 'intro\nversion: 1.2.3\n')
+
+    def test_version_changed(self):
+        assert wait_for(lambda: 'Version 1.2.3' in self.output.getvalue())
+
+        (self.root / 'VERSION').write_text('1.3.0')
+
+        assert wait_for(lambda: 'Version 1.3.0: 1 changes in 1 files' in self.output.getvalue())
+        assert (self.root / 'README').read_text() == 'intro\nversion: 1.3.0\n'
+
+    def test_unchanged_files_are_not_rewritten(self):
+        assert wait_for(lambda: 'Version 1.2.3' in self.output.getvalue())
+        inode = (self.root / 'README').stat().st_ino
+
+        (self.root / 'VERSION').write_text('1.2.3')
+        (self.root / 'VERSION').write_text('1.4.0')
+        (self.root / 'VERSION').write_text('1.2.3')
+        time.sleep(0.5)
+
+        assert (self.root / 'README').stat().st_ino == inode
+
+    def test_config_reloaded(self):
+        assert wait_for(lambda: 'Version 1.2.3' in self.output.getvalue())
+
+        self.rc.write_text(RC + '\n[file:NEWS]\nsearch = ^version: .*$\nreplace = version: %(version)s\n')
+
+        assert wait_for(lambda: (self.root / 'NEWS').read_text() == 'version: 1.2.3\n')
+
+
+if __name__ == '__main__':
+    pytest.main()
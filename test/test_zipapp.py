@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+import pytest
+
+ROOT = Path(__file__).absolute().parent.parent
+
+
+def run(*argv, **kwargs):
+    env = {name: value for (name, value) in os.environ.items() if name != 'PYTHONPATH'}
+    return subprocess.run([sys.executable] + list(argv), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        env=env, check=True, **kwargs).stdout.decode()
+
+
+class TestZipapp:
+    @pytest.fixture(autouse=True)
+    def set_env(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name)
+        self.project = self.root / 'project'
+        self.project.mkdir()
+        (self.project / 'VERSION').write_text('1.2.3')
+
+    def build(self, *args):
+        archive = self.root / 'ver.pyz'
+        run(str(ROOT / 'tools' / 'build_zipapp.py'), '--output', str(archive), *args)
+        return archive
+
+    def test_layout(self):
+        with zipfile.ZipFile(str(self.build())) as archive:
+            names = archive.namelist()
+            infos = archive.infolist()
+
+        assert '__main__.pyc' in names
+        assert 'semver.pyc' in names and 'semver.py' in names
+        assert 'versionner/cli.pyc' in names
+        assert not any('__pycache__' in name for name in names)
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in infos)
+
+    def test_reproducible(self):
+        first = self.build().read_bytes()
+        assert self.build().read_bytes() == first
+
+    @pytest.mark.parametrize('args', [(), ('--sourceless', )], ids=['sources', 'sourceless'])
+    def test_run(self, args):
+        archive = self.build(*args)
+
+        assert run(str(archive), 'up', '--patch', cwd=str(self.project)) == 'Current version: 1.2.4\n'
+        assert (self.project / 'VERSION').read_text() == '1.2.4'
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""Build single-file, self-contained zipapp with versionner (and vendored semver)
+
+    python tools/build_zipapp.py
+    python dist/ver.pyz up --patch
+
+Archive is laid out for the fastest start:
+
+* every module is precompiled, and bytecode is stored as `name.pyc` next to `name.py`, where
+  zipimport looks for it first (zipimport never uses `__pycache__`, and doesn't write bytecode,
+  so without precompiled modules every run compiles all imported sources)
+* bytecode uses unchecked hash based invalidation, so it's not compared with sources on import
+* entries are stored without compression, so zipimport doesn't decompress them (nor import zlib)
+
+Bytecode is specific for version of Python used to build archive. On other versions zipimport
+falls back to sources (unless archive is built with `--sourceless`, then it's unusable there).
+Archive is reproducible: entries are sorted and have constant timestamps.
+"""
+
+import argparse
+import importlib.util
+import io
+import marshal
+import os
+import pathlib
+import stat
+import sys
+import zipfile
+
+ROOT = pathlib.Path(__file__).absolute().parent.parent
+DEFAULT_OUTPUT = ROOT / 'dist' / 'ver.pyz'
+DEFAULT_INTERPRETER = '/usr/bin/env python3'
+# dependencies put into archive (top-level packages or modules)
+VENDORED = ('semver', )
+# constant timestamp of all entries, for reproducible builds (the earliest allowed by zip format)
+ENTRY_DATE = (1980, 1, 1, 0, 0, 0)
+
+MAIN = '''"""Entry point for zipapp"""
+
+import sys
+
+from versionner import cli
+
+sys.exit(cli.main())
+'''
+
+
+def find_sources(name):
+    """Find sources of package or module
+
+    :param name: top-level package or module name
+    :return: list of (archive name, path)
+    """
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        raise SystemExit("Can't find sources of %s" % name)
+
+    origin = pathlib.Path(spec.origin)
+    if not spec.submodule_search_locations:
+        return [(origin.name, origin)]
+
+    package_dir = origin.parent
+    sources = []
+    for path in sorted(package_dir.rglob('*.py')):
+        if '__pycache__' not in path.parts:
+            sources.append(((pathlib.Path(name) / path.relative_to(package_dir)).as_posix(), path))
+
+    return sources
+
+
+def compile_source(source, arcname, optimize):
+    """Compile module into content of .pyc file (with unchecked hash based invalidation)
+
+    :param source:bytes
+    :param arcname:str: name of module file in archive, used in tracebacks
+    :param optimize:int: optimization level, like -O option of interpreter
+    :return:bytes
+    """
+    code = compile(source, arcname, 'exec', dont_inherit=True, optimize=optimize)
+    data = io.BytesIO()
+    data.write(importlib.util.MAGIC_NUMBER)
+    # flags: hash based, unchecked (see PEP 552)
+    data.write((0b01).to_bytes(4, 'little'))
+    data.write(importlib.util.source_hash(source))
+    data.write(marshal.dumps(code))
+
+    return data.getvalue()
+
+
+def _write(archive, arcname, data):
+    """Add uncompressed entry with constant timestamp to archive"""
+    info = zipfile.ZipInfo(arcname, ENTRY_DATE)
+    info.compress_type = zipfile.ZIP_STORED
+    info.external_attr = 0o644 << 16
+    archive.writestr(info, data)
+
+
+def build(output, interpreter=DEFAULT_INTERPRETER, optimize=0, sourceless=False):
+    """Build zipapp
+
+    :param output: path to created archive
+    :param interpreter: interpreter used in shebang line, or None to not add it
+    :param optimize:int: optimization level of bytecode
+    :param sourceless:bool: don't put sources into archive
+    :return: list of archive names of modules
+    """
+    sources = find_sources('versionner')
+    for name in VENDORED:
+        sources.extend(find_sources(name))
+    sources = [(arcname, path.read_bytes()) for (arcname, path) in sources]
+    sources.append(('__main__.py', MAIN.encode('utf-8')))
+
+    output = pathlib.Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_name('.%s.tmp' % output.name)
+
+    with open(str(tmp_output), 'wb') as fh:
+        if interpreter:
+            fh.write(b'#!' + interpreter.encode(sys.getfilesystemencoding()) + b'\n')
+
+        with zipfile.ZipFile(fh, 'w') as archive:
+            for (arcname, source) in sorted(sources):
+                _write(archive, arcname + 'c', compile_source(source, arcname, optimize))
+                if not sourceless:
+                    _write(archive, arcname, source)
+
+    os.chmod(str(tmp_output), os.stat(str(tmp_output)).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.replace(str(tmp_output), str(output))
+
+    return [arcname for (arcname, _) in sorted(sources)]
+
+
+def main(argv=None):
+    """Main script
+
+    :return: exit code (for shell)
+    :rtype: int
+    """
+    p = argparse.ArgumentParser(description='Build single-file zipapp with versionner')
+    p.add_argument('--output', '-o', type=str, default=str(DEFAULT_OUTPUT),
+        help="Path to created archive (default: %s)" % DEFAULT_OUTPUT.relative_to(ROOT))
+    p.add_argument('--python', '-p', type=str, default=DEFAULT_INTERPRETER,
+        help="Interpreter used in shebang line (default: %s)" % DEFAULT_INTERPRETER)
+    p.add_argument('--optimize', '-O', type=int, choices=(0, 1, 2), default=0,
+        help="Optimization level of bytecode (default: 0)")
+    p.add_argument('--sourceless', action='store_true',
+        help="Don't put sources into archive (smaller, but works only with the same Python version)")
+    args = p.parse_args(sys.argv[1:] if argv is None else argv)
+
+    sys.path.insert(0, str(ROOT))
+    modules = build(args.output, args.python, args.optimize, args.sourceless)
+    print('%s: %d modules, %d bytes, built with Python %d.%d' % (
+        args.output, len(modules), os.path.getsize(args.output), sys.version_info[0], sys.version_info[1]))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""Public API for using versionner in-process (ie. from build tools)
+
+All functions accept `Config` instance, which can be created once (ie. by `load_config`)
+and reused for many calls - it's never modified. Functions return `CommandOutput`
+and raise exceptions instead of printing messages and returning exit codes:
+
+    >>> from versionner import api
+    >>> cfg = api.load_config()
+    >>> api.read(cfg).current_version
+    >>> api.bump('patch', cfg=cfg)
+    >>> api.set('2.0.0-rc1', cfg=cfg)
+    >>> api.set(prerelease='rc2', cfg=cfg)
+    >>> api.tag(cfg=cfg)
+
+Every function has asynchronous counterpart for asyncio event loops (`read_async`, `bump_async`,
+`set_async`, `tag_async`), which doesn't block the loop on files and VCS commands:
+
+    >>> await asyncio.gather(*(api.bump_async('patch', cfg=cfg) for cfg in configs))
+"""
+
+import copy
+import pathlib
+
+from versionner import commands
+from versionner import config
+from versionner import discovery
+from versionner import version
+from versionner import vcs
+from versionner.commands import CommandOutput
+from versionner.errors import ConfigError
+
+__all__ = ['load_config', 'read', 'bump', 'set', 'tag', 'read_async', 'bump_async', 'set_async', 'tag_async',
+    'CommandOutput']
+
+
+def load_config():
+    """Load configuration for project in current working directory, the same way as `ver` does
+
+    :return:Config
+    """
+    cfg = config.load(config.get_config_files())
+    cfg.vcs_root = discovery.discover().vcs_root
+
+    return cfg
+
+
+def _prepare(cfg, command, **options):
+    """Copy configuration and set options required by command
+
+    :param cfg: configuration storage, or None to load configuration for current directory
+    :param command: command name
+    :param options: configuration values to set
+    :return:Config
+    """
+    cfg = copy.copy(cfg or load_config())
+    cfg.command = command
+    cfg.version_file = pathlib.Path(cfg.version_file).absolute()
+    for key, value in options.items():
+        setattr(cfg, key, value)
+
+    if not cfg.version_file.exists():
+        raise ConfigError("Version file \"%s\" doesn't exists" % cfg.version_file)
+
+    return cfg
+
+
+def read(cfg=None):
+    """Read current version
+
+    :param cfg: configuration storage
+    :type: Config
+    :return:CommandOutput
+    """
+    return _read(cfg).execute()
+
+
+async def read_async(cfg=None):
+    """Asynchronous version of `read`
+
+    :param cfg: configuration storage
+    :type: Config
+    :return:CommandOutput
+    """
+    return await _read(cfg).execute_async()
+
+
+def _read(cfg):
+    return commands.get('read', _prepare(cfg, 'read'))
+
+
+def bump(part=None, value=None, cfg=None, commit=False, expect=None):
+    """Increase version and update project files
+
+    :param part: one of: major, minor, patch (default: up_part from configuration)
+    :param value:int: increase by this value (default: default_increase_value from configuration)
+    :param cfg: configuration storage
+    :type: Config
+    :param commit:bool: commit changes to VCS
+    :param expect: change version only if current version is equal to this one
+    :return:CommandOutput
+    :raise VersionnerError:
+    """
+    return _bump(part, value, cfg, commit, expect).execute()
+
+
+async def bump_async(part=None, value=None, cfg=None, commit=False, expect=None):
+    """Asynchronous version of `bump`, accepts the same arguments
+
+    :return:CommandOutput
+    :raise VersionnerError:
+    """
+    return await _bump(part, value, cfg, commit, expect).execute_async()
+
+
+def _bump(part, value, cfg, commit, expect):
+    cfg = cfg or load_config()
+    part = part or cfg.up_part
+    if part not in version.Version.VALID_UP_FIELDS:
+        raise ValueError("Invalid field type: %s" % part)
+
+    cfg = _prepare(cfg, 'up', up_part=part, value=value or cfg.default_increase_value, commit=commit,
+        expect=None if expect is None else str(expect))
+    return commands.get('up', cfg)
+
+
+# pylint: disable=redefined-builtin,too-many-arguments
+def set(value=None, major=None, minor=None, patch=None, prerelease=None, build=None, cfg=None, commit=False,
+        expect=None):
+    """Set version (or chosen fields of it) and update project files
+
+    :param value: full version to set (str or Version)
+    :param major:int
+    :param minor:int
+    :param patch:int
+    :param prerelease:str
+    :param build:str
+    :param cfg: configuration storage
+    :type: Config
+    :param commit:bool: commit changes to VCS
+    :param expect: change version only if current version is equal to this one
+    :return:CommandOutput
+    :raise VersionnerError:
+    """
+    return _set(value, major, minor, patch, prerelease, build, cfg, commit, expect).execute()
+
+
+async def set_async(value=None, major=None, minor=None, patch=None, prerelease=None, build=None, cfg=None,
+        commit=False, expect=None):
+    """Asynchronous version of `set`, accepts the same arguments
+
+    :return:CommandOutput
+    :raise VersionnerError:
+    """
+    return await _set(value, major, minor, patch, prerelease, build, cfg, commit, expect).execute_async()
+
+
+def _set(value, major, minor, patch, prerelease, build, cfg, commit, expect):
+    if value is None:
+        value = (major, minor, patch, prerelease, build)
+        if all(field is None for field in value):
+            raise ValueError("Version is not specified")
+    else:
+        value = str(value)
+
+    cfg = _prepare(cfg, 'set', value=value, commit=commit, expect=None if expect is None else str(expect))
+    return commands.get('set', cfg)
+
+
+def tag(params=None, cfg=None):
+    """Create VCS tag with current version
+
+    :param params: additional params for VCS (default: tag_params from configuration)
+    :param cfg: configuration storage
+    :type: Config
+    :return:CommandOutput
+    :raise VCSError:
+    """
+    cfg = _prepare(cfg, 'tag')
+    current = version.VersionFile(cfg.version_file, cfg.version_format).read()
+
+    vcs_handler = vcs.VCS(cfg.vcs_engine, cfg.vcs_root)
+    vcs_handler.create_tag(current, cfg.vcs_tag_params if params is None else params)
+
+    return CommandOutput(current)
+
+
+async def tag_async(params=None, cfg=None):
+    """Asynchronous version of `tag`
+
+    :param params: additional params for VCS (default: tag_params from configuration)
+    :param cfg: configuration storage
+    :type: Config
+    :return:CommandOutput
+    :raise VCSError:
+    """
+    cfg = _prepare(cfg, 'tag')
+    version_file = version.VersionFile(cfg.version_file, cfg.version_format)
+    current = await commands.in_executor(version_file.read)
+
+    vcs_handler = vcs.VCS(cfg.vcs_engine, cfg.vcs_root)
+    await vcs_handler.create_tag_async(current, cfg.vcs_tag_params if params is None else params)
+
+    return CommandOutput(current)
@@ -0,0 +1,78 @@
+"""Persistent cache helpers
+Cache files are stored in $XDG_CACHE_HOME/versionner (~/.cache/versionner by default),
+location can be changed using VERSIONNER_CACHE_DIR environment variable.
+"""
+
+import json
+import os
+import pathlib
+import zlib
+
+ENV_VERSIONNER_CACHE_DIR = 'VERSIONNER_CACHE_DIR'
+ENV_VERSIONNER_NO_CACHE = 'VERSIONNER_NO_CACHE'
+
+
+def enabled():
+    """Check if persistent cache is enabled
+
+    :return:bool
+    """
+    return not os.environ.get(ENV_VERSIONNER_NO_CACHE)
+
+
+def cache_dir():
+    """Find directory for cache files
+
+    :return:pathlib.Path
+    """
+    if os.environ.get(ENV_VERSIONNER_CACHE_DIR):
+        return pathlib.Path(os.environ[ENV_VERSIONNER_CACHE_DIR])
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return pathlib.Path(base) / 'versionner'
+
+
+def cache_file(namespace, *key):
+    """Build path to cache file for given namespace and key
+
+    :param namespace:str: kind of cached data, used as subdirectory
+    :param key: any json-serializable values identifying cached data
+    :return:pathlib.Path
+    """
+    # hashlib is not used because of its import time; collisions are harmless, callers
+    # must verify full key stored in cache file anyway
+    digest = '%08x' % zlib.crc32(json.dumps(key).encode('utf-8'))
+    return cache_dir() / namespace / ('%s.json' % digest)
+
+
+def load(path):
+    """Load data from cache file
+
+    :param path:pathlib.Path
+    :return: cached data or None if cache file is missing or broken
+    """
+    try:
+        with path.open(mode='r', encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def save(path, data):
+    """Save data into cache file in safe way (using temporary file)
+    Errors are ignored, cache is just an optimization.
+
+    :param path:pathlib.Path
+    :param data: json-serializable data
+    :return:bool: True if saved
+    """
+    tmp_path = path.with_name('%s.%d.tmp' % (path.name, os.getpid()))
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open(mode='w', encoding='utf-8') as fh:
+            json.dump(data, fh)
+        os.replace(str(tmp_path), str(path))
+    except OSError:
+        return False
+
+    return True
@@ -8,16 +8,29 @@ from versionner import utils
 utils.validate_python_version()
 
 # pylint: disable=wrong-import-order
-import argparse
 import pathlib
-import os.path
+import re
 import sys
 
 import versionner
 from versionner import config
 from versionner import defaults
+from versionner import discovery
 from versionner import commands
+from versionner import profiling
 from versionner.errors import VersionnerError
+from versionner.vcs.errors import VCSError
+
+FAST_READ_COMMANDS = ((), ('read', ), ('r', ))
+# fast path is used also for plain output: `ver --output plain [read]`
+FAST_READ_PLAIN_COMMANDS = tuple(('--output', 'plain') + argv for argv in FAST_READ_COMMANDS)
+_FAST_READ_RXP = re.compile(r"""
+    ^
+    (?:0|[1-9][0-9]*)\.(?:0|[1-9][0-9]*)\.(?:0|[1-9][0-9]*)
+    (?:-(?:0|[1-9A-Za-z-][0-9A-Za-z-]*)(?:\.(?:0|[1-9A-Za-z-][0-9A-Za-z-]*))*)?
+    (?:\+[0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*)?
+    $
+""", re.VERBOSE)
 
 
 # pylint: disable=too-many-branches,too-many-statements
@@ -29,6 +42,10 @@ def parse_args(args, cfg):
     :param cfg: configuration storage
     :type: Config
     """
+    # argparse is imported lazily, it's not required by fast path for `read` command
+    import argparse
+    from versionner import output
+
     prog = pathlib.Path(sys.argv[0]).parts[-1].replace('.py', '')
     prog_version = "%%(prog)s %s" % versionner.__version__
 
@@ -43,6 +60,17 @@ def parse_args(args, cfg):
         help="Date format used in project files")
     p.add_argument('--verbose', action="store_true",
         help="Be more verbose if it's possible")
+    p.add_argument('--profile', action="store_true",
+        help="Measure time of every phase (config parsing, command, files rewriting, VCS calls) and peak memory")
+    p.add_argument('--profile-format', type=str, choices=profiling.FORMATS, default='table',
+        help="Format of profiling results (default: table)")
+    p.add_argument('--profile-file', type=str,
+        help="Write profiling results to this file instead of stderr")
+    p.add_argument('--metrics-file', type=str,
+        help="Add metrics of this run to file in Prometheus text format (ie. for node_exporter textfile collector)")
+    p.add_argument('--output', type=str, choices=output.FORMATS, default='text',
+        help="Format of result: text (default), json (result with details of modified files and VCS calls) "
+            "or plain (version only)")
 
     sub = p.add_subparsers(dest='command')
 
@@ -70,10 +98,22 @@ def parse_args(args, cfg):
         help="Commit message used when committing changes")
     p_up.add_argument('--commit', '-c', action='store_true',
         help="Commit changes done by `up` command (only if there is no changes in repo before)")
+    p_up.add_argument('--expect', type=str,
+        help="Change version only if current version is EXPECT (exit with code 3 otherwise)")
     p_up.add_argument('value', nargs='?', type=int,
         default=cfg.default_increase_value,
         help="Increase version by this value (default: %d)" % cfg.default_increase_value)
 
+    p_up_proj = p_up.add_mutually_exclusive_group()
+    p_up_proj.add_argument('--project', '-P', type=str,
+        help="increase version of given projects (comma separated names from [project:NAME] sections)")
+    p_up_proj.add_argument('--all', '-a', action="store_true",
+        help="increase version of all projects from [project:NAME] sections")
+
+    p_up.add_argument('--recurse-submodules', action="store_true",
+        help="increase versions in git submodules with own config file too (in parallel), "
+            "and commit their new pointers with version of superproject")
+
     p_up_gr = p_up.add_mutually_exclusive_group()
     p_up_gr.add_argument('--major', '-j', action="store_true",
         help="increase major part of version" + (" (project default)" if cfg.up_part == 'major' else ""))
@@ -93,7 +133,7 @@ def parse_args(args, cfg):
     p_set.add_argument('--prerelease', '-r', type=str,
         help="set prerelease part of version to PRERELEASE")
     p_set.add_argument('--build', '-b', type=str,
-        help="set build part of version to BUILD")
+        help="set build part of version to BUILD (\"auto\" for next number from local counter)")
     p_set.add_argument('--vcs-engine', type=str,
         default=cfg.vcs_engine,
         help="Select VCS engine (only git is supported currently)", )
@@ -102,6 +142,8 @@ def parse_args(args, cfg):
         help="Commit message used when committing changes")
     p_set.add_argument('--commit', '-c', action='store_true',
         help="Commit changes done by `set` command (only if there is no changes in repo before)")
+    p_set.add_argument('--expect', type=str,
+        help="Change version only if current version is EXPECT (exit with code 3 otherwise)")
     p_set.add_argument('value', nargs='?', type=str,
         help="set version to this value")
 
@@ -113,12 +155,54 @@ def parse_args(args, cfg):
     sub.add_parser('read', aliases=commands.get_aliases_for('read'),
         help="Read current version")
 
+    p_batch = sub.add_parser('batch', aliases=commands.get_aliases_for('batch'),
+        help="Apply operations read from stdin (JSON objects, one per line), and save changes once")
+    p_batch.add_argument('--vcs-engine', type=str,
+        default=cfg.vcs_engine,
+        help="Select VCS engine (only git is supported currently)", )
+    p_batch.add_argument('--vcs-commit-message', '-m', type=str,
+        default=cfg.vcs_commit_message,
+        help="Commit message used when committing changes")
+    p_batch.add_argument('--commit', '-c', action='store_true',
+        help="Commit changes done by `batch` command (only if there is no changes in repo before)")
+
+    sub.add_parser('check', aliases=commands.get_aliases_for('check'),
+        help="Verify (without modifying anything) that all project files contain current version")
+
+    sub.add_parser('scan', aliases=commands.get_aliases_for('scan'),
+        help="Search files for current version, and print candidate [file:*] sections for config file")
+
+    p_watch = sub.add_parser('watch', aliases=commands.get_aliases_for('watch'),
+        help="Watch version file and config files, and update project files when version is changed")
+    p_watch.add_argument('--debounce', type=float,
+        default=defaults.DEFAULT_WATCH_DEBOUNCE,
+        help="Wait for DEBOUNCE seconds without changes before updating files (default: %s)" %
+            defaults.DEFAULT_WATCH_DEBOUNCE)
+    p_watch.add_argument('--polling', action='store_true',
+        help="Check files with stat periodically instead of using inotify")
+
+    p_history = sub.add_parser('history', aliases=commands.get_aliases_for('history'),
+        help="Print commits which changed version (date, commit and version, newest first)")
+    p_history.add_argument('--vcs-engine', type=str,
+        default=cfg.vcs_engine,
+        help="Select VCS engine (only git is supported currently)", )
+
+    p_serve = sub.add_parser('serve', aliases=commands.get_aliases_for('serve'),
+        help="Serve current version over Unix socket")
+    p_serve.add_argument('--socket', type=str,
+        default=defaults.DEFAULT_SERVE_SOCKET,
+        help="Path to Unix socket (default: %s)" % defaults.DEFAULT_SERVE_SOCKET)
+
     args = p.parse_args(args)
 
     cfg.command = args.command
     cfg.version_file = pathlib.Path(args.version_file).absolute()
     cfg.date_format = args.date_format
     cfg.verbose = args.verbose
+    cfg.profile = args.profile_format if args.profile else None
+    cfg.profile_file = args.profile_file
+    cfg.metrics_file = args.metrics_file
+    cfg.output = args.output
 
     version_file_requirement = 'doesn\'t matter'
     if cfg.command == 'init':
@@ -136,6 +220,7 @@ def parse_args(args, cfg):
         cfg.vcs_engine = args.vcs_engine
         cfg.vcs_commit_message = args.vcs_commit_message
         cfg.value = args.value
+        cfg.expect = args.expect
         if args.major:
             cfg.up_part = 'major'
         elif args.minor:
@@ -143,12 +228,47 @@ def parse_args(args, cfg):
         elif args.patch:
             cfg.up_part = 'patch'
 
+        if args.all:
+            cfg.selected_projects = list(cfg.projects)
+            if not cfg.selected_projects:
+                p.error("There are no projects configured")
+        elif args.project:
+            cfg.selected_projects = list(filter(None, (name.strip() for name in args.project.split(','))))
+            for name in cfg.selected_projects:
+                if name not in cfg.projects:
+                    p.error("Unknown project: %s" % name)
+
+        if args.recurse_submodules:
+            if cfg.selected_projects:
+                p.error("--recurse-submodules can't be used with --project or --all")
+
+            # submodules use their own configuration, only options different from defaults are passed
+            cfg.submodule_args = ['up', '--recurse-submodules']
+            if args.commit:
+                cfg.submodule_args.append('--commit')
+            if args.vcs_commit_message != p_up.get_default('vcs_commit_message'):
+                cfg.submodule_args.extend(['-m', args.vcs_commit_message])
+            if args.major or args.minor or args.patch:
+                cfg.submodule_args.append('--' + cfg.up_part)
+            if args.value != p_up.get_default('value'):
+                cfg.submodule_args.append(str(args.value))
+
+        if cfg.selected_projects:
+            if cfg.expect:
+                p.error("--expect can't be used with --project or --all")
+
+            version_file_requirement = 'doesn\'t matter'
+            for name in cfg.selected_projects:
+                if not pathlib.Path(cfg.projects[name].version_file).exists():
+                    p.error("Version file \"%s\" doesn't exists" % cfg.projects[name].version_file)
+
     elif cfg.command == 'set':
         version_file_requirement = 'required'
 
         cfg.commit = args.commit
         cfg.vcs_engine = args.vcs_engine
         cfg.vcs_commit_message = args.vcs_commit_message
+        cfg.expect = args.expect
 
         if args.value:
             cfg.value = args.value
@@ -166,6 +286,37 @@ def parse_args(args, cfg):
 
         cfg.vcs_tag_params = args.vcs_tag_params or []
 
+    elif cfg.command in ('batch', 'b'):
+        cfg.command = 'batch'
+        version_file_requirement = 'required'
+
+        cfg.commit = args.commit
+        cfg.vcs_engine = args.vcs_engine
+        cfg.vcs_commit_message = args.vcs_commit_message
+        cfg.value = sys.stdin
+
+    elif cfg.command in ('check', 'c'):
+        cfg.command = 'check'
+        if not cfg.projects:
+            version_file_requirement = 'required'
+
+    elif cfg.command == 'scan':
+        version_file_requirement = 'required'
+
+    elif cfg.command == 'watch':
+        if not cfg.projects:
+            version_file_requirement = 'required'
+
+        cfg.value = (args.debounce, args.polling)
+
+    elif cfg.command == 'history':
+        cfg.vcs_engine = args.vcs_engine
+
+    elif cfg.command == 'serve':
+        version_file_requirement = 'required'
+
+        cfg.value = pathlib.Path(args.socket).absolute()
+
     elif cfg.command is None:
         cfg.command = 'read'
         version_file_requirement = 'required'
@@ -178,62 +329,119 @@ def parse_args(args, cfg):
             p.error("Version file \"%s\" already exists" % cfg.version_file)
 
 
-def _find_project_config_file(user_config_file):
-    """Find path to project-wide config file
-    Search from current working directory, and traverse path up to
-    directory with .versionner.rc file or root directory
+def _fast_read(argv, cfg):
+    """Read current version without parsing arguments and importing commands and semver.
+    Used only for the simplest calls of `read` command, in any other case (or when
+    version file looks suspicious) returns None and the full path should be used.
 
-    :param user_config_file: instance with user-wide config path
-    :type: pathlib.Path
-    :rtype: pathlib.Path
+    :param argv: list: script arguments
+    :param cfg: configuration storage
+    :type: Config
+    :return: str|None
     """
-    if os.environ.get(config.ENV_VERSIONNER_PROJECT_CONFIG_FILE, None):
-        return pathlib.Path(os.environ[config.ENV_VERSIONNER_PROJECT_CONFIG_FILE]).absolute()
+    if tuple(argv) not in FAST_READ_COMMANDS + FAST_READ_PLAIN_COMMANDS \
+            or cfg.version_format != defaults.DEFAULT_VERSION_FORMAT:
+        return None
 
-    proj_cfg_dir = pathlib.Path('.').absolute()
-    proj_cfg_file = None
-    root = pathlib.Path('/')
-    while proj_cfg_dir != root:
-        proj_cfg_file = proj_cfg_dir / defaults.RC_FILENAME
-        if proj_cfg_file.exists():
-            break
+    try:
+        with open(str(cfg.version_file), 'r') as fh:
+            version = fh.read().strip()
+    except OSError:
+        return None
 
-        proj_cfg_file = None
-        proj_cfg_dir = proj_cfg_dir.parent
+    if not _FAST_READ_RXP.match(version):
+        return None
 
-    if proj_cfg_file and proj_cfg_file != user_config_file:
-        return proj_cfg_file
+    return version
 
 
-def execute(prog, argv):
+def _save_metrics(collector, path):
+    """Stop collecting metrics and save them, failure is reported but doesn't break execution
+
+    :param collector: metrics.Collector
+    :param path: path to metrics file
+    """
+    collector.uninstall()
+    try:
+        collector.save(path)
+    except OSError as exc:
+        print("Can't write metrics file %s: %s" % (path, exc), file=sys.stderr)
+
+
+def _execute(prog, argv):
     """Execute whole program
 
     :param prog: program name
     :param argv: list: script arguments
-    :return:
+    :return: (exit code, Config)
     """
     if pathlib.Path(prog).parts[-1] in ('versionner', 'versionner.py'):
         print("versionner name is deprecated, use \"ver\" now!", file=sys.stderr)
 
-    cfg_files = [
-        pathlib.Path(os.path.expanduser('~')) / defaults.RC_FILENAME,
-    ]
-    proj_cfg_file = _find_project_config_file(cfg_files[0])
-    if proj_cfg_file:
-        cfg_files.append(proj_cfg_file)
+    with profiling.span('config discovery', 'config'):
+        cfg_files = config.get_config_files()
+    with profiling.span('config load', 'config', files=len(cfg_files)):
+        cfg = config.load(cfg_files)
+    cfg.vcs_root = discovery.discover().vcs_root
 
-    cfg = config.Config(cfg_files)
-    parse_args(argv, cfg)
+    version = _fast_read(argv, cfg)
+    if version is not None:
+        print(version if tuple(argv) in FAST_READ_PLAIN_COMMANDS else "Current version: %s" % (version, ))
+        return 0, cfg
+
+    with profiling.span('parse arguments', 'config'):
+        parse_args(argv, cfg)
 
     cmd = commands.get(cfg.command, cfg)
 
+    collector = None
+    if cfg.metrics_file:
+        from versionner import metrics
+        collector = metrics.Collector().install()
+
+    recorder = None
+    if cfg.output == 'json':
+        from versionner import output
+        recorder = output.Recorder().install()
+
     try:
-        result = cmd.execute()
+        with profiling.span('command %s' % cfg.command, 'command'):
+            result = cmd.execute()
     except VersionnerError as exc:
         print('%s: %s' % (exc.__class__.__name__, exc), file=sys.stderr)
-        return exc.ret_code
-
-    print("Current version: %s" % (result.current_version, ))
+        if recorder is not None:
+            print(output.render_json_error(cfg, exc))
+        return exc.ret_code, cfg
+    except VCSError as exc:
+        # VCS errors are propagated in text output, but result must be reported in JSON
+        if recorder is None:
+            raise
+        print('%s: %s' % (exc.__class__.__name__, exc), file=sys.stderr)
+        print(output.render_json_error(cfg, exc))
+        return VersionnerError.ret_code, cfg
+    finally:
+        if collector is not None:
+            _save_metrics(collector, cfg.metrics_file)
+        if recorder is not None:
+            recorder.uninstall()
+
+    if cmd.raw_output:
+        return 0, cfg
+
+    if cfg.output == 'json':
+        print(output.render_json(cfg, result, recorder))
+        return 0, cfg
+
+    if cfg.output == 'plain':
+        from versionner import output
+        print(output.render_plain(result))
+        return 0, cfg
+
+    if result.projects:
+        for name, version in result.projects.items():
+            print("Current version of %s: %s" % (name, version))
+    else:
+        print("Current version: %s" % (result.current_version, ))
 
     if result.modified_files:
         print('Changed' + (' and committed' if cfg.commit else '') + ' %(files)s files (%(changes)s changes)' % {
@@ -241,7 +449,33 @@ def execute(prog, argv):
             'changes': result.modifications,
         })
 
-    return 0
+    return 0, cfg
+
+
+def execute(prog, argv):
+    """Execute whole program, and profile it if requested
+
+    :param prog: program name
+    :param argv: list: script arguments
+    :return:
+    """
+    # profiling must be started before parsing arguments, to measure config parsing too
+    if '--profile' not in argv:
+        return _execute(prog, argv)[0]
+
+    profiling.start()
+    try:
+        (ret_code, cfg) = _execute(prog, argv)
+    finally:
+        profiler = profiling.stop()
+
+    if cfg.profile_file:
+        with open(cfg.profile_file, 'w') as fh:
+            profiler.dump(cfg.profile, fh)
+    else:
+        profiler.dump(cfg.profile or 'table', sys.stderr)
+
+    return ret_code
 
 def main():
     """Main script
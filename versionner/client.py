@@ -0,0 +1,136 @@
+"""Tiny client for `ver serve`
+
+Usage from shell:
+
+    python -m versionner.client [--socket PATH] read
+    python -m versionner.client up part=patch
+    python -m versionner.client set prerelease=rc1
+"""
+
+import json
+import socket
+import sys
+
+from versionner import defaults
+from versionner.errors import VersionnerError
+
+
+class ServerError(VersionnerError):
+    """Error returned by server"""
+
+
+class Client:
+    """Send requests to `ver serve` over Unix socket"""
+
+    def __init__(self, path=defaults.DEFAULT_SERVE_SOCKET, timeout=None):
+        """Initialisation, connection is opened with first request
+
+        :param path: path to Unix socket
+        :param timeout:float|None: socket timeout in seconds
+        """
+        self._path = str(path)
+        self._timeout = timeout
+        self._sock = None
+        self._fh = None
+
+    def _connect(self):
+        """Connect to server if not connected yet"""
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(self._timeout)
+            self._sock.connect(self._path)
+            self._fh = self._sock.makefile('rwb')
+
+    def request(self, command, **params):
+        """Send request to server and return response
+
+        :param command: command name (read, up, set, tag, shutdown)
+        :param params: command parameters
+        :return:dict
+        :raise ServerError:
+        """
+        self._connect()
+
+        params['command'] = command
+        self._fh.write(json.dumps(params).encode('utf-8') + b'\n')
+        self._fh.flush()
+
+        line = self._fh.readline()
+        if not line:
+            self.close()
+            raise ServerError("Connection closed by server")
+
+        response = json.loads(line.decode('utf-8'))
+        if not response['ok']:
+            raise ServerError('%s: %s' % (response['error'], response['message']))
+
+        return response
+
+    def read(self):
+        """Return current version
+
+        :return:str
+        """
+        return self.request('read')['current_version']
+
+    def close(self):
+        """Close connection"""
+        if self._sock is not None:
+            self._fh.close()
+            self._sock.close()
+            self._sock = None
+            self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _parse_param(param):
+    """Parse key=value param, value is decoded as JSON if possible
+
+    :param param:str
+    :return:(str, any)
+    """
+    (key, _, value) = param.partition('=')
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+
+    return key, value
+
+
+def main(argv=None):
+    """Main script
+
+    :return: exit code (for shell)
+    :rtype: int
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    path = defaults.DEFAULT_SERVE_SOCKET
+    if argv[:1] == ['--socket']:
+        path = argv[1] if len(argv) > 1 else None
+        argv = argv[2:]
+
+    if not argv or not path:
+        print("usage: python -m versionner.client [--socket PATH] COMMAND [KEY=VALUE ...]", file=sys.stderr)
+        return 1
+
+    try:
+        with Client(path) as client:
+            response = client.request(argv[0], **dict(_parse_param(param) for param in argv[1:]))
+    except (VersionnerError, OSError) as exc:
+        print('%s: %s' % (exc.__class__.__name__, exc), file=sys.stderr)
+        return 2
+
+    print("Current version: %s" % (response['current_version'], ))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
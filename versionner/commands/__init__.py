@@ -1,21 +1,25 @@
 """Commands for versionner
 Module defines helpers for searching for commands and aliases for them.
+Command classes are imported lazily, only when requested.
 """
 
-from .command import Command, CommandOutput
-from .up import Up
-from .tag import Tag
-from .set import Set
-from .init import Init
-from .read import Read
+import importlib
+
+from .command import Command, CommandOutput, in_executor
 
 
 COMMANDS = {
-    'up': (Up, 'u'),
-    'init': (Init, 'i'),
-    'set': (Set, 's'),
-    'tag': (Tag, 't'),
-    'read': (Read, 'r'),
+    'up': ('Up', 'u'),
+    'init': ('Init', 'i'),
+    'set': ('Set', 's'),
+    'tag': ('Tag', 't'),
+    'read': ('Read', 'r'),
+    'serve': ('Serve', ),
+    'batch': ('Batch', 'b'),
+    'check': ('Check', 'c'),
+    'scan': ('Scan', ),
+    'watch': ('Watch', ),
+    'history': ('History', ),
 }
 COMMAND_MAPPER = {}
 COMMAND_ALIASES = {}
@@ -26,15 +30,26 @@ def _manage_commands():
 
     @return:None
     """
-    for name, (command, *aliases) in COMMANDS.items():
-        COMMAND_MAPPER[name] = command
+    for name, (_, *aliases) in COMMANDS.items():
+        COMMAND_MAPPER[name] = name
         for alias in aliases:
-            COMMAND_MAPPER[alias] = command
+            COMMAND_MAPPER[alias] = name
         COMMAND_ALIASES[name] = aliases
 _manage_commands()
 del _manage_commands
 
 
+def get_class(name):
+    """Find and import command class for given command name or alias
+
+    :param name: str
+    :return: type
+    """
+    name = COMMAND_MAPPER[name]
+    module = importlib.import_module('versionner.commands.%s' % name)
+    return getattr(module, COMMANDS[name][0])
+
+
 def get(name, *args, **kwargs):
     """Find command class for given command name and return it's instance
 
@@ -43,7 +58,7 @@ def get(name, *args, **kwargs):
     :param kwargs: additional arguments for Command
     :return: Command
     """
-    cmd = COMMAND_MAPPER.get(name)
+    cmd = get_class(name)
     return cmd(*args, **kwargs)
 
 
@@ -54,3 +69,16 @@ def get_aliases_for(name):
     :return: Str[]
     """
     return COMMAND_ALIASES[name]
+
+
+def __getattr__(name):
+    """Lazy access to command classes, ie. versionner.commands.Up
+
+    :param name: str
+    :return: type
+    """
+    for command, (class_name, *_) in COMMANDS.items():
+        if class_name == name:
+            return get_class(command)
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,169 @@
+"""Class for command: batch"""
+
+import json
+import sys
+
+from versionner.commands import Command, CommandOutput
+from versionner import lock
+from versionner import version
+from versionner import vcs
+from versionner.commands.files_management import save_version_and_update_files
+from versionner.errors import VersionnerError
+
+
+# expected types of operations fields, for every command
+FIELD_TYPES = {
+    'up': {'part': str, 'value': int},
+    'set': {'value': str, 'major': int, 'minor': int, 'patch': int, 'prerelease': str, 'build': str},
+}
+
+
+class BatchError(VersionnerError):
+    """Invalid operation in batch"""
+
+
+def field_errors(operation):
+    """Check types of operation fields (operations are decoded from JSON, so they can contain anything)
+
+    :param operation: dict
+    :return: list of error messages, empty if all fields are valid
+    """
+    errors = []
+    for (field, expected) in FIELD_TYPES.get(operation.get('command'), {}).items():
+        value = operation.get(field)
+        # bool is subclass of int, but it's not valid number
+        if value is not None and (not isinstance(value, expected) or isinstance(value, bool)):
+            errors.append("Field %s must be %s, not %s" % (field, expected.__name__, type(value).__name__))
+
+    return errors
+
+
+class Batch(Command):
+    """Realize tasks for 'batch' command
+    Reads operations (JSON objects, one per line) from self.cfg.value, applies them
+    to version in memory, and saves version, updates project files and commits changes
+    only once at the end. Result of every step is reported as JSON object in separate line.
+    """
+
+    raw_output = True
+
+    def __init__(self, cfg, output=None):
+        super().__init__(cfg)
+        self._output = output or sys.stdout
+
+    def _report(self, **data):
+        """Write single line of report
+
+        :param data: dict
+        """
+        print(json.dumps(data), file=self._output, flush=True)
+
+    @staticmethod
+    def _apply(current, operation):
+        """Apply single operation to version
+
+        :param current: Version
+        :param operation: dict
+        :return: Version
+        :raise BatchError:
+        """
+        errors = field_errors(operation)
+        if errors:
+            raise BatchError('; '.join(errors))
+
+        command = operation.get('command')
+        if command == 'up':
+            try:
+                return current.up(operation['part'], operation.get('value'))
+            except ValueError as exc:
+                raise BatchError(str(exc)) from exc
+
+        if command == 'set':
+            if operation.get('value'):
+                try:
+                    return version.Version(operation['value'])
+                except ValueError as exc:
+                    raise version.InvalidVersionError("Cannot parse version string: %s" % operation['value']) from exc
+
+            new = current
+            fields = [field for field in version.Version.VALID_FIELDS if operation.get(field) is not None]
+            if not fields:
+                raise BatchError("Version is not specified")
+            for field in fields:
+                new = new.set(field, operation[field])
+            return new
+
+        raise BatchError("Unknown command: %s" % command)
+
+    def _read_operations(self):
+        """Parse operations from input
+
+        :return: generator of (step, operation)
+        :raise BatchError:
+        """
+        step = 0
+        for line in self.cfg.value:
+            if not line.strip():
+                continue
+
+            step += 1
+            try:
+                operation = json.loads(line)
+                if not isinstance(operation, dict):
+                    raise ValueError("Operation must be an object")
+            except ValueError as exc:
+                raise BatchError("Invalid operation in step %d: %s" % (step, exc)) from exc
+
+            yield step, operation
+
+    def run(self):
+        # input is read before taking lock, to not block other processes while waiting for it
+        operations = list(self._read_operations())
+
+        with lock.locked(self.cfg.version_file):
+            return self._run(operations)
+
+    def _run(self, operations):
+        version_file = version.VersionFile(self.cfg.version_file, self.cfg.version_format)
+        current = version_file.read()
+        new = current
+        tags = []
+
+        for step, operation in operations:
+            command = operation.get('command')
+            try:
+                if command == 'tag':
+                    tags.append((step, operation.get('params') or self.cfg.vcs_tag_params))
+                    self._report(step=step, command=command, ok=True, current_version=str(new), deferred=True)
+                    continue
+
+                if command == 'up' and not operation.get('part'):
+                    operation['part'] = self.cfg.up_part
+                new = self._apply(new, operation)
+            except VersionnerError as exc:
+                self._report(step=step, command=command, ok=False, error=exc.__class__.__name__, message=str(exc))
+                raise BatchError("Step %d failed, nothing was changed" % step) from exc
+
+            self._report(step=step, command=command, ok=True, current_version=str(new))
+
+        changed = str(new) != str(current)
+        modified_files = {'changes': 0, 'files': 0}
+        if changed:
+            try:
+                modified_files = save_version_and_update_files(self.cfg, version_file, new)
+            except vcs.errors.VCSError as exc:
+                self._report(ok=False, error=exc.__class__.__name__, message=str(exc))
+                raise BatchError("Saving version %s failed" % new) from exc
+
+        for step, params in tags:
+            try:
+                vcs.VCS(self.cfg.vcs_engine, self.cfg.vcs_root).create_tag(new, params)
+            except vcs.errors.VCSError as exc:
+                self._report(step=step, command='tag', ok=False, error=exc.__class__.__name__, message=str(exc))
+                raise BatchError("Tag in step %d failed" % step) from exc
+            self._report(step=step, command='tag', ok=True, current_version=str(new))
+
+        self._report(ok=True, current_version=str(new), modifications=modified_files['changes'],
+            modified_files=modified_files['files'], committed=bool(self.cfg.commit and changed))
+
+        return CommandOutput(new, modified_files['changes'], modified_files['files'])
@@ -0,0 +1,232 @@
+"""Class for command: check"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import re
+import sys
+
+from versionner.commands import Command, CommandOutput
+from versionner import defaults
+from versionner import version
+from versionner.commands.files_management import render_replace
+from versionner.errors import VersionnerError
+
+Mismatch = namedtuple('Mismatch', ['filename', 'line', 'found', 'expected'])
+
+# placeholder for %(date)s, date in project file can't be verified (it's a date of last change)
+_DATE_PLACEHOLDER = '\x00date\x00'
+_QUANTIFIERS = '*?{'
+_INLINE_FLAGS_RXP = re.compile(r'\(\?[aiLmsux-]*[ix]')
+
+
+class ConsistencyError(VersionnerError):
+    """Project files don't contain current version"""
+    ret_code = 1
+
+
+def required_literal(pattern, flags=0):
+    """Find the longest literal text, which must occur in every match of pattern.
+    Only top-level part of pattern is analyzed, so result can be shorter than possible, but never wrong.
+
+    :param pattern:str: regular expression
+    :param flags:int: regular expression flags
+    :return:str|None
+    """
+    if flags & (re.IGNORECASE | re.VERBOSE) or '|' in pattern or _INLINE_FLAGS_RXP.search(pattern):
+        return None
+
+    runs = ['']
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        i += 1
+
+        if char == '\\':
+            escaped = pattern[i:i + 1]
+            i += 1
+            if escaped and not escaped.isalnum():
+                if depth == 0:
+                    runs[-1] += escaped
+                continue
+        elif char in _QUANTIFIERS:
+            # quantified character is optional, or repeated unknown number of times
+            runs[-1] = runs[-1][:-1]
+            if char == '{':
+                end = pattern.find('}', i)
+                i = len(pattern) if end < 0 else end + 1
+        elif char == '[':
+            i += 1 if pattern[i:i + 1] == ']' else 0
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char not in '.^$+':
+            if depth == 0:
+                runs[-1] += char
+            continue
+
+        runs.append('')
+
+    literal = max(runs, key=len)
+    return literal or None
+
+
+def _literal_bytes(literal, encoding):
+    """Encode literal for searching in raw file content, if encoding allows it (is ASCII compatible)
+
+    :param literal:str|None
+    :param encoding:str
+    :return:bytes|None
+    """
+    if literal is None:
+        return None
+
+    try:
+        if '\n'.encode(encoding) != b'\n':
+            return None
+        return literal.encode(encoding)
+    except (UnicodeError, LookupError):
+        return None
+
+
+def _candidate_lines(data, needle):
+    """Find lines containing needle
+
+    :param data:bytes: file content
+    :param needle:bytes
+    :return: generator of (line number, line)
+    """
+    line_no = 1
+    line_start = 0
+    pos = data.find(needle)
+    while pos >= 0:
+        line_no += data.count(b'\n', line_start, pos)
+        line_start = data.rfind(b'\n', 0, pos) + 1
+        line_end = data.find(b'\n', pos)
+        if line_end < 0:
+            line_end = len(data)
+
+        yield line_no, data[line_start:line_end]
+
+        line_start = line_end
+        pos = data.find(needle, line_end)
+
+
+def _is_consistent(found, expected):
+    """Compare matched text with expected one, %(date)s placeholder matches any text
+
+    :param found:str
+    :param expected:str
+    :return:bool
+    """
+    if _DATE_PLACEHOLDER not in expected:
+        return found == expected
+
+    parts = (re.escape(part) for part in expected.split(_DATE_PLACEHOLDER))
+    return re.fullmatch('.+?'.join(parts), found, re.DOTALL) is not None
+
+
+def check_project_file(project_file, proj_version, date_format):
+    """Verify that every match of `search` in project file already contains given version
+
+    :param project_file:FileConfig
+    :param proj_version:Version
+    :param date_format:date format used if not specified for project file
+    :return: list of Mismatch
+    """
+    try:
+        data = project_file.file.read_bytes()
+    except OSError as exc:
+        return [Mismatch(project_file.filename, None, None, str(exc))]
+
+    rxp = re.compile(project_file.search, project_file.search_flags)
+    replace = render_replace(project_file, proj_version, date_format, _DATE_PLACEHOLDER)
+    needle = _literal_bytes(required_literal(project_file.search, project_file.search_flags), project_file.encoding)
+
+    if needle is not None and needle not in data:
+        lines = []
+    elif needle is not None and project_file.match == 'line':
+        lines = ((line_no, line.rstrip(b'\r').decode(project_file.encoding) + '\n')
+            for (line_no, line) in _candidate_lines(data, needle))
+    else:
+        text = data.decode(project_file.encoding).replace('\r\n', '\n').replace('\r', '\n')
+        if project_file.match == 'line':
+            lines = enumerate(text.splitlines(True), 1)
+        else:
+            lines = [(1, text)]
+
+    mismatches = []
+    found_any = False
+    for (line_no, line) in lines:
+        for match in rxp.finditer(line):
+            found_any = True
+            expected = match.expand(replace)
+            if not _is_consistent(match.group(0), expected):
+                if project_file.match == 'file':
+                    line_no = line.count('\n', 0, match.start()) + 1
+                mismatches.append(Mismatch(project_file.filename, line_no, match.group(0).strip(),
+                    expected.replace(_DATE_PLACEHOLDER, '<date>').strip()))
+
+    if not found_any:
+        mismatches.append(Mismatch(project_file.filename, None, None, "version string not found"))
+
+    return mismatches
+
+
+class Check(Command):
+    """Realize tasks for 'check' command
+    Verifies (without modifying anything) that all project files contain current version.
+    """
+
+    raw_output = True
+
+    def __init__(self, cfg, output=None):
+        super().__init__(cfg)
+        self._output = output or sys.stdout
+
+    def _rules(self):
+        """Collect all rules to verify
+
+        :return: list of (FileConfig, Version, date_format)
+        """
+        rules = []
+        if self.cfg.files:
+            current = version.VersionFile(self.cfg.version_file, self.cfg.version_format).read()
+            rules.extend((project_file, current, self.cfg.date_format) for project_file in self.cfg.files)
+
+        for project in self.cfg.projects.values():
+            if not project.version_file.exists():
+                continue
+            current = version.VersionFile(project.version_file, project.version_format).read()
+            rules.extend((project_file, current, project.date_format) for project_file in project.files)
+
+        return rules
+
+    def run(self):
+        rules = self._rules()
+
+        # rules are split into contiguous chunks, one per worker: submitting separate task for every
+        # file costs more than checking it
+        size = -(-len(rules) // defaults.DEFAULT_WORKERS) or 1
+        chunks = [rules[i:i + size] for i in range(0, len(rules), size)]
+        with ThreadPoolExecutor(max_workers=defaults.DEFAULT_WORKERS) as pool:
+            results = pool.map(lambda chunk: [check_project_file(*rule) for rule in chunk], chunks)
+            mismatches = [mismatch for result in results for mismatches in result for mismatch in mismatches]
+        for mismatch in mismatches:
+            location = mismatch.filename if mismatch.line is None else '%s:%d' % (mismatch.filename, mismatch.line)
+            if mismatch.found is None:
+                print('%s: %s' % (location, mismatch.expected), file=self._output)
+            else:
+                print('%s: found "%s", expected "%s"' % (location, mismatch.found, mismatch.expected), file=self._output)
+
+        if mismatches:
+            raise ConsistencyError("%d of %d project files are inconsistent" % (
+                len({mismatch.filename for mismatch in mismatches}), len(rules)))
+
+        print("All %d project files are consistent" % len(rules), file=self._output)
+
+        return CommandOutput(None, 0, 0)
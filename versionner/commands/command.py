@@ -1,16 +1,38 @@
 """Abstract class for commands"""
 
 from collections import namedtuple
+import time
 
+from versionner import hooks
 
-class CommandOutput(namedtuple('CommandOutput', ['current_version', 'modifications', 'modified_files'])):
-    """Output structure for Command.execute result"""
-    def __new__(cls, current_version, modifications=None, modified_files=None):
-        return super(CommandOutput, cls).__new__(cls, current_version, modifications, modified_files)
+
+class CommandOutput(namedtuple('CommandOutput', ['current_version', 'modifications', 'modified_files', 'projects'])):
+    """Output structure for Command.execute result
+    For commands working on many projects, `projects` is a dict with new version for every project.
+    """
+    def __new__(cls, current_version, modifications=None, modified_files=None, projects=None):
+        return super(CommandOutput, cls).__new__(cls, current_version, modifications, modified_files, projects)
+
+
+async def in_executor(func, *args):
+    """Run blocking function in default executor of running event loop
+
+    :param func: callable
+    :param args: arguments for func
+    :return: result of func
+    """
+    # asyncio is already imported when coroutine is running, so it doesn't slow down startup
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
 
 
 class Command:
     """Abstract class for commands"""
+
+    # command prints its result by itself
+    raw_output = False
+
     def __init__(self, cfg):
         self.cfg = cfg
 
@@ -19,7 +41,56 @@ class Command:
 
         :return:
         """
-        return self.run()
+        if not hooks.enabled(hooks.PRE_COMMAND, hooks.POST_COMMAND):
+            return self.run()
+
+        hooks.emit(hooks.PRE_COMMAND, command=self, cfg=self.cfg)
+
+        start = time.perf_counter()
+        result = error = None
+        try:
+            result = self.run()
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            hooks.emit(hooks.POST_COMMAND, command=self, cfg=self.cfg, result=result, error=error,
+                duration=time.perf_counter() - start)
+
+        return result
+
+    async def execute_async(self):
+        """Asynchronous version of Command.execute, for use in asyncio event loop.
+        Files are read and written in executor, and VCS commands are executed as asyncio subprocesses,
+        so many commands (ie. for many projects) can be executed concurrently.
+
+        :return:
+        """
+        if not hooks.enabled(hooks.PRE_COMMAND, hooks.POST_COMMAND):
+            return await self.run_async()
+
+        hooks.emit(hooks.PRE_COMMAND, command=self, cfg=self.cfg)
+
+        start = time.perf_counter()
+        result = error = None
+        try:
+            result = await self.run_async()
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            hooks.emit(hooks.POST_COMMAND, command=self, cfg=self.cfg, result=result, error=error,
+                duration=time.perf_counter() - start)
+
+        return result
+
+    async def run_async(self):
+        """Asynchronous version of Command.run, by default executes Command.run in executor.
+        Shouldn't be executed directly, use Command.execute_async
+
+        @return:
+        """
+        return await in_executor(self.run)
 
     def run(self):
         """Abstract method for executing commands.
@@ -1,5 +1,7 @@
 """Helpers for commands related to manipulating files"""
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pathlib
 import re
 import shutil
@@ -7,10 +9,122 @@ import sys
 import tempfile
 import time
 
+from versionner import defaults
+from versionner import hooks
+from versionner import profiling
 from versionner import vcs
+from versionner import version
+from versionner.commands.command import in_executor
 from versionner.errors import ConfigError
 
 
+def render_replace(project_file, proj_version, date_format, date=None):
+    """
+    Fill placeholders in `replace` of project file
+
+    :param project_file:FileConfig
+    :param proj_version:current version
+    :param date_format:date format used if not specified for project file
+    :param date:str: value used for %(date)s placeholder instead of current date
+    :return:str
+    """
+    if date is None:
+        date = time.strftime(project_file.date_format or date_format)
+
+    return project_file.replace % {
+        "date": date,
+        "major": proj_version.major,
+        "minor": proj_version.minor,
+        "patch": proj_version.patch,
+        "prerelease": proj_version.prerelease,
+        "version": str(proj_version),
+        "build": proj_version.build,
+    }
+
+
+def update_project_file(project_file, proj_version, date_format):
+    """
+    Update version string in single project file, and emit pre_file_rewrite/post_file_rewrite hooks
+
+    :rtype : int
+    :param project_file:FileConfig
+    :param proj_version:current version
+    :param date_format:date format used if not specified for project file
+    :return:int: number of changes :raise ConfigError:
+    """
+    if not hooks.enabled(hooks.PRE_FILE_REWRITE, hooks.POST_FILE_REWRITE):
+        return _rewrite_project_file(project_file, proj_version, date_format)
+
+    hooks.emit(hooks.PRE_FILE_REWRITE, project_file=project_file, version=proj_version)
+
+    start = time.perf_counter()
+    changes = error = None
+    try:
+        changes = _rewrite_project_file(project_file, proj_version, date_format)
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        hooks.emit(hooks.POST_FILE_REWRITE, project_file=project_file, version=proj_version, changes=changes,
+            error=error, duration=time.perf_counter() - start)
+
+    return changes
+
+
+def _rewrite_project_file(project_file, proj_version, date_format):
+    """
+    Update version string in single project file
+
+    :rtype : int
+    :param project_file:FileConfig
+    :param proj_version:current version
+    :param date_format:date format used if not specified for project file
+    :return:int: number of changes :raise ConfigError:
+    """
+    if not project_file.file.exists():
+        print("File \"%s\" not found" % project_file.filename, file=sys.stderr)
+        return 0
+
+    # prepare data
+    rxp = re.compile(project_file.search, project_file.search_flags)
+    replace = render_replace(project_file, proj_version, date_format)
+
+    # update project files
+    with \
+            profiling.span('rewrite %s' % project_file.filename, 'file', match=project_file.match) as info, \
+            project_file.file.open(mode="r", encoding=project_file.encoding) as fh_in, \
+            tempfile.NamedTemporaryFile(mode="w", encoding=project_file.encoding, delete=False) as fh_out:
+        if project_file.match == 'line':
+            changes = 0
+            for line in fh_in:
+                (line, cnt) = rxp.subn(replace, line)
+                if cnt:
+                    changes += cnt
+                fh_out.write(line)
+
+        elif project_file.match == 'file':
+            data = fh_in.read()
+            (data, changes) = rxp.subn(replace, data)
+            fh_out.write(data)
+
+        else:
+            raise ConfigError("Unknown match type: \"%s\"" % project_file.match)
+
+        if info is not None:
+            info['substitutions'] = changes
+            # positions in binary streams under text files, both were processed to the end
+            fh_out.flush()
+            info['bytes_read'] = fh_in.buffer.tell()
+            info['bytes_written'] = fh_out.buffer.tell()
+
+        fh_out.close()
+
+        shutil.copystat(project_file.filename, fh_out.name)
+        shutil.move(fh_out.name, project_file.filename)
+
+    return changes
+
+
 def update_project_files(cfg, proj_version):
     """
     Update version string in project files
@@ -23,57 +137,31 @@ def update_project_files(cfg, proj_version):
     counters = {'files': 0, 'changes': 0}
 
     for project_file in cfg.files:
-        if not project_file.file.exists():
-            print("File \"%s\" not found" % project_file.filename, file=sys.stderr)
-            continue
-
-        # prepare data
-        date_format = project_file.date_format or cfg.date_format
-
-        rxp = re.compile(project_file.search, project_file.search_flags)
-        replace = project_file.replace % {
-            "date": time.strftime(date_format),
-            "major": proj_version.major,
-            "minor": proj_version.minor,
-            "patch": proj_version.patch,
-            "prerelease": proj_version.prerelease,
-            "version": str(proj_version),
-            "build": proj_version.build,
-        }
-
-        # update project files
-        with \
-                project_file.file.open(mode="r", encoding=project_file.encoding) as fh_in, \
-                tempfile.NamedTemporaryFile(mode="w", encoding=project_file.encoding, delete=False) as fh_out:
-            if project_file.match == 'line':
-                changes = 0
-                for line in fh_in:
-                    (line, cnt) = rxp.subn(replace, line)
-                    if cnt:
-                        changes += cnt
-                    fh_out.write(line)
-
-                if changes:
-                    counters['files'] += 1
-                    counters['changes'] += changes
-
-            elif project_file.match == 'file':
-                data = fh_in.read()
-                (data, cnt) = rxp.subn(replace, data)
-                if cnt:
-                    counters['files'] += 1
-                    counters['changes'] += cnt
-                fh_out.write(data)
+        changes = update_project_file(project_file, proj_version, cfg.date_format)
+        if changes:
+            counters['files'] += 1
+            counters['changes'] += changes
 
-            else:
-                raise ConfigError("Unknown match type: \"%s\"" % project_file.match)
+    return counters
 
-            fh_out.close()
 
-            shutil.copystat(project_file.filename, fh_out.name)
-            shutil.move(fh_out.name, project_file.filename)
+def verify_expected(cfg, current):
+    """Compare current version with expected one (`--expect`), if given
 
-    return counters
+    :param cfg: configuration storage
+    :param current: Version
+    :raise VersionMismatchError:
+    """
+    if cfg.expect is None:
+        return
+
+    try:
+        expected = version.Version(cfg.expect)
+    except ValueError as exc:
+        raise version.InvalidVersionError("Cannot parse version string: %s" % cfg.expect) from exc
+
+    if str(current) != str(expected):
+        raise version.VersionMismatchError("Current version is %s, but %s was expected" % (current, expected))
 
 
 def save_version_and_update_files(cfg, version_file, version_to_save):
@@ -84,18 +172,157 @@ def save_version_and_update_files(cfg, version_file, version_to_save):
     :param version_to_save:
     :return:
     """
-    with vcs.VCS(cfg.vcs_engine) as vcs_handler:
+    with vcs.VCS(cfg.vcs_engine, cfg.vcs_root) as vcs_handler:
         if cfg.commit:
             vcs_handler.raise_if_cant_commit()
 
-        version_file.write(version_to_save)
-
-        quant = update_project_files(cfg, version_to_save)
+        quant = write_version_and_update_files(cfg, version_file, version_to_save)
 
         if cfg.commit:
-            files = {str(file.file) for file in cfg.files}
-            files.add(str(cfg.version_file))
-            vcs_handler.add_to_stage(files)
+            vcs_handler.add_to_stage(commit_paths(cfg))
             vcs_handler.create_commit(cfg.vcs_commit_message % {'version': version_to_save})
 
     return quant
+
+
+async def save_version_and_update_files_async(cfg, version_file, version_to_save):
+    """Asynchronous version of save_version_and_update_files: files are written in executor,
+    and VCS commands are executed as asyncio subprocesses
+
+    :param cfg:
+    :param version_file:
+    :param version_to_save:
+    :return:
+    """
+    vcs_handler = vcs.VCS(cfg.vcs_engine, cfg.vcs_root)
+    if cfg.commit:
+        await vcs_handler.raise_if_cant_commit_async()
+
+    quant = await in_executor(write_version_and_update_files, cfg, version_file, version_to_save)
+
+    if cfg.commit:
+        await vcs_handler.add_to_stage_async(commit_paths(cfg))
+        await vcs_handler.create_commit_async(cfg.vcs_commit_message % {'version': version_to_save})
+
+    return quant
+
+
+def write_version_and_update_files(cfg, version_file, version_to_save):
+    """Save version to version_file and update project files, without committing
+
+    :param cfg:
+    :param version_file:
+    :param version_to_save:
+    :return:
+    """
+    version_file.write(version_to_save)
+
+    return update_project_files(cfg, version_to_save)
+
+
+def commit_paths(cfg):
+    """Paths of version file and project files, to add to commit
+
+    :param cfg:
+    :return:set
+    """
+    files = {str(file.file.absolute()) for file in cfg.files}
+    files.add(str(pathlib.Path(cfg.version_file).absolute()))
+
+    return files
+
+
+def _update_files_group(rules):
+    """Apply all rules for single file, one by one
+
+    :param rules: list of (FileConfig, Version, date_format)
+    :return: list of changes count, for every rule
+    """
+    return [update_project_file(project_file, proj_version, date_format)
+        for (project_file, proj_version, date_format) in rules]
+
+
+def save_versions_and_update_files(cfg, versions):
+    """Save versions of many projects, update their project files in one parallel pass,
+    and commit all changes at once if required
+
+    :param cfg: configuration storage
+    :param versions: list of (ProjectConfig, VersionFile, Version)
+    :return:dict
+    """
+    groups = _group_project_files(versions)
+
+    with vcs.VCS(cfg.vcs_engine, cfg.vcs_root) as vcs_handler:
+        if cfg.commit:
+            vcs_handler.raise_if_cant_commit()
+
+        quant = _write_versions_and_update_files(versions, groups)
+
+        if cfg.commit:
+            vcs_handler.add_to_stage(_commit_paths_many(versions, groups))
+            vcs_handler.create_commit(cfg.vcs_commit_message % {'version': _versions_message(versions)})
+
+    return quant
+
+
+async def save_versions_and_update_files_async(cfg, versions):
+    """Asynchronous version of save_versions_and_update_files: files are written in executor,
+    and VCS commands are executed as asyncio subprocesses
+
+    :param cfg: configuration storage
+    :param versions: list of (ProjectConfig, VersionFile, Version)
+    :return:dict
+    """
+    groups = _group_project_files(versions)
+
+    vcs_handler = vcs.VCS(cfg.vcs_engine, cfg.vcs_root)
+    if cfg.commit:
+        await vcs_handler.raise_if_cant_commit_async()
+
+    quant = await in_executor(_write_versions_and_update_files, versions, groups)
+
+    if cfg.commit:
+        await vcs_handler.add_to_stage_async(_commit_paths_many(versions, groups))
+        await vcs_handler.create_commit_async(cfg.vcs_commit_message % {'version': _versions_message(versions)})
+
+    return quant
+
+
+def _group_project_files(versions):
+    """Group rules of project files by path, rules for the same file must be applied sequentially
+
+    :param versions: list of (ProjectConfig, VersionFile, Version)
+    :return: OrderedDict: path -> list of (FileConfig, Version, date_format)
+    """
+    groups = OrderedDict()
+    for (project, _, version_to_save) in versions:
+        for project_file in project.files:
+            path = str(project_file.file.absolute())
+            groups.setdefault(path, []).append((project_file, version_to_save, project.date_format))
+
+    return groups
+
+
+def _write_versions_and_update_files(versions, groups):
+    quant = {'files': 0, 'changes': 0}
+    with ThreadPoolExecutor(max_workers=defaults.DEFAULT_WORKERS) as pool:
+        list(pool.map(lambda item: item[1].write(item[2]), versions))
+
+        for changes in pool.map(_update_files_group, groups.values()):
+            for cnt in changes:
+                if cnt:
+                    quant['files'] += 1
+                    quant['changes'] += cnt
+
+    return quant
+
+
+def _commit_paths_many(versions, groups):
+    files = set(groups)
+    files.update(str(pathlib.Path(project.version_file).absolute()) for (project, _, _) in versions)
+
+    return files
+
+
+def _versions_message(versions):
+    return ', '.join('%s %s' % (project.name, new) for (project, _, new) in versions)
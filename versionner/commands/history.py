@@ -0,0 +1,96 @@
+"""Class for command: history"""
+
+import json
+import os
+import sys
+import time
+
+from versionner.commands import Command, CommandOutput
+from versionner import cache
+from versionner import defaults
+from versionner import vcs
+from versionner.errors import ConfigError
+
+
+def versions_history(records):
+    """Find version transitions in commits changing version file
+
+    :param records: iterable of (commit hash, timestamp, removed lines, added lines), see VCS.log_file
+    :return: generator of [commit hash, timestamp, version, previous version or None]
+    """
+    for (commit, timestamp, removed, added) in records:
+        version = next((line.strip() for line in added if line.strip()), None)
+        previous = next((line.strip() for line in removed if line.strip()), None)
+        # file removed, or only whitespace changed
+        if version is None or version == previous:
+            continue
+
+        yield [commit, timestamp, version, previous]
+
+
+class History(Command):
+    """Realize tasks for 'history' command
+    Prints commits which changed version, newest first. Log of version file is streamed from VCS,
+    so rows are printed as soon as they are found. Results are cached (keyed by current commit),
+    and next time only newer commits are read from VCS.
+    """
+
+    raw_output = True
+
+    def __init__(self, cfg, output=None):
+        super().__init__(cfg)
+        self._output = output or sys.stdout
+
+    def _print(self, row):
+        """Print single row in format selected with --output
+
+        :param row: [commit hash, timestamp, version, previous version]
+        """
+        (commit, timestamp, version, previous) = row
+        if self.cfg.output == 'json':
+            line = json.dumps({'commit': commit, 'timestamp': timestamp,
+                'date': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp)),
+                'version': version, 'previous': previous})
+        elif self.cfg.output == 'plain':
+            line = '%s %s' % (version, commit)
+        else:
+            line = '%s  %s  %s' % (time.strftime(self.cfg.date_format, time.localtime(timestamp)), commit[:12], version)
+
+        print(line, file=self._output)
+
+    def run(self):
+        if self.cfg.version_format != defaults.DEFAULT_VERSION_FORMAT:
+            raise ConfigError("History is available only for version files in \"%s\" format" %
+                defaults.DEFAULT_VERSION_FORMAT)
+
+        path = os.path.abspath(str(self.cfg.version_file))
+        vcs_handler = vcs.VCS(self.cfg.vcs_engine, self.cfg.vcs_root)
+
+        head = vcs_handler.head()
+        if head is None:
+            return CommandOutput(None)
+
+        cache_file = cache.cache_file('history', path) if cache.enabled() else None
+        data = cache.load(cache_file) if cache_file else None
+        if not isinstance(data, dict) or data.get('path') != path:
+            data = {'head': None, 'rows': []}
+
+        since = data['head']
+        # history was rewritten (ie. rebased), cached rows may be not valid anymore
+        if since is not None and since != head and not vcs_handler.is_ancestor(since, head):
+            (since, data['rows']) = (None, [])
+
+        rows = []
+        if since != head:
+            for row in versions_history(vcs_handler.log_file(path, since)):
+                self._print(row)
+                rows.append(row)
+
+        for row in data['rows']:
+            self._print(row)
+        rows.extend(data['rows'])
+
+        if cache_file and since != head:
+            cache.save(cache_file, {'path': path, 'head': head, 'rows': rows})
+
+        return CommandOutput(None)
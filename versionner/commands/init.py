@@ -2,18 +2,35 @@
 
 from versionner.commands import Command, CommandOutput
 from versionner import version
-from versionner.commands.files_management import save_version_and_update_files
+from versionner.commands.files_management import save_version_and_update_files, \
+    save_version_and_update_files_async
 
 class Init(Command):
     """Realize tasks for 'init' command"""
     def run(self):
-        version_file = version.VersionFile(self.cfg.version_file)
+        (version_file, current) = self._prepare()
+
+        modified_files = save_version_and_update_files(self.cfg, version_file, current)
+
+        return CommandOutput(current, modified_files['changes'], modified_files['files'])
+
+    async def run_async(self):
+        (version_file, current) = self._prepare()
+
+        modified_files = await save_version_and_update_files_async(self.cfg, version_file, current)
+
+        return CommandOutput(current, modified_files['changes'], modified_files['files'])
+
+    def _prepare(self):
+        """Parse initial version
+
+        :return: (VersionFile, Version)
+        """
+        version_file = version.VersionFile(self.cfg.version_file, self.cfg.version_format)
 
         try:
             current = version.Version(self.cfg.value)
         except ValueError as exc:
             raise version.InvalidVersionError("Cannot parse version string: %s" % self.cfg.value) from exc
 
-        modified_files = save_version_and_update_files(self.cfg, version_file, current)
-
-        return CommandOutput(current, modified_files['changes'], modified_files['files'])
+        return version_file, current
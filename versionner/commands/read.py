@@ -1,14 +1,21 @@
 """Class for command: read"""
 
-from versionner.commands import Command, CommandOutput
+from versionner.commands import Command, CommandOutput, in_executor
 from versionner import version
 
 
 class Read(Command):
     """Realize tasks for 'read' command"""
     def run(self):
-        version_file = version.VersionFile(self.cfg.version_file)
+        version_file = version.VersionFile(self.cfg.version_file, self.cfg.version_format)
 
         current = version_file.read()
 
         return CommandOutput(current)
+
+    async def run_async(self):
+        version_file = version.VersionFile(self.cfg.version_file, self.cfg.version_format)
+
+        current = await in_executor(version_file.read)
+
+        return CommandOutput(current)
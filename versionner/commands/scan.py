@@ -0,0 +1,228 @@
+"""Class for command: scan"""
+
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import os
+import re
+import subprocess
+import sys
+
+from versionner.commands import Command, CommandOutput
+from versionner import defaults
+from versionner import vcs
+from versionner import version
+from versionner.vcs.errors import VCSError
+
+Candidate = namedtuple('Candidate', ['filename', 'line', 'text', 'search', 'replace'])
+
+# generic version string, used in suggested `search` rules
+VERSION_PATTERN = r'\d+\.\d+\.\d+[\w.+-]*'
+# size of file head checked for NUL bytes, to skip binary files
+_BINARY_CHECK_SIZE = 8192
+
+
+def list_files(cfg):
+    """List files to scan: using VCS (respects ignored files) if possible, or walking directories
+    in current directory
+
+    :param cfg: configuration storage
+    :return: list of paths relative to current directory
+    """
+    try:
+        with vcs.VCS(cfg.vcs_engine, cfg.vcs_root) as vcs_handler:
+            paths = vcs_handler.list_files()
+    except (VCSError, OSError, subprocess.SubprocessError):
+        return walk()
+
+    # paths are compared as strings, os.path functions are too slow for hundreds of thousands of files
+    prefix = os.path.join(os.getcwd(), '')
+    return [path[len(prefix):] if os.path.isabs(path) else path for path in paths
+        if path.startswith(prefix) or not os.path.isabs(path)]
+
+
+def _scan_dir(path):
+    """List single directory
+
+    :param path:str: path relative to current directory, empty for current directory
+    :return: (files, subdirectories)
+    """
+    files = []
+    dirs = []
+    prefix = path + os.sep if path else ''
+    try:
+        with os.scandir(path or os.curdir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(prefix + entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append(prefix + entry.name)
+    except OSError:
+        pass
+
+    return files, dirs
+
+
+def walk():
+    """List files in current directory tree (skipping hidden files and directories), directories
+    on every level are listed in parallel
+
+    :return: list of paths relative to current directory
+    """
+    files = []
+    dirs = ['']
+    with ThreadPoolExecutor(max_workers=defaults.DEFAULT_WORKERS) as pool:
+        while dirs:
+            next_dirs = []
+            for (dir_files, subdirs) in pool.map(_scan_dir, dirs):
+                files.extend(dir_files)
+                next_dirs.extend(subdirs)
+            dirs = next_dirs
+
+    return sorted(files)
+
+
+def _escape(text):
+    """Escape text for regular expression, but keep spaces readable"""
+    return re.escape(text).replace('\\ ', ' ')
+
+
+def _suggest(line, match):
+    """Build `search` and `replace` rules for line containing version string
+
+    :param line:str
+    :param match: match of version string
+    :return: (search, replace)
+    """
+    prefix = line[:match.start()].lstrip()
+    suffix = line[match.end():].rstrip()
+
+    search = _escape(prefix) + VERSION_PATTERN + _escape(suffix)
+    # `replace` is filled with `%` operator, so literal percent signs must be escaped
+    replace = prefix.replace('%', '%%') + '%(version)s' + suffix.replace('%', '%%')
+
+    return search, replace
+
+
+def scan_file(path, needle, rxp):
+    """Find lines with version string in single file
+
+    :param path:str
+    :param needle:bytes: literal text present in every version string searched for
+    :param rxp: compiled regular expression (bytes) matching version strings
+    :return: list of Candidate
+    """
+    try:
+        with open(path, 'rb') as fh:
+            data = fh.read()
+    except OSError:
+        return []
+
+    if needle not in data or b'\0' in data[:_BINARY_CHECK_SIZE]:
+        return []
+
+    candidates = []
+    line_no = 1
+    line_start = 0
+    pos = data.find(needle)
+    while pos >= 0:
+        line_no += data.count(b'\n', line_start, pos)
+        line_start = data.rfind(b'\n', 0, pos) + 1
+        line_end = data.find(b'\n', pos)
+        if line_end < 0:
+            line_end = len(data)
+
+        raw_line = data[line_start:line_end]
+        match = rxp.search(raw_line)
+        if match:
+            try:
+                line = raw_line.decode('utf-8').rstrip('\r')
+            except UnicodeDecodeError:
+                return []
+
+            match = re.search(re.escape(match.group(0).decode('utf-8')), line)
+            (search, replace) = _suggest(line, match)
+            candidates.append(Candidate(path, line_no, line.strip(), search, replace))
+
+        line_start = line_end
+        pos = data.find(needle, line_end)
+
+    return candidates
+
+
+def version_rxp(current):
+    """Build expression matching given version (and its major.minor.patch part) in bytes
+
+    :param current: Version
+    :return: (needle, compiled regular expression)
+    """
+    core = '%d.%d.%d' % (current.major, current.minor, current.patch)
+    variants = sorted({str(current), core}, key=len, reverse=True)
+    pattern = r'(?<![\d.])(?:%s)(?![\w+-]|\.\d)' % '|'.join(re.escape(variant) for variant in variants)
+
+    return core.encode('ascii'), re.compile(pattern.encode('ascii'))
+
+
+class Scan(Command):
+    """Realize tasks for 'scan' command
+    Searches repository for current version string, and prints candidate `[file:*]` sections.
+    """
+
+    raw_output = True
+
+    def __init__(self, cfg, output=None):
+        super().__init__(cfg)
+        self._output = output or sys.stdout
+
+    def _skip(self):
+        """Paths which shouldn't be reported: version file, config files and already configured files
+
+        :return: set of paths relative to current directory
+        """
+        paths = {self.cfg.version_file} | set(self.cfg.config_files)
+        paths.update(project_file.file for project_file in self.cfg.files)
+        for project in self.cfg.projects.values():
+            paths.add(project.version_file)
+            paths.update(project_file.file for project_file in project.files)
+
+        return {os.path.relpath(str(path)) for path in paths}
+
+    def scan(self, current):
+        """Find candidates for project files
+
+        :param current: Version
+        :return: list of Candidate
+        """
+        skip = self._skip()
+        paths = [path for path in list_files(self.cfg) if path not in skip]
+        (needle, rxp) = version_rxp(current)
+
+        # paths are split into chunks: submitting separate task for every file costs more than scanning it
+        size = max(1, min(1000, -(-len(paths) // defaults.DEFAULT_WORKERS)))
+        chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+        with ThreadPoolExecutor(max_workers=defaults.DEFAULT_WORKERS) as pool:
+            results = pool.map(lambda chunk: [scan_file(path, needle, rxp) for path in chunk], chunks)
+            return [candidate for result in results for candidates in result for candidate in candidates]
+
+    def run(self):
+        current = version.VersionFile(self.cfg.version_file, self.cfg.version_format).read()
+        candidates = self.scan(current)
+
+        sections = OrderedDict()
+        for candidate in candidates:
+            rules = sections.setdefault(candidate.filename, OrderedDict())
+            rules.setdefault((candidate.search, candidate.replace), candidate)
+
+        for (filename, rules) in sections.items():
+            for (i, candidate) in enumerate(rules.values(), 1):
+                print('; %s:%d: %s' % (candidate.filename, candidate.line, candidate.text), file=self._output)
+                print('[file:%s%s]' % ('' if i == 1 else '%d:' % i, filename), file=self._output)
+                print('search = %s' % candidate.search, file=self._output)
+                print('replace = %s' % candidate.replace, file=self._output)
+                print(file=self._output)
+
+        if not sections:
+            print('; version %s not found in any file' % current, file=self._output)
+
+        return CommandOutput(current)
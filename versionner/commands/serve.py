@@ -0,0 +1,21 @@
+"""Class for command: serve"""
+
+from versionner.commands import Command, CommandOutput
+from versionner import server
+
+
+class Serve(Command):
+    """Realize tasks for 'serve' command"""
+    def run(self):
+        srv = server.Server(self.cfg.value, self.cfg)
+        print("Listening on %s" % srv.path, flush=True)
+
+        try:
+            srv.serve()
+        except KeyboardInterrupt:
+            pass
+
+        try:
+            return CommandOutput(srv.current_version())
+        finally:
+            srv.server_close()
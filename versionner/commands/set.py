@@ -1,21 +1,61 @@
 """Class for command: set"""
 
-from versionner.commands import Command, CommandOutput
+from versionner.commands import Command, CommandOutput, in_executor
+from versionner import counter
+from versionner import lock
 from versionner import version
-from versionner.commands.files_management import save_version_and_update_files
+from versionner.commands.files_management import save_version_and_update_files, \
+    save_version_and_update_files_async, verify_expected
 
 
 class Set(Command):
     """Realize tasks for 'set' command"""
     def run(self):
-        version_file = version.VersionFile(self.cfg.version_file)
+        build = self._next_build()
+        with lock.locked(self.cfg.version_file):
+            (version_file, new) = self._new_version(build)
+            modified_files = save_version_and_update_files(self.cfg, version_file, new)
+
+        return CommandOutput(new, modified_files['changes'], modified_files['files'])
+
+    async def run_async(self):
+        build = await in_executor(self._next_build)
+        async with lock.locked_async(self.cfg.version_file):
+            (version_file, new) = await in_executor(self._new_version, build)
+            modified_files = await save_version_and_update_files_async(self.cfg, version_file, new)
+
+        return CommandOutput(new, modified_files['changes'], modified_files['files'])
+
+    def _next_build(self):
+        """Allocate build number if requested (`--build auto`). It's done before taking lock of version file,
+        as the same lock protects build counter
+
+        :return:str or None
+        """
+        if isinstance(self.cfg.value, tuple) and self.cfg.value[-1] == counter.AUTO:
+            return counter.next_build(self.cfg)
+
+        return None
+
+    def _new_version(self, build=None):
+        """Read current version and build new one
+
+        :param build: allocated build number, used instead of `auto`
+        :return: (VersionFile, Version)
+        """
+        version_file = version.VersionFile(self.cfg.version_file, self.cfg.version_format)
         current = version_file.read()
+        verify_expected(self.cfg, current)
 
         if isinstance(self.cfg.value, tuple):
             new = version.Version(current)
 
+            fields = list(self.cfg.value)
+            if fields[-1] == counter.AUTO:
+                fields[-1] = build
+
             try:
-                for field, value in zip(version.Version.VALID_FIELDS, self.cfg.value):
+                for field, value in zip(version.Version.VALID_FIELDS, fields):
                     if value is not None:
                         new = new.set(field, value)
             except ValueError as exc:
@@ -26,6 +66,4 @@ class Set(Command):
             except ValueError as exc:
                 raise version.InvalidVersionError("Cannot parse version string: %s" % self.cfg.value) from exc
 
-        modified_files = save_version_and_update_files(self.cfg, version_file, new)
-
-        return CommandOutput(new, modified_files['changes'], modified_files['files'])
+        return version_file, new
@@ -0,0 +1,99 @@
+"""Helpers for increasing versions in git submodules (`ver up --recurse-submodules`)
+
+Every submodule has its own config file, and paths in config are relative to working directory,
+so `ver` is executed in separate process in directory of every submodule (many at once, with
+bounded pool of workers). Its result is read from `--output json`.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+import versionner
+from versionner import config
+from versionner import defaults
+from versionner import profiling
+from versionner import vcs
+from versionner.errors import VersionnerError
+
+# directory containing versionner package (or zipapp), added to PYTHONPATH of child processes
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(versionner.__file__)))
+
+
+class SubmoduleError(VersionnerError):
+    """Command failed in submodule"""
+
+
+def find(cfg):
+    """Find initialized submodules with their own config file
+
+    :param cfg: configuration storage
+    :return: list of pathlib.Path
+    """
+    with vcs.VCS(cfg.vcs_engine, cfg.vcs_root) as vcs_handler:
+        paths = [pathlib.Path(path) for path in vcs_handler.list_submodules()]
+
+    return [path for path in paths if (path / defaults.RC_FILENAME).exists()]
+
+
+def execute(path, args):
+    """Execute `ver` in submodule directory
+
+    :param path: path to submodule
+    :param args: list: arguments for `ver`
+    :return:dict: result of command (see `--output json`)
+    :raise SubmoduleError:
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (_PACKAGE_ROOT, env.get('PYTHONPATH'))))
+    # project config file from environment would be used instead of submodule's one
+    env.pop(config.ENV_VERSIONNER_PROJECT_CONFIG_FILE, None)
+
+    cmd = [sys.executable, '-m', 'versionner', '--output', 'json'] + list(args)
+    with profiling.span('submodule %s' % path, 'command') as info:
+        process = subprocess.run(cmd, cwd=str(path), env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        if info is not None:
+            info['returncode'] = process.returncode
+
+    try:
+        result = json.loads(process.stdout.decode().splitlines()[-1])
+    except (IndexError, ValueError):
+        result = {'ok': False, 'message': process.stderr.decode().strip() or
+            'process exited with code %d' % process.returncode}
+
+    if not result.get('ok'):
+        raise SubmoduleError('%s: %s' % (path, result.get('message')))
+
+    return result
+
+
+def execute_all(paths, args):
+    """Execute `ver` in many submodules in parallel
+
+    :param paths: list of paths to submodules
+    :param args: list: arguments for `ver`
+    :return:OrderedDict: path -> result of command
+    :raise SubmoduleError: when command failed in any submodule (it's still executed in all others)
+    """
+    with ThreadPoolExecutor(max_workers=defaults.DEFAULT_WORKERS) as pool:
+        futures = [(path, pool.submit(execute, path, args)) for path in paths]
+
+    results = OrderedDict()
+    failures = []
+    for (path, future) in futures:
+        try:
+            results[path] = future.result()
+        except SubmoduleError as exc:
+            failures.append(str(exc))
+
+    if failures:
+        done = ', '.join(str(path) for path in results)
+        raise SubmoduleError('Failed in %d of %d submodules (%s)%s' % (
+            len(failures), len(paths), '; '.join(failures), ', done in: %s' % done if done else ''))
+
+    return results
@@ -1,27 +1,64 @@
 """Class for command: tag"""
 
+import sys
 import traceback
 
-from versionner.commands import Command, CommandOutput
+from versionner.commands import Command, CommandOutput, in_executor
 from versionner import version
 from versionner import vcs
+from versionner.errors import VersionnerError
+
+
+class TagError(VersionnerError):
+    """VCS tag can't be created"""
 
 
 class Tag(Command):
     """Realize tasks for 'tag' command"""
     def run(self):
-        version_file = version.VersionFile(self.cfg.version_file)
+        version_file = version.VersionFile(self.cfg.version_file, self.cfg.version_format)
 
         current = version_file.read()
         try:
-            vcs_handler = vcs.VCS(self.cfg.vcs_engine)
+            vcs_handler = vcs.VCS(self.cfg.vcs_engine, self.cfg.vcs_root)
             vcs_handler.create_tag(current, self.cfg.vcs_tag_params)
         # pylint: disable=bare-except
         except:
-            print('Git tag failed, do it yourself')
-            if self.cfg.verbose:
-                traceback.print_exc()
+            self._report(sys.exc_info()[1])
+        else:
+            self._report(None)
+
+        return CommandOutput(current)
+
+    async def run_async(self):
+        version_file = version.VersionFile(self.cfg.version_file, self.cfg.version_format)
+
+        current = await in_executor(version_file.read)
+        try:
+            vcs_handler = vcs.VCS(self.cfg.vcs_engine, self.cfg.vcs_root)
+            await vcs_handler.create_tag_async(current, self.cfg.vcs_tag_params)
+        # not bare except: cancellation of task must be propagated
+        except Exception as exc:  # pylint: disable=broad-except
+            self._report(exc)
         else:
-            print('Git tag created')
+            self._report(None)
 
         return CommandOutput(current)
+
+    def _report(self, error):
+        """Print result of creating tag
+
+        :param error: exception raised while creating tag, None if it was created
+        :raise TagError: if tag wasn't created, and result is printed in machine readable format
+        """
+        if error is None:
+            if self.cfg.output == 'text':
+                print('Git tag created')
+            return
+
+        if self.cfg.output != 'text':
+            raise TagError('Git tag failed: %s' % error) from error
+
+        print('Git tag failed, do it yourself')
+        if self.cfg.verbose:
+            traceback.print_exc()
@@ -1,18 +1,128 @@
 """Class for command: up"""
 
-from versionner.commands import Command, CommandOutput
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+from versionner.commands import Command, CommandOutput, in_executor
+from versionner import defaults
+from versionner import lock
+from versionner import vcs
 from versionner import version
-from versionner.commands.files_management import save_version_and_update_files
+from versionner.commands.files_management import save_version_and_update_files, save_versions_and_update_files, \
+    save_version_and_update_files_async, save_versions_and_update_files_async, verify_expected, \
+    write_version_and_update_files, commit_paths
 
 class Up(Command):
     """Realize tasks for 'up' command"""
     def run(self):
-        version_file = version.VersionFile(self.cfg.version_file)
+        if self.cfg.selected_projects:
+            return self._run_projects()
 
-        current = version_file.read()
+        if self.cfg.submodule_args is not None:
+            return self._run_submodules()
+
+        with lock.locked(self.cfg.version_file):
+            (version_file, new) = self._bump()
+            modified_files = save_version_and_update_files(self.cfg, version_file, new)
+
+        return CommandOutput(new, modified_files['changes'], modified_files['files'])
+
+    async def run_async(self):
+        if self.cfg.selected_projects:
+            return await self._run_projects_async()
 
-        new = current.up(self.cfg.up_part, self.cfg.value)
+        if self.cfg.submodule_args is not None:
+            return await in_executor(self._run_submodules)
 
-        modified_files = save_version_and_update_files(self.cfg, version_file, new)
+        async with lock.locked_async(self.cfg.version_file):
+            (version_file, new) = await in_executor(self._bump)
+            modified_files = await save_version_and_update_files_async(self.cfg, version_file, new)
 
         return CommandOutput(new, modified_files['changes'], modified_files['files'])
+
+    def _bump(self):
+        """Read and increase version
+
+        :return: (VersionFile, Version)
+        """
+        version_file = version.VersionFile(self.cfg.version_file, self.cfg.version_format)
+        current = version_file.read()
+        verify_expected(self.cfg, current)
+
+        return version_file, current.up(self.cfg.up_part, self.cfg.value)
+
+    def _run_submodules(self):
+        """Increase versions in submodules (in parallel, every one with its own config), then
+        increase version of superproject and commit it together with new pointers of submodules
+
+        :return: CommandOutput
+        """
+        from versionner.commands import submodules
+
+        vcs_handler = vcs.VCS(self.cfg.vcs_engine, self.cfg.vcs_root)
+        # status is verified before submodules are committed, later their pointers are changed
+        if self.cfg.commit:
+            vcs_handler.raise_if_cant_commit()
+
+        with lock.locked(self.cfg.version_file):
+            (version_file, new) = self._bump()
+
+            results = submodules.execute_all(submodules.find(self.cfg), self.cfg.submodule_args)
+
+            modified_files = write_version_and_update_files(self.cfg, version_file, new)
+            if self.cfg.commit:
+                paths = commit_paths(self.cfg)
+                paths.update(str(path.absolute()) for path in results)
+                vcs_handler.add_to_stage(paths)
+                vcs_handler.create_commit(self.cfg.vcs_commit_message % {'version': new})
+
+        projects = OrderedDict([('.', new)])
+        for (path, result) in results.items():
+            projects[os.path.relpath(str(path))] = result['current_version']
+            modified_files['changes'] += result['modifications'] or 0
+            modified_files['files'] += result['modified_files'] or 0
+
+        return CommandOutput(new, modified_files['changes'], modified_files['files'], projects)
+
+    def _bump_project(self, project):
+        """Read and increase version of single project
+
+        :param project: ProjectConfig
+        :return: (ProjectConfig, VersionFile, Version)
+        """
+        version_file = version.VersionFile(project.version_file, project.version_format)
+        new = version_file.read().up(self.cfg.up_part, self.cfg.value)
+
+        return project, version_file, new
+
+    def _run_projects(self):
+        """Increase versions of selected projects concurrently, and save them all at once
+
+        :return: CommandOutput
+        """
+        projects = [self.cfg.projects[name] for name in self.cfg.selected_projects]
+        with lock.locked(*(project.version_file for project in projects)):
+            with ThreadPoolExecutor(max_workers=defaults.DEFAULT_WORKERS) as pool:
+                versions = list(pool.map(self._bump_project, projects))
+
+            modified_files = save_versions_and_update_files(self.cfg, versions)
+
+        return CommandOutput(None, modified_files['changes'], modified_files['files'],
+            {project.name: new for (project, _, new) in versions})
+
+    async def _run_projects_async(self):
+        """Asynchronous version of Up._run_projects
+
+        :return: CommandOutput
+        """
+        import asyncio
+
+        projects = [self.cfg.projects[name] for name in self.cfg.selected_projects]
+        async with lock.locked_async(*(project.version_file for project in projects)):
+            versions = await asyncio.gather(*(in_executor(self._bump_project, project) for project in projects))
+
+            modified_files = await save_versions_and_update_files_async(self.cfg, versions)
+
+        return CommandOutput(None, modified_files['changes'], modified_files['files'],
+            {project.name: new for (project, _, new) in versions})
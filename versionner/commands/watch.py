@@ -0,0 +1,175 @@
+"""Class for command: watch"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import threading
+
+from versionner.commands import Command, CommandOutput
+from versionner import config
+from versionner import defaults
+from versionner import lock
+from versionner import version
+from versionner import watcher
+from versionner.commands.check import check_project_file
+from versionner.commands.files_management import update_project_file
+from versionner.errors import VersionnerError
+
+
+def _sync_group(rules):
+    """Update single project file, only if it doesn't contain expected version already
+
+    :param rules: list of (FileConfig, Version, date_format), all for the same file
+    :return: number of changes
+    """
+    changes = 0
+    for rule in rules:
+        # files without version string (or unreadable) are reported by check, rewriting them doesn't help
+        if any(mismatch.found is not None for mismatch in check_project_file(*rule)):
+            changes += update_project_file(*rule)
+
+    return changes
+
+
+class Watch(Command):
+    """Realize tasks for 'watch' command
+    Watches version files and config files, and updates project files when version is changed.
+    Bursts of events (ie. editor saving file) are merged into one update, and updates are applied
+    in background thread, one by one, so watching isn't blocked by rewriting files.
+    """
+
+    raw_output = True
+
+    def __init__(self, cfg, output=None):
+        super().__init__(cfg)
+        self._output = output or sys.stdout
+        self._synced = {}
+        self.modifications = 0
+        self.modified_files = 0
+        self.stopped = threading.Event()
+
+    def _targets(self):
+        """Version files with their project files
+
+        :return: OrderedDict: absolute path -> (VersionFile, list of FileConfig, date_format)
+        """
+        targets = OrderedDict()
+        if self.cfg.files or not self.cfg.projects:
+            targets[os.path.abspath(str(self.cfg.version_file))] = (
+                version.VersionFile(self.cfg.version_file, self.cfg.version_format), self.cfg.files,
+                self.cfg.date_format)
+
+        for project in self.cfg.projects.values():
+            targets[os.path.abspath(str(project.version_file))] = (
+                version.VersionFile(project.version_file, project.version_format), project.files,
+                project.date_format)
+
+        return targets
+
+    def _watch(self, targets, polling):
+        """Create watcher for version files and config files
+
+        :param targets: result of Watch._targets
+        :param polling:bool: force stat polling
+        :return: watcher
+        """
+        return watcher.create(list(targets) + list(self.cfg.config_files), polling=polling)
+
+    def sync(self, targets, force=False):
+        """Update project files of given version files (runs in background thread), errors are
+        reported and watching is continued
+
+        :param targets: result of Watch._targets (or part of it)
+        :param force:bool: verify project files even if version wasn't changed since last update
+        """
+        try:
+            self._sync(targets, force)
+        except (VersionnerError, ValueError, OSError) as exc:
+            print("Can't update project files: %s" % exc, file=sys.stderr, flush=True)
+
+    def _sync(self, targets, force):
+        """Update project files of given version files
+
+        :param targets: result of Watch._targets (or part of it)
+        :param force:bool: verify project files even if version wasn't changed since last update
+        """
+        # version files are locked, to not update project files concurrently with `ver up` or `ver set`
+        with lock.locked(*targets):
+            groups = OrderedDict()
+            for (path, (version_file, files, date_format)) in targets.items():
+                try:
+                    current = version_file.read()
+                except (VersionnerError, ValueError, OSError) as exc:
+                    print("%s: %s" % (version_file, exc), file=sys.stderr, flush=True)
+                    continue
+
+                if not force and self._synced.get(path) == str(current):
+                    continue
+                self._synced[path] = str(current)
+
+                for project_file in files:
+                    groups.setdefault(str(project_file.file.absolute()), []).append(
+                        (project_file, current, date_format))
+
+            if not groups:
+                return
+
+            with ThreadPoolExecutor(max_workers=defaults.DEFAULT_WORKERS) as pool:
+                changes = [cnt for cnt in pool.map(_sync_group, groups.values()) if cnt]
+
+        self.modifications += sum(changes)
+        self.modified_files += len(changes)
+
+        versions = ', '.join(self._synced[path] for path in targets if path in self._synced)
+        print("Version %s: %d changes in %d files" % (versions, sum(changes), len(changes)),
+            file=self._output, flush=True)
+
+    @staticmethod
+    def _debounce(watch, delay):
+        """Collect changes until there are no new events for `delay` seconds
+
+        :param watch: watcher
+        :param delay:float
+        :return:set: changed paths
+        """
+        changed = set()
+        while True:
+            more = watch.wait(timeout=delay)
+            if not more:
+                return changed
+            changed |= more
+
+    def run(self):
+        (delay, polling) = self.cfg.value or (defaults.DEFAULT_WATCH_DEBOUNCE, False)
+
+        targets = self._targets()
+        watch = self._watch(targets, polling)
+        print("Watching %s" % ', '.join(os.path.relpath(path) for path in targets), file=self._output, flush=True)
+
+        # single worker: updates are applied in order, and never concurrently for the same file
+        with ThreadPoolExecutor(max_workers=1) as worker:
+            worker.submit(self.sync, targets, True)
+            try:
+                while not self.stopped.is_set():
+                    changed = watch.wait(timeout=defaults.DEFAULT_WATCH_INTERVAL)
+                    if not changed:
+                        continue
+                    changed |= self._debounce(watch, delay)
+
+                    config_files = {os.path.abspath(str(path)) for path in self.cfg.config_files}
+                    if changed & config_files:
+                        self.cfg = config.reload(self.cfg)
+                        targets = self._targets()
+                        watch.close()
+                        watch = self._watch(targets, polling)
+                        worker.submit(self.sync, targets, True)
+                    else:
+                        worker.submit(self.sync, OrderedDict(
+                            (path, target) for (path, target) in targets.items() if path in changed))
+            except KeyboardInterrupt:
+                pass
+            finally:
+                watch.close()
+
+        return CommandOutput(None, self.modifications, self.modified_files)
@@ -1,15 +1,21 @@
 """Configuration-related classes for versionner"""
 
 import codecs
-import configparser
+import os
 import pathlib
 import re
 import sys
 
+import versionner
+from versionner import cache
 from versionner import defaults
+from versionner import discovery
 
 ENV_VERSIONNER_PROJECT_CONFIG_FILE = 'VERSIONNER_PROJECT_CONFIG_FILE'
 
+# options given in command line have precedence over config files when config is reloaded
+CLI_OPTIONS = ('version_file', 'date_format', 'verbose', 'vcs_root')
+
 
 # pylint: disable=too-many-instance-attributes,too-few-public-methods
 class FileConfig:
@@ -41,11 +47,24 @@ class FileConfig:
     def validate(self):
         """Validate current file configuration
 
+        :raise ValueError:
+        """
+        self.validate_file()
+        self.validate_rules()
+
+    def validate_file(self):
+        """Validate that project file exists (it's not cached, so it's verified on every run)
+
         :raise ValueError:
         """
         if not self.file.exists():
-            raise ValueError("File \"%s\" doesn't exists")
+            raise ValueError("File \"%s\" doesn't exists" % self.filename)
+
+    def validate_rules(self):
+        """Validate options of file configuration, independent of state of project file
 
+        :raise ValueError:
+        """
         if not self.search:
             raise ValueError("Search cannot be empty")
 
@@ -60,56 +79,184 @@ class FileConfig:
         except LookupError:
             raise ValueError("Unknown encoding: \"%s\"" % self.encoding)
 
+    def to_dict(self):
+        """Dump file configuration as dict (used to cache configuration)
+
+        :return:dict
+        """
+        return {
+            'filename': self.filename,
+            'enabled': self.enabled,
+            'search': self.search,
+            'replace': self.replace,
+            'date_format': self.date_format,
+            'match': self.match,
+            'search_flags': self.search_flags,
+            'encoding': self.encoding,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create file configuration from dict returned by FileConfig.to_dict, without validation
+
+        :param data:dict
+        :return:FileConfig
+        """
+        project_file = cls.__new__(cls)
+        for key, value in data.items():
+            setattr(project_file, key, value)
+        project_file.file = pathlib.Path(project_file.filename)
+
+        return project_file
+
     def __repr__(self):
         return '<FileConfig(%s)>' % self.filename
 
 
+class ProjectConfig:
+    """Single project configuration (for repositories with many projects, each with own version file)"""
+
+    __slots__ = ('name', 'version_file', 'version_format', 'date_format', 'files')
+
+    def __init__(self, name, version_file, date_format, files=None, version_format=defaults.DEFAULT_VERSION_FORMAT):
+        """
+        :param name: project name
+        :param version_file: path to version file of project
+        :param date_format: date format used in project files
+        :param files: list of FileConfig
+        :param version_format: format of version file
+        """
+        self.name = name
+        self.version_file = pathlib.Path(version_file)
+        self.version_format = version_format
+        self.date_format = date_format
+        self.files = files or []
+
+    def to_dict(self):
+        """Dump project configuration as dict (used to cache configuration)
+
+        :return:dict
+        """
+        return {
+            'name': self.name,
+            'version_file': str(self.version_file),
+            'version_format': self.version_format,
+            'date_format': self.date_format,
+            'files': [project_file.to_dict() for project_file in self.files],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create project configuration from dict returned by ProjectConfig.to_dict
+
+        :param data:dict
+        :return:ProjectConfig
+        """
+        files = [FileConfig.from_dict(project_file) for project_file in data['files']]
+        return cls(data['name'], data['version_file'], data['date_format'], files, data['version_format'])
+
+    def __repr__(self):
+        return '<ProjectConfig(%s)>' % self.name
+
+
 class Config:
     """Configuration"""
 
     __slots__ = (
+        'build_counter_batch',
+        'build_counter_file',
         'command',
         'commit',
+        'config_files',
         'date_format',
         'default_init_version',
         'default_increase_value',
+        'expect',
         'files',
+        'metrics_file',
+        'output',
+        'profile',
+        'profile_file',
+        'projects',
+        'selected_projects',
+        'submodule_args',
         'value',
         'up_part',
         'vcs_commit_message',
         'vcs_engine',
+        'vcs_root',
         'vcs_tag_params',
         'verbose',
         'version_file',
+        'version_format',
+        'warnings',
     )
 
-    def __init__(self, files=None):
+    # fields read from config files, only those are cached
+    CACHED_FIELDS = (
+        'build_counter_batch',
+        'build_counter_file',
+        'date_format',
+        'default_init_version',
+        'default_increase_value',
+        'up_part',
+        'vcs_commit_message',
+        'vcs_engine',
+        'vcs_tag_params',
+        'version_file',
+        'version_format',
+        'warnings',
+    )
+
+    def __init__(self, files=None, check_files=True):
         """Evaluate configuration
 
+        :param files: list of config files
+        :param check_files:bool: drop rules for project files which don't exist (see Config.check_files)
         :return:
         """
+        self.build_counter_batch = defaults.DEFAULT_BUILD_COUNTER_BATCH
+        self.build_counter_file = None
         self.command = None
         self.commit = False
+        self.config_files = list(files or [])
         self.date_format = defaults.DEFAULT_DATE_FORMAT
         self.default_init_version = defaults.DEFAULT_INIT_VERSION
         self.default_increase_value = defaults.DEFAULT_INCREASE_VALUE
+        self.expect = None
         self.files = []
+        self.metrics_file = None
+        self.output = 'text'
+        self.profile = None
+        self.profile_file = None
+        self.projects = {}
+        self.selected_projects = []
+        # arguments for `ver` executed in submodules (`up --recurse-submodules`), None to not execute it
+        self.submodule_args = None
         self.value = None
         self.up_part = defaults.DEFAULT_UP_PART
         self.vcs_commit_message = defaults.DEFAULT_VCS_COMMIT_MESSAGE
         self.vcs_engine = 'git'
+        self.vcs_root = None
         self.vcs_tag_params = []
         self.verbose = False
         self.version_file = defaults.DEFAULT_VERSION_FILE
+        self.version_format = defaults.DEFAULT_VERSION_FORMAT
+        self.warnings = []
 
         if files:
             self._parse_config_file(files)
+            if check_files:
+                self.check_files()
 
     def _parse_config_file(self, cfg_files):
         """Parse config file (ini) and set properties
 
         :return:
         """
+        # configparser is imported lazily, it's not required when configuration is read from cache
+        import configparser
+
         cfg_handler = configparser.ConfigParser(interpolation=None)
 
         if not cfg_handler.read(map(str, cfg_files)):
@@ -118,6 +265,7 @@ class Config:
         self._parse_global_section(cfg_handler)
         self._parse_vcs_section(cfg_handler)
         self._parse_file_section(cfg_handler)
+        self._parse_project_sections(cfg_handler)
 
     def _parse_global_section(self, cfg_handler):
         """Parse global ([versionner]) section
@@ -130,6 +278,8 @@ class Config:
             cfg = cfg_handler['versionner']
             if 'file' in cfg:
                 self.version_file = cfg['file']
+            if 'format' in cfg:
+                self.version_format = cfg['format']
             if 'date_format' in cfg:
                 self.date_format = cfg['date_format']
             if 'up_part' in cfg:
@@ -138,6 +288,10 @@ class Config:
                 self.default_init_version = cfg['default_init_version']
             if 'default_increase_value' in cfg:
                 self.default_increase_value = cfg.getint('default_increase_value')
+            if 'build_counter_file' in cfg:
+                self.build_counter_file = cfg['build_counter_file']
+            if 'build_counter_batch' in cfg:
+                self.build_counter_batch = cfg.getint('build_counter_batch')
 
     def _parse_vcs_section(self, cfg_handler):
         """Parse [vcs] section
@@ -160,28 +314,234 @@ class Config:
         :param cfg_handler:
         :return:
         """
-
-        _number_rxp = re.compile(r'^\d+:(.)')
         # project files configuration
         for section in cfg_handler.sections():
             if section.startswith('file:'):
-                path = section[5:]
-                path = _number_rxp.sub(r'\1', path)
+                project_file = self._parse_file_config(section[5:], cfg_handler[section], self.date_format)
+                if project_file:
+                    self.files.append(project_file)
 
-                project_file = FileConfig(path, cfg_handler[section])
+    def _parse_project_sections(self, cfg_handler):
+        """Parse [project:NAME] and [project:NAME:file:*] sections
 
-                if not project_file.date_format:
-                    project_file.date_format = self.date_format
+        :param cfg_handler:
+        :return:
+        """
+        for section in cfg_handler.sections():
+            if section.startswith('project:') and ':' not in section[8:]:
+                name = section[8:]
+                cfg = cfg_handler[section]
+                if 'file' not in cfg:
+                    warning = "Incorrect configuration for project \"%s\": version file is not specified" % name
+                    self.warnings.append(warning)
+                    print(warning, file=sys.stderr)
+                    continue
+
+                self.projects[name] = ProjectConfig(name, cfg['file'], cfg.get('date_format', self.date_format),
+                    version_format=cfg.get('format', defaults.DEFAULT_VERSION_FORMAT))
 
-                if project_file.enabled:
-                    try:
-                        project_file.validate()
-                    except ValueError as exc:
-                        print("Incorrect configuration for file \"%s\": %s" % (project_file.filename, exc.args[0]), file=sys.stderr)
-                    else:
-                        self.files.append(project_file)
+        for section in cfg_handler.sections():
+            if not section.startswith('project:'):
+                continue
+
+            (name, _, path) = section[8:].partition(':file:')
+            if not path or name not in self.projects:
+                continue
+
+            project = self.projects[name]
+            project_file = self._parse_file_config(path, cfg_handler[section], project.date_format)
+            if project_file:
+                project.files.append(project_file)
+
+    def check_files(self):
+        """Drop rules for project files which don't exist, and warn about them.
+        Existence of files isn't cached, so it's checked every time configuration is loaded
+        """
+        self.files = self._existing_files(self.files)
+        for project in self.projects.values():
+            project.files = self._existing_files(project.files)
+
+    def _existing_files(self, project_files):
+        existing = []
+        for project_file in project_files:
+            try:
+                project_file.validate_file()
+            except ValueError as exc:
+                warning = "Incorrect configuration for file \"%s\": %s" % (project_file.filename, exc.args[0])
+                self.warnings.append(warning)
+                print(warning, file=sys.stderr)
+            else:
+                existing.append(project_file)
+
+        return existing
+
+    _number_rxp = re.compile(r'^\d+:(.)')
+
+    def _parse_file_config(self, path, section, date_format):
+        """Parse and validate single [file:*] section
+
+        :param path: file path (with optional number prefix)
+        :param section: config section
+        :param date_format: default date format
+        :return: FileConfig or None if file is disabled or invalid (existence of file is checked later,
+            by Config.check_files)
+        """
+        path = self._number_rxp.sub(r'\1', path)
+
+        project_file = FileConfig(path, section)
+
+        if not project_file.date_format:
+            project_file.date_format = date_format
+
+        if not project_file.enabled:
+            return None
+
+        try:
+            project_file.validate_rules()
+        except ValueError as exc:
+            warning = "Incorrect configuration for file \"%s\": %s" % (project_file.filename, exc.args[0])
+            self.warnings.append(warning)
+            print(warning, file=sys.stderr)
+            return None
+
+        return project_file
+
+    def to_dict(self):
+        """Dump configuration read from config files as dict (used to cache configuration)
+
+        :return:dict
+        """
+        data = {name: getattr(self, name) for name in self.CACHED_FIELDS}
+        data['version_file'] = str(self.version_file)
+        data['files'] = [project_file.to_dict() for project_file in self.files]
+        data['projects'] = [project.to_dict() for project in self.projects.values()]
+
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create configuration from dict returned by Config.to_dict
+
+        :param data:dict
+        :return:Config
+        """
+        cfg = cls()
+        for name in cls.CACHED_FIELDS:
+            setattr(cfg, name, data[name])
+        cfg.files = [FileConfig.from_dict(project_file) for project_file in data['files']]
+        for project in data['projects']:
+            project = ProjectConfig.from_dict(project)
+            cfg.projects[project.name] = project
+
+        return cfg
 
     def __repr__(self):
         ret = '<' + self.__class__.__name__ + ': '
         ret += ', '.join('%s=%r' % (name, getattr(self, name)) for name in self.__slots__)
         return ret
+
+
+def find_project_config_file(user_config_file):
+    """Find path to project-wide config file
+    Search from current working directory, and traverse path up to
+    directory with .versionner.rc file or root directory
+
+    :param user_config_file: instance with user-wide config path
+    :type: pathlib.Path
+    :rtype: pathlib.Path
+    """
+    if os.environ.get(ENV_VERSIONNER_PROJECT_CONFIG_FILE, None):
+        return pathlib.Path(os.environ[ENV_VERSIONNER_PROJECT_CONFIG_FILE]).absolute()
+
+    proj_cfg_file = discovery.discover().config_file
+    if proj_cfg_file and proj_cfg_file != user_config_file:
+        return proj_cfg_file
+
+    return None
+
+
+def get_config_files():
+    """Return list of config files for current working directory: user-wide and project-wide
+    (if found)
+
+    :return: list of pathlib.Path
+    """
+    cfg_files = [
+        pathlib.Path(os.path.expanduser('~')) / defaults.RC_FILENAME,
+    ]
+    proj_cfg_file = find_project_config_file(cfg_files[0])
+    if proj_cfg_file:
+        cfg_files.append(proj_cfg_file)
+
+    return cfg_files
+
+
+# version of cached data layout, caches written by older layouts are ignored
+_CACHE_FORMAT = 2
+
+
+def _cache_key(files):
+    """Build key identifying state of config files: their paths, sizes and modification times.
+    Current working directory is a part of key too, because paths of project files are relative
+    to it.
+
+    :param files: list of pathlib.Path
+    :return:list
+    """
+    key = [versionner.__version__, os.getcwd(), _CACHE_FORMAT]
+    for path in files:
+        try:
+            stat = os.stat(str(path))
+        except OSError:
+            key.append([str(path), None, None])
+        else:
+            key.append([str(path), stat.st_size, stat.st_mtime_ns])
+
+    return key
+
+
+def load(files):
+    """Load configuration from given files, use cached one if config files didn't change
+
+    :param files: list of pathlib.Path
+    :return:Config
+    """
+    if not cache.enabled():
+        return Config(files)
+
+    key = _cache_key(files)
+    cache_file = cache.cache_file('config', key[1], [str(path) for path in files])
+
+    data = cache.load(cache_file)
+    if data and data.get('key') == key:
+        try:
+            cfg = Config.from_dict(data['config'])
+            cfg.config_files = list(files)
+        except (KeyError, TypeError, AttributeError):
+            pass
+        else:
+            for warning in cfg.warnings:
+                print(warning, file=sys.stderr)
+            cfg.check_files()
+            return cfg
+
+    # rules for missing project files are cached too, files may be created later
+    cfg = Config(files, check_files=False)
+    cache.save(cache_file, {'key': key, 'config': cfg.to_dict()})
+    cfg.check_files()
+
+    return cfg
+
+
+def reload(cfg):
+    """Load configuration again from the same config files, options given in command line
+    (CLI_OPTIONS) are copied from current configuration
+
+    :param cfg: current configuration
+    :return:Config
+    """
+    new = load(cfg.config_files)
+    for name in CLI_OPTIONS:
+        setattr(new, name, getattr(cfg, name))
+
+    return new
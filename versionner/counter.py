@@ -0,0 +1,105 @@
+"""Build numbers allocator, used by `ver set --build auto`
+
+Next free number is stored in counter file, protected with inter-process lock of version file
+(see `versionner.lock`), so allocation must not be done while this lock is held. Every allocation from counter file reserves range of `batch` numbers,
+and following allocations in the same process are served from that range without touching
+counter file. Numbers are unique and grow monotonically within process, but with `batch`
+greater than 1 numbers from concurrent processes can interleave, and unused numbers from
+reserved ranges are lost (`batch` > 1 is useful for long running processes: `ver serve`,
+users of `versionner.api`).
+"""
+
+import os
+import pathlib
+import threading
+
+from versionner import discovery
+from versionner import lock
+from versionner.errors import VersionnerError
+
+AUTO = 'auto'
+
+# counter file path -> BuildCounter, shared by all allocations in process
+_COUNTERS = {}
+_COUNTERS_LOCK = threading.Lock()
+
+
+class CounterError(VersionnerError):
+    """Counter file is broken"""
+
+
+def counter_path(version_file):
+    """Default path to counter file for version file: in repository data directory, or `.NAME.build`
+    next to version file outside of repository (see `discovery.state_path`)
+
+    :param version_file: path to version file
+    :return:pathlib.Path
+    """
+    return discovery.state_path(version_file, 'build')
+
+
+class BuildCounter:
+    """Allocates build numbers from counter file"""
+
+    def __init__(self, path, batch=1, locked_file=None):
+        """Initialisation
+
+        :param path: path to counter file
+        :param batch:int: how many numbers reserve at once
+        :param locked_file: path to file which lock protects counter (ie. version file), counter file by default
+        """
+        self.path = pathlib.Path(path)
+        self.batch = max(1, int(batch))
+        self.locked_file = self.path if locked_file is None else pathlib.Path(locked_file)
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Reserve next range of numbers in counter file"""
+        with lock.FileLock(self.locked_file):
+            try:
+                first = int(self.path.read_text().strip() or 1)
+            except FileNotFoundError:
+                first = 1
+            except ValueError as exc:
+                raise CounterError("Counter file %s is broken: %s" % (self.path, exc)) from exc
+
+            tmp_path = self.path.with_name('%s.%d.tmp' % (self.path.name, os.getpid()))
+            tmp_path.write_text(str(first + self.batch))
+            os.replace(str(tmp_path), str(self.path))
+
+        self._next = first
+        self._end = first + self.batch
+
+    def allocate(self):
+        """Return next build number
+
+        :return:int
+        """
+        with self._lock:
+            if self._next >= self._end:
+                self._reserve()
+
+            number = self._next
+            self._next += 1
+
+        return number
+
+
+def next_build(cfg):
+    """Allocate next build number for project, counter is protected with lock of version file
+    (so it must not be held by caller)
+
+    :param cfg: configuration storage
+    :return:str
+    """
+    path = pathlib.Path(cfg.build_counter_file or counter_path(cfg.version_file)).absolute()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with _COUNTERS_LOCK:
+        counter = _COUNTERS.get(path)
+        if counter is None or counter.batch != cfg.build_counter_batch:
+            counter = _COUNTERS[path] = BuildCounter(path, cfg.build_counter_batch, cfg.version_file)
+
+    return str(counter.allocate())
@@ -8,3 +8,11 @@ DEFAULT_VCS_TIMEOUT = 5
 DEFAULT_INIT_VERSION = '0.1.0'
 DEFAULT_INCREASE_VALUE = 1
 DEFAULT_VCS_COMMIT_MESSAGE = '%(version)s'
+DEFAULT_PARSE_CACHE_SIZE = 256
+DEFAULT_WATCH_INTERVAL = 0.5
+DEFAULT_WATCH_DEBOUNCE = 0.2
+DEFAULT_SERVE_SOCKET = '.versionner.sock'
+DEFAULT_WORKERS = 8
+DEFAULT_LOCK_TIMEOUT = 60
+DEFAULT_BUILD_COUNTER_BATCH = 1
+DEFAULT_VERSION_FORMAT = 'plain'
@@ -0,0 +1,111 @@
+"""Discovery of project config file and VCS repository root
+Both are found in single walk from current working directory up to root directory,
+and results are memoized for the whole process. Files with versionner's state (locks, build counters)
+are kept in directory with repository data, see `state_path`.
+"""
+
+from collections import namedtuple
+import functools
+import os
+import pathlib
+import zlib
+
+from versionner import defaults
+
+VCS_DIRS = ('.git', )
+
+
+class ProjectPaths(namedtuple('ProjectPaths', ['config_file', 'vcs_root'])):
+    """Paths discovered for project: config file and VCS repository root (both may be None)"""
+
+
+@functools.lru_cache(maxsize=None)
+def _discover(start):
+    """Walk from start directory up to root directory and find config file and VCS repository root
+
+    :param start:str: absolute path to directory
+    :return:ProjectPaths
+    """
+    config_file = None
+    vcs_root = None
+
+    current = pathlib.Path(start)
+    root = pathlib.Path(current.anchor)
+    while current != root and not (config_file and vcs_root):
+        if not config_file:
+            path = current / defaults.RC_FILENAME
+            if os.path.exists(str(path)):
+                config_file = path
+
+        if not vcs_root:
+            for vcs_dir in VCS_DIRS:
+                if os.path.exists(str(current / vcs_dir)):
+                    vcs_root = current
+                    break
+
+        current = current.parent
+
+    return ProjectPaths(config_file, vcs_root)
+
+
+def discover(start=None):
+    """Find project config file and VCS repository root, starting from given directory
+
+    :param start: directory to start from (default: current working directory)
+    :return:ProjectPaths
+    """
+    start = pathlib.Path(start or '.').absolute()
+    return _discover(str(start))
+
+
+@functools.lru_cache(maxsize=None)
+def _vcs_dir(vcs_root):
+    """Find directory with repository data, `.git` file (in submodules and worktrees) points to it
+
+    :param vcs_root:str: absolute path to VCS repository root
+    :return:pathlib.Path or None
+    """
+    for vcs_dir in VCS_DIRS:
+        path = pathlib.Path(vcs_root, vcs_dir)
+        if path.is_dir():
+            return path
+
+        try:
+            with open(str(path)) as fh:
+                content = fh.read().strip()
+        except OSError:
+            continue
+
+        if content.startswith('gitdir:'):
+            path = pathlib.Path(vcs_root, content[len('gitdir:'):].strip())
+            if path.is_dir():
+                return path
+
+    return None
+
+
+def state_path(path, suffix):
+    """Path to file with versionner's state for given file (ie. its lock). It's kept in directory with
+    repository data (so it's never seen as untracked file), or next to given file, as hidden file,
+    if it's not in repository. Path depends only on path of given file, not on environment.
+
+    :param path: path to file
+    :param suffix:str: kind of state (extension of state file)
+    :return:pathlib.Path
+    """
+    path = pathlib.Path(os.path.abspath(str(path)))
+
+    vcs_root = discover(path.parent).vcs_root
+    vcs_dir = _vcs_dir(str(vcs_root)) if vcs_root else None
+    if vcs_dir is None:
+        return path.with_name('.%s.%s' % (path.name, suffix))
+
+    state_dir = vcs_dir / 'versionner'
+    state_dir.mkdir(exist_ok=True)
+    return state_dir / ('%s-%08x.%s' % (path.name, zlib.crc32(str(path).encode('utf-8')), suffix))
+
+
+def clear_cache():
+    """Forget about all discovered paths"""
+    _discover.cache_clear()
+    _vcs_dir.cache_clear()
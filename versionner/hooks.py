@@ -0,0 +1,89 @@
+"""Event hooks: callbacks called around commands, project files rewrites and VCS calls
+
+    from versionner import hooks
+
+    def on_rewrite(event, project_file, changes, duration, **_):
+        print('%s: %d changes in %.3fs' % (project_file.filename, changes, duration))
+
+    hooks.register(hooks.POST_FILE_REWRITE, on_rewrite)
+
+Callbacks are called synchronously, in order of registration, with event name as first
+positional argument and event data as keyword arguments:
+
+* pre_command: command, cfg
+* post_command: command, cfg, result, error, duration
+* pre_file_rewrite: project_file, version
+* post_file_rewrite: project_file, version, changes, error, duration
+* pre_vcs: action, args
+* post_vcs: action, args, error, duration
+
+`error` is exception raised by observed operation (it's re-raised after callbacks), or None.
+Post-events for operations running in threads (ie. files rewrites in `ver up --all`) are called
+from these threads. Exceptions raised by callbacks are propagated.
+
+When there is no callback registered for event, emitting it costs single dict lookup.
+"""
+
+PRE_COMMAND = 'pre_command'
+POST_COMMAND = 'post_command'
+PRE_FILE_REWRITE = 'pre_file_rewrite'
+POST_FILE_REWRITE = 'post_file_rewrite'
+PRE_VCS = 'pre_vcs'
+POST_VCS = 'post_vcs'
+
+EVENTS = (PRE_COMMAND, POST_COMMAND, PRE_FILE_REWRITE, POST_FILE_REWRITE, PRE_VCS, POST_VCS)
+
+# event name -> tuple of callbacks; tuples are replaced (not modified) on register/unregister,
+# so emitting is safe while other thread changes registrations
+_HOOKS = {}
+
+
+def register(event, callback):
+    """Register callback for event
+
+    :param event: one of EVENTS
+    :param callback: callable
+    :return: callback
+    """
+    if event not in EVENTS:
+        raise ValueError("Unknown event: %s" % event)
+
+    _HOOKS[event] = _HOOKS.get(event, ()) + (callback, )
+    return callback
+
+
+def unregister(event, callback):
+    """Remove callback registered for event
+
+    :param event: one of EVENTS
+    :param callback: callable
+    """
+    callbacks = tuple(cb for cb in _HOOKS.get(event, ()) if cb != callback)
+    if callbacks:
+        _HOOKS[event] = callbacks
+    else:
+        _HOOKS.pop(event, None)
+
+
+def clear():
+    """Remove all registered callbacks"""
+    _HOOKS.clear()
+
+
+def enabled(*events):
+    """Check if there is any callback registered for any of given events
+
+    :param events: event names
+    :return:bool
+    """
+    return any(event in _HOOKS for event in events)
+
+
+def emit(event, **data):
+    """Call all callbacks registered for event
+
+    :param event: one of EVENTS
+    :param data: event data
+    """
+    for callback in _HOOKS.get(event, ()):
+        callback(event, **data)
@@ -0,0 +1,185 @@
+"""Advisory inter-process locks for version files
+
+Version file itself is replaced (not modified in place) on every write, so lock is taken
+on separate lock file: in `.git/versionner/` of repository containing locked file, or `.NAME.lock`
+next to it outside of repository (see `discovery.state_path`). Its path depends only on path
+of locked file (not on cache directory or environment), so all processes changing the same file
+use the same lock. Lock files are never removed, as removing them could let two processes lock
+different files at the same time.
+
+    with lock.locked(cfg.version_file):
+        current = version_file.read()
+        version_file.write(current.up('patch'))
+
+In asyncio event loop use `locked_async`, which waits for locks without blocking the loop.
+"""
+
+import contextlib
+import os
+import time
+
+from versionner import defaults
+from versionner import discovery
+from versionner.errors import VersionnerError
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# delays between attempts to take lock, last one is repeated until timeout
+_RETRY_DELAYS = (0.001, 0.005, 0.01, 0.025, 0.05)
+
+
+class LockError(VersionnerError):
+    """Lock can't be taken"""
+
+
+def lock_path(path):
+    """Path to lock file for given file
+
+    :param path: path to locked file
+    :return:pathlib.Path
+    """
+    return discovery.state_path(path, 'lock')
+
+
+def _try_lock(fd):
+    """Try to take exclusive lock on file descriptor without blocking
+
+    :param fd:int
+    :return:bool
+    """
+    if fcntl:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    try:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """Exclusive advisory lock for file"""
+
+    def __init__(self, path, timeout=defaults.DEFAULT_LOCK_TIMEOUT):
+        """Initialisation
+
+        :param path: path to locked file (lock is taken on separate lock file)
+        :param timeout: seconds to wait for lock, None to wait infinitely
+        """
+        self.path = lock_path(path)
+        self.timeout = timeout
+        self._fd = None
+
+    def acquire(self):
+        """Take lock, wait until it's released by other process if needed
+
+        :raise LockError:
+        """
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        attempt = 0
+        while not _try_lock(fd):
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(fd)
+                raise LockError("Can't lock %s in %s seconds" % (self.path, self.timeout))
+
+            time.sleep(_RETRY_DELAYS[min(attempt, len(_RETRY_DELAYS) - 1)])
+            attempt += 1
+
+        self._fd = fd
+
+    async def acquire_async(self):
+        """Asynchronous version of FileLock.acquire, waits for lock without blocking event loop
+        (and without occupying executor threads)
+
+        :raise LockError:
+        """
+        import asyncio
+
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        attempt = 0
+        try:
+            while not _try_lock(fd):
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise LockError("Can't lock %s in %s seconds" % (self.path, self.timeout))
+
+                await asyncio.sleep(_RETRY_DELAYS[min(attempt, len(_RETRY_DELAYS) - 1)])
+                attempt += 1
+        except BaseException:
+            # also on cancellation of waiting task
+            os.close(fd)
+            raise
+
+        self._fd = fd
+
+    def release(self):
+        """Release lock"""
+        if self._fd is None:
+            return
+
+        try:
+            _unlock(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+
+@contextlib.contextmanager
+def locked(*paths, timeout=defaults.DEFAULT_LOCK_TIMEOUT):
+    """Lock many files at once, always in the same order (to avoid deadlocks)
+
+    :param paths: paths to locked files
+    :param timeout: seconds to wait for every lock
+    """
+    with contextlib.ExitStack() as stack:
+        for path in sorted({os.path.abspath(str(path)) for path in paths}):
+            stack.enter_context(FileLock(path, timeout))
+        yield
+
+
+@contextlib.asynccontextmanager
+async def locked_async(*paths, timeout=defaults.DEFAULT_LOCK_TIMEOUT):
+    """Asynchronous version of `locked`, waiting for locks doesn't block event loop.
+    Locks are taken on separate file descriptors, so they exclude each other in the same process too.
+
+    :param paths: paths to locked files
+    :param timeout: seconds to wait for every lock
+    """
+    acquired = []
+    try:
+        for path in sorted({os.path.abspath(str(path)) for path in paths}):
+            file_lock = FileLock(path, timeout)
+            await file_lock.acquire_async()
+            acquired.append(file_lock)
+
+        yield
+    finally:
+        for file_lock in reversed(acquired):
+            file_lock.release()
@@ -0,0 +1,217 @@
+"""Version stored in structured manifests (pyproject.toml, package.json, Cargo.toml)
+
+Manifests are not parsed: version field is located by minimal tokenizer, which skips
+everything but tokens required to find it, and stops as soon as it's found. Byte offsets
+of version value are cached (keyed by stat of manifest, like `version.VersionFile` cache),
+so saving new version right after reading it doesn't tokenize manifest again. New value
+is spliced into original content, rest of manifest (formatting, comments, order of keys)
+is preserved byte by byte.
+"""
+
+import os
+import re
+
+from versionner import defaults
+from versionner import version
+from versionner.errors import ConfigError, VersionnerError
+
+# absolute path of manifest -> (stat key, start, end) of version value
+_OFFSETS = {}
+
+
+class ManifestError(VersionnerError):
+    """Version field can't be found in manifest"""
+
+
+def clear_offsets_cache():
+    """Forget offsets of version fields in all manifests"""
+    _OFFSETS.clear()
+
+
+class Manifest:
+    """Version field in manifest file"""
+
+    FORMAT = None
+
+    def __init__(self, path):
+        """Initialisation
+
+        :param path: path to manifest
+        """
+        self.path = path
+
+    def locate(self, data):
+        """Find version value in manifest content
+
+        :param data:bytes: manifest content
+        :return: (start, end) byte offsets of version value
+        :raise ManifestError:
+        """
+        raise NotImplementedError()
+
+    def _offsets(self, path, key, data):
+        """Offsets of version value, from cache if manifest wasn't changed
+
+        :param path:str: absolute path to manifest
+        :param key: stat key of manifest
+        :param data:bytes: manifest content
+        :return: (start, end)
+        """
+        cached = _OFFSETS.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1:]
+
+        (start, end) = self.locate(data)
+        _OFFSETS[path] = (key, start, end)
+        return start, end
+
+    def read(self):
+        """Read version string from manifest
+
+        :return: (stat key, str)
+        """
+        path = os.path.abspath(str(self.path))
+        with open(path, 'rb') as fh:
+            key = version.stat_key(os.fstat(fh.fileno()))
+            data = fh.read()
+
+        (start, end) = self._offsets(path, key, data)
+        return key, data[start:end].decode('utf-8')
+
+    def write(self, value):
+        """Replace version string in manifest
+
+        :param value:str: new version string
+        :return: stat key of saved manifest
+        """
+        path = os.path.abspath(str(self.path))
+        try:
+            with open(path, 'rb') as fh:
+                key = version.stat_key(os.fstat(fh.fileno()))
+                data = fh.read()
+        except FileNotFoundError as exc:
+            raise ManifestError("Manifest %s doesn't exist, it can't be created by versionner" % path) from exc
+
+        (start, end) = self._offsets(path, key, data)
+        encoded = value.encode('utf-8')
+        key = version.replace_file(path, data[:start] + encoded + data[end:])
+        _OFFSETS[path] = (key, start, start + len(encoded))
+
+        return key
+
+    def __repr__(self):
+        return '<%s(%s)>' % (self.__class__.__name__, self.path)
+
+
+class JsonManifest(Manifest):
+    """Top-level "version" key of JSON manifest (package.json)"""
+
+    FORMAT = 'npm'
+
+    # only strings and brackets are interesting, anything else is skipped by regular expression engine
+    _TOKEN_RXP = re.compile(br'"(?:[^"\\]|\\.)*"|[{}\[\]]')
+    _START_RXP = re.compile(br'\s*\{')
+    _KEY_RXP = re.compile(br'\s*:')
+    _VALUE_RXP = re.compile(br'\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+    def locate(self, data):
+        start = self._START_RXP.match(data)
+        if not start:
+            raise ManifestError("%s doesn't contain JSON object" % self.path)
+
+        depth = 1
+        for token in self._TOKEN_RXP.finditer(data, start.end()):
+            char = data[token.start()]
+            if char in b'{[':
+                depth += 1
+            elif char in b'}]':
+                depth -= 1
+                if not depth:
+                    break
+            elif depth == 1 and token.group(0) == b'"version"' and self._KEY_RXP.match(data, token.end()):
+                value = self._VALUE_RXP.match(data, token.end())
+                if not value:
+                    raise ManifestError("Version in %s is not a string" % self.path)
+                return value.span(1)
+
+        raise ManifestError("Version not found in %s" % self.path)
+
+
+class TomlManifest(Manifest):
+    """`version` key in one of tables of TOML manifest (first table from `TABLES` wins)"""
+
+    TABLES = ()
+
+    _TOKEN_RXP = re.compile(br'''
+        (?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\')
+      | "(?:[^"\\\n]|\\.)*"|'[^'\n]*'
+      | \#[^\n]*
+      | ^[ \t]*\[(?P<array>\[)?(?P<table>[^\[\]\n]+)\]
+      | ^[ \t]*version[ \t]*=[ \t]*(?P<quote>["'])(?P<value>[^"'\n]*)(?P=quote)
+      | (?P<bracket>[\[\]])
+    ''', re.MULTILINE | re.VERBOSE)
+
+    def locate(self, data):
+        found = None
+        table = None
+        # depth of (possibly multi-line) arrays, lines starting with `[` inside them aren't table headers
+        depth = 0
+        pos = 0
+        while True:
+            token = self._TOKEN_RXP.search(data, pos)
+            if token is None:
+                break
+
+            pos = token.end()
+            if token.group('bracket') is not None:
+                depth = depth + 1 if token.group('bracket') == b'[' else max(0, depth - 1)
+            elif token.group('table') is not None and depth:
+                # nested array, not table header: tokenize its content
+                depth += 1
+                pos = data.index(b'[', token.start()) + 1
+            elif token.group('table') is not None:
+                table = None if token.group('array') else token.group('table').decode('utf-8').replace(' ', '')
+            elif token.group('value') is not None and not depth and table in self.TABLES:
+                priority = self.TABLES.index(table)
+                if found is None or priority < found[0]:
+                    found = (priority, token.span('value'))
+                if priority == 0:
+                    break
+
+        if found is None:
+            raise ManifestError("Version not found in %s (expected in one of tables: %s)" % (
+                self.path, ', '.join('[%s]' % table for table in self.TABLES)))
+
+        return found[1]
+
+
+class PyprojectManifest(TomlManifest):
+    """pyproject.toml: PEP 621 `[project]` table, or Poetry's `[tool.poetry]`"""
+
+    FORMAT = 'pyproject'
+    TABLES = ('project', 'tool.poetry')
+
+
+class CargoManifest(TomlManifest):
+    """Cargo.toml: `[package]` table, or `[workspace.package]` in workspace root"""
+
+    FORMAT = 'cargo'
+    TABLES = ('package', 'workspace.package')
+
+
+FORMATS = {manifest.FORMAT: manifest for manifest in (JsonManifest, PyprojectManifest, CargoManifest)}
+
+
+def get(fmt, path):
+    """Return manifest handler for given format
+
+    :param fmt:str: one of FORMATS
+    :param path: path to manifest
+    :return:Manifest
+    :raise ConfigError:
+    """
+    try:
+        return FORMATS[fmt](path)
+    except KeyError:
+        raise ConfigError("Unknown version file format: \"%s\" (available: %s)" % (
+            fmt, ', '.join([defaults.DEFAULT_VERSION_FORMAT] + sorted(FORMATS)))) from None
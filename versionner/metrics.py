@@ -0,0 +1,243 @@
+"""Metrics of versionner runs in Prometheus text format, for node_exporter textfile collector
+
+Collector subscribes to hooks (see `versionner.hooks`) and counts commands, project files
+rewrites and VCS calls. After run metrics are merged with metrics already stored in file
+(so counters and histograms accumulate between runs), and file is atomically replaced. Metrics file
+is locked (see `versionner.lock`) for whole read-merge-write, so concurrent runs don't lose samples:
+
+    ver --metrics-file /var/lib/node_exporter/textfile/versionner.prom up
+"""
+
+import os
+import re
+import threading
+import time
+
+from versionner import hooks
+from versionner import lock
+
+# upper bounds of histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# name: (type, help)
+METRICS = {
+    'versionner_commands_total': ('counter', 'Number of executed commands'),
+    'versionner_command_duration_seconds': ('histogram', 'Duration of commands'),
+    'versionner_files_scanned_total': ('counter', 'Number of project files scanned for version string'),
+    'versionner_files_modified_total': ('counter', 'Number of project files with at least one substitution'),
+    'versionner_substitutions_total': ('counter', 'Number of substitutions done in project files'),
+    'versionner_bytes_processed_total': ('counter', 'Size of scanned project files'),
+    'versionner_vcs_call_duration_seconds': ('histogram', 'Duration of VCS calls'),
+    'versionner_vcs_call_failures_total': ('counter', 'Number of failed VCS calls'),
+    'versionner_last_run_timestamp_seconds': ('gauge', 'Time of last run'),
+}
+
+_SAMPLE_RXP = re.compile(r'^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)')
+_LABEL_RXP = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+_HISTOGRAM_SUFFIXES = ('_bucket', '_sum', '_count')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _unescape(value):
+    return re.sub(r'\\(.)', lambda match: '\n' if match.group(1) == 'n' else match.group(1), value)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _family(name):
+    """Return name of metric family for sample name
+
+    :param name: sample name
+    :return:str
+    """
+    if name in METRICS:
+        return name
+
+    for suffix in _HISTOGRAM_SUFFIXES:
+        if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+            return name[:-len(suffix)]
+
+    return name
+
+
+class Registry:
+    """Storage for samples: (sample name, labels) -> value"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def inc(self, name, labels=None, value=1):
+        """Increase counter
+
+        :param name: metric name
+        :param labels: dict
+        :param value: number
+        """
+        key = (name, tuple(sorted((labels or {}).items())))
+        self.samples[key] = self.samples.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        """Set gauge
+
+        :param name: metric name
+        :param value: number
+        :param labels: dict
+        """
+        self.samples[(name, tuple(sorted((labels or {}).items())))] = value
+
+    def observe(self, name, value, labels=None):
+        """Add observation to histogram
+
+        :param name: metric name
+        :param value: observed value
+        :param labels: dict
+        """
+        labels = labels or {}
+        for bound in BUCKETS:
+            self.inc(name + '_bucket', dict(labels, le=_format_value(bound)), 1 if value <= bound else 0)
+        self.inc(name + '_sum', labels, value)
+        self.inc(name + '_count', labels)
+
+    def merge(self, other):
+        """Add samples from other registry: counters and histograms are summed, gauges replaced
+
+        :param other: Registry
+        """
+        for (key, value) in other.samples.items():
+            if METRICS.get(_family(key[0]), (None, ))[0] == 'gauge':
+                self.samples[key] = value
+            else:
+                self.samples[key] = self.samples.get(key, 0) + value
+
+    @classmethod
+    def parse(cls, data):
+        """Create registry from metrics in text format
+
+        :param data: str
+        :return: Registry
+        """
+        registry = cls()
+        for line in data.splitlines():
+            match = _SAMPLE_RXP.match(line)
+            if not match or line.startswith('#'):
+                continue
+
+            labels = tuple(sorted((key, _unescape(value)) for (key, value) in _LABEL_RXP.findall(match.group(2) or '')))
+            try:
+                registry.samples[(match.group(1), labels)] = float(match.group(3))
+            except ValueError:
+                continue
+
+        return registry
+
+    def format(self):
+        """Dump samples in text format
+
+        :return: str
+        """
+        def sort_key(item):
+            ((name, labels), _) = item
+            le = dict(labels).get('le')
+            return _family(name), name, [label for label in labels if label[0] != 'le'], float(le or 0)
+
+        lines = []
+        family = None
+        for ((name, labels), value) in sorted(self.samples.items(), key=sort_key):
+            if _family(name) != family:
+                family = _family(name)
+                if family in METRICS:
+                    lines.append('# HELP %s %s' % (family, METRICS[family][1]))
+                    lines.append('# TYPE %s %s' % (family, METRICS[family][0]))
+
+            if labels:
+                labels = '{%s}' % ','.join('%s="%s"' % (key, _escape(value)) for (key, value) in labels)
+            lines.append('%s%s %s' % (name, labels or '', _format_value(value)))
+
+        return '\n'.join(lines) + '\n'
+
+
+class Collector:
+    """Collects metrics of current run from hooks"""
+
+    def __init__(self):
+        self.registry = Registry()
+        # hooks are called from worker threads when many projects are bumped
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Register hooks
+
+        :return: Collector
+        """
+        hooks.register(hooks.POST_COMMAND, self._on_command)
+        hooks.register(hooks.POST_FILE_REWRITE, self._on_file_rewrite)
+        hooks.register(hooks.POST_VCS, self._on_vcs)
+        return self
+
+    def uninstall(self):
+        """Unregister hooks"""
+        hooks.unregister(hooks.POST_COMMAND, self._on_command)
+        hooks.unregister(hooks.POST_FILE_REWRITE, self._on_file_rewrite)
+        hooks.unregister(hooks.POST_VCS, self._on_vcs)
+
+    def _on_command(self, _, command, cfg, error, duration, **__):
+        labels = {'command': cfg.command or command.__class__.__name__.lower()}
+        with self._lock:
+            self.registry.inc('versionner_commands_total', dict(labels, status='error' if error else 'ok'))
+            self.registry.observe('versionner_command_duration_seconds', duration, labels)
+
+    def _on_file_rewrite(self, _, project_file, changes, **__):
+        try:
+            size = project_file.file.stat().st_size
+        except OSError:
+            return
+
+        with self._lock:
+            self.registry.inc('versionner_files_scanned_total')
+            self.registry.inc('versionner_bytes_processed_total', value=size)
+            if changes:
+                self.registry.inc('versionner_files_modified_total')
+                self.registry.inc('versionner_substitutions_total', value=changes)
+
+    def _on_vcs(self, _, action, error, duration, **__):
+        labels = {'action': action}
+        with self._lock:
+            self.registry.observe('versionner_vcs_call_duration_seconds', duration, labels)
+            if error is not None:
+                self.registry.inc('versionner_vcs_call_failures_total', labels)
+
+    def save(self, path):
+        """Merge collected metrics with metrics stored in file, and atomically replace it
+
+        :param path: path to metrics file
+        """
+        path = str(path)
+        with lock.locked(path), self._lock:
+            try:
+                with open(path) as fh:
+                    registry = Registry.parse(fh.read())
+            except FileNotFoundError:
+                registry = Registry()
+
+            registry.merge(self.registry)
+            registry.set('versionner_last_run_timestamp_seconds', time.time())
+
+            # file must be replaced atomically, to not let collector read partially written data
+            tmp_path = '%s.%d.tmp' % (path, os.getpid())
+            try:
+                with open(tmp_path, 'w') as fh:
+                    fh.write(registry.format())
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
@@ -0,0 +1,126 @@
+"""Machine readable output of commands: `--output json` and `--output plain`
+
+JSON output is single object, with all fields of CommandOutput and details of modified
+project files and VCS calls (collected from hooks, see `versionner.hooks`):
+
+    {"ok": true, "command": "up", "current_version": "1.3.0", "modifications": 2, "modified_files": 1,
+     "projects": null, "duration": 0.0123,
+     "files": [{"file": "README", "version": "1.3.0", "changes": 2, "duration": 0.0004, "error": null}],
+     "vcs": [{"action": "create_commit", "duration": 0.0081, "error": null}]}
+
+On error:
+
+    {"ok": false, "command": "up", "error": "VersionMismatchError", "message": "...", "ret_code": 3}
+"""
+
+import threading
+
+from versionner import hooks
+from versionner.errors import VersionnerError
+
+FORMATS = ('text', 'json', 'plain')
+
+
+def _error(error):
+    return None if error is None else '%s: %s' % (error.__class__.__name__, error)
+
+
+class Recorder:
+    """Collects details of current run from hooks"""
+
+    def __init__(self):
+        self.files = []
+        self.vcs = []
+        self.duration = None
+        # files rewrites hooks are called from worker threads when many projects are bumped
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Register hooks
+
+        :return: Recorder
+        """
+        hooks.register(hooks.POST_COMMAND, self._on_command)
+        hooks.register(hooks.POST_FILE_REWRITE, self._on_file_rewrite)
+        hooks.register(hooks.POST_VCS, self._on_vcs)
+        return self
+
+    def uninstall(self):
+        """Unregister hooks"""
+        hooks.unregister(hooks.POST_COMMAND, self._on_command)
+        hooks.unregister(hooks.POST_FILE_REWRITE, self._on_file_rewrite)
+        hooks.unregister(hooks.POST_VCS, self._on_vcs)
+
+    def _on_command(self, _, duration, **__):
+        self.duration = duration
+
+    def _on_file_rewrite(self, _, project_file, version, changes, error, duration, **__):
+        with self._lock:
+            self.files.append({
+                'file': project_file.filename,
+                'version': str(version),
+                'changes': changes,
+                'duration': duration,
+                'error': _error(error),
+            })
+
+    def _on_vcs(self, _, action, error, duration, **__):
+        with self._lock:
+            self.vcs.append({'action': action, 'duration': duration, 'error': _error(error)})
+
+
+def render_json(cfg, result, recorder=None):
+    """Render result of command as JSON
+
+    :param cfg: configuration storage
+    :param result: CommandOutput
+    :param recorder: Recorder installed for command
+    :return:str
+    """
+    import json
+
+    data = {
+        'ok': True,
+        'command': cfg.command,
+        'current_version': None if result.current_version is None else str(result.current_version),
+        'modifications': result.modifications,
+        'modified_files': result.modified_files,
+        'projects': None if result.projects is None else
+            {name: str(version) for (name, version) in result.projects.items()},
+    }
+    if recorder is not None:
+        data['duration'] = recorder.duration
+        data['files'] = recorder.files
+        data['vcs'] = recorder.vcs
+
+    return json.dumps(data)
+
+
+def render_json_error(cfg, exc):
+    """Render error as JSON
+
+    :param cfg: configuration storage
+    :param exc: VersionnerError or VCSError
+    :return:str
+    """
+    import json
+
+    return json.dumps({
+        'ok': False,
+        'command': cfg.command,
+        'error': exc.__class__.__name__,
+        'message': str(exc),
+        'ret_code': getattr(exc, 'ret_code', VersionnerError.ret_code),
+    })
+
+
+def render_plain(result):
+    """Render result of command as bare version (or `NAME VERSION` lines for many projects)
+
+    :param result: CommandOutput
+    :return:str
+    """
+    if result.projects:
+        return '\n'.join('%s %s' % (name, version) for (name, version) in result.projects.items())
+
+    return str(result.current_version)
@@ -0,0 +1,223 @@
+"""Profiling of versionner phases: timings of config parsing, command execution, project files
+rewrites and VCS calls, and peak memory usage.
+
+Profiling is disabled by default, and then `span` costs only single function call:
+
+    with profiling.span('rewrite README', 'file') as info:
+        ...
+        if info is not None:
+            info['substitutions'] = 3
+"""
+
+import os
+import time
+
+FORMATS = ('table', 'json', 'chrome')
+
+# active profiler, None if profiling is disabled
+PROFILER = None
+
+
+class _NullSpan:
+    """Context manager used when profiling is disabled"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Single measured phase"""
+
+    __slots__ = ('name', 'category', 'start', 'end', 'thread', 'args', '_profiler')
+
+    def __init__(self, profiler, name, category, args):
+        self._profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+        self.thread = profiler.get_ident()
+        self.start = None
+        self.end = None
+
+    @property
+    def duration(self):
+        """Duration of span in seconds
+
+        :return:float
+        """
+        return (self.end or time.perf_counter()) - self.start
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.args
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self._profiler.spans.append(self)
+        return False
+
+
+class Profiler:
+    """Collects spans and peak memory usage"""
+
+    def __init__(self, trace_memory=True):
+        """Initialisation, starts measuring
+
+        :param trace_memory:bool: trace memory allocations with tracemalloc
+        """
+        # imported lazily, to not slow down startup when profiling is disabled
+        import threading
+        import tracemalloc
+
+        self.get_ident = threading.get_ident
+
+        self.spans = []
+        self.start = time.perf_counter()
+        self.end = None
+        self.peak_memory = None
+        self._tracemalloc = tracemalloc if trace_memory and not tracemalloc.is_tracing() else None
+        if self._tracemalloc:
+            self._tracemalloc.start()
+
+    def span(self, name, category, **args):
+        """Create span for measured phase
+
+        :param name: phase name
+        :param category: phase category (config, command, file, vcs, io)
+        :param args: additional data, can be extended inside `with` block
+        :return:Span
+        """
+        return Span(self, name, category, args)
+
+    def stop(self):
+        """Stop measuring"""
+        if self.end is not None:
+            return
+
+        self.end = time.perf_counter()
+        if self._tracemalloc:
+            (_, self.peak_memory) = self._tracemalloc.get_traced_memory()
+            self._tracemalloc.stop()
+
+    def to_dict(self):
+        """Dump results as dict
+
+        :return:dict
+        """
+        return {
+            'total': (self.end or time.perf_counter()) - self.start,
+            'peak_memory': self.peak_memory,
+            'spans': [{
+                'name': span.name,
+                'category': span.category,
+                'start': span.start - self.start,
+                'duration': span.duration,
+                'thread': span.thread,
+                'args': span.args,
+            } for span in sorted(self.spans, key=lambda span: span.start)],
+        }
+
+    def to_chrome_trace(self):
+        """Dump results in Chrome trace event format (chrome://tracing, Perfetto)
+
+        :return:dict
+        """
+        pid = os.getpid()
+        events = [{
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': (span.start - self.start) * 1e6,
+            'dur': span.duration * 1e6,
+            'pid': pid,
+            'tid': span.thread,
+            'args': span.args,
+        } for span in sorted(self.spans, key=lambda span: span.start)]
+
+        if self.peak_memory is not None:
+            events.append({
+                'name': 'memory', 'ph': 'C', 'ts': ((self.end or time.perf_counter()) - self.start) * 1e6,
+                'pid': pid, 'args': {'peak': self.peak_memory},
+            })
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def format_table(self):
+        """Format results as human readable table
+
+        :return:str
+        """
+        data = self.to_dict()
+        lines = ['%-50s %-8s %10s  %s' % ('phase', 'category', 'time [ms]', 'details')]
+        for span in data['spans']:
+            details = ', '.join('%s=%s' % (key, value) for (key, value) in sorted(span['args'].items()))
+            lines.append('%-50s %-8s %10.3f  %s' % (span['name'][:50], span['category'], span['duration'] * 1000, details))
+
+        lines.append('%-50s %-8s %10.3f' % ('total', '', data['total'] * 1000))
+        if data['peak_memory'] is not None:
+            lines.append('peak memory: %.1f KB' % (data['peak_memory'] / 1024))
+
+        return '\n'.join(lines)
+
+    def dump(self, fmt, fh):
+        """Write results in given format to file handler
+
+        :param fmt: one of FORMATS
+        :param fh: file handler
+        """
+        import json
+
+        if fmt == 'table':
+            fh.write(self.format_table() + '\n')
+        elif fmt == 'json':
+            json.dump(self.to_dict(), fh, indent=2)
+            fh.write('\n')
+        elif fmt == 'chrome':
+            json.dump(self.to_chrome_trace(), fh)
+            fh.write('\n')
+        else:
+            raise ValueError("Unknown profile format: %s" % fmt)
+
+
+def start(trace_memory=True):
+    """Enable profiling
+
+    :param trace_memory:bool
+    :return:Profiler
+    """
+    global PROFILER  # pylint: disable=global-statement
+    PROFILER = Profiler(trace_memory)
+    return PROFILER
+
+
+def stop():
+    """Disable profiling
+
+    :return:Profiler|None: stopped profiler
+    """
+    global PROFILER  # pylint: disable=global-statement
+    profiler, PROFILER = PROFILER, None
+    if profiler:
+        profiler.stop()
+    return profiler
+
+
+def span(name, category, **args):
+    """Create span for measured phase, if profiling is enabled
+
+    :param name: phase name
+    :param category: phase category
+    :param args: additional data
+    :return: context manager, which returns dict for additional data or None if profiling is disabled
+    """
+    if PROFILER is None:
+        return _NULL_SPAN
+    return PROFILER.span(name, category, **args)
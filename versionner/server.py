@@ -0,0 +1,191 @@
+"""Long-running server answering requests for current version over Unix socket
+
+Protocol: client sends requests as JSON objects, one per line, and server responds
+for each of them with single line containing JSON object. Requests:
+
+    {"command": "read"}
+    {"command": "up", "part": "minor", "value": 1, "commit": false}
+    {"command": "set", "value": "1.2.3", "commit": false}
+    {"command": "set", "major": 1, "minor": 2, "patch": 3, "prerelease": "rc1", "build": "b7"}
+    {"command": "tag", "params": ["-s"]}
+    {"command": "shutdown"}
+
+Responses:
+
+    {"ok": true, "current_version": "1.2.3", "modifications": 0, "modified_files": 0}
+    {"ok": false, "error": "InvalidVersionError", "message": "..."}
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+
+from versionner import api
+from versionner import commands
+from versionner import config
+from versionner import version
+from versionner import watcher
+from versionner.commands.batch import field_errors
+from versionner.errors import VersionnerError
+from versionner.vcs.errors import VCSError
+
+
+class RequestError(VersionnerError):
+    """Invalid request sent to server"""
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Handle requests from single connection"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line.decode('utf-8'))
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be an object")
+            except ValueError as exc:
+                response = {'ok': False, 'error': RequestError.__name__, 'message': str(exc)}
+            else:
+                try:
+                    response = self.server.dispatch(request)
+                # client waits for response, connection must not be closed by unexpected error
+                except Exception as exc:  # pylint: disable=broad-except
+                    response = {'ok': False, 'error': exc.__class__.__name__, 'message': str(exc)}
+
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+            if self.server.stopped:
+                break
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Keeps configuration and current version in memory, and invalidates them when
+    version file or config files are changed.
+    Every connection is handled in its own thread, so persistent clients don't block others;
+    requests are executed one by one.
+    """
+
+    timeout = 0.5
+    daemon_threads = True
+
+    def __init__(self, path, cfg, polling=False):
+        """Initialisation
+
+        :param path: path to Unix socket
+        :param cfg: configuration storage
+        :type: Config
+        :param polling:bool: force using stat polling instead of inotify
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise VersionnerError("Unix sockets are not supported on this system")
+
+        self.path = str(path)
+        self.cfg = cfg
+        self.stopped = False
+        self._version = None
+        # guards cached version, configuration and watcher shared by connection threads
+        self._lock = threading.Lock()
+        self._watcher = watcher.create([cfg.version_file] + list(cfg.config_files), polling=polling)
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        super().__init__(self.path, RequestHandler)
+
+    def _invalidate(self):
+        """Forget about cached data changed on disk since last check"""
+        changed = self._watcher.changed()
+        if not changed:
+            return
+
+        self._version = None
+
+        config_files = {os.path.abspath(str(path)) for path in self.cfg.config_files}
+        if changed & config_files:
+            self.cfg = config.reload(self.cfg)
+
+    def current_version(self):
+        """Return current version, read version file only if it was changed
+
+        :return:Version
+        """
+        self._invalidate()
+
+        if self._version is None:
+            self._version = version.VersionFile(self.cfg.version_file, self.cfg.version_format).read()
+
+        return self._version
+
+    def _handle_up(self, request):
+        result = api.bump(request.get('part'), request.get('value'), cfg=self.cfg, commit=bool(request.get('commit')))
+        self._version = None
+
+        return result
+
+    def _handle_set(self, request):
+        fields = {field: request.get(field) for field in version.Version.VALID_FIELDS}
+        result = api.set(request.get('value'), cfg=self.cfg, commit=bool(request.get('commit')), **fields)
+        self._version = None
+
+        return result
+
+    def _handle_tag(self, request):
+        return api.tag(request.get('params'), cfg=self.cfg)
+
+    def _handle_read(self, _):
+        return commands.CommandOutput(self.current_version())
+
+    def _handle_shutdown(self, _):
+        self.stopped = True
+        return commands.CommandOutput(self.current_version())
+
+    def dispatch(self, request):
+        """Execute request and build response
+
+        :param request:dict
+        :return:dict
+        """
+        handler = getattr(self, '_handle_%s' % request.get('command'), None)
+
+        try:
+            if handler is None:
+                raise RequestError("Unknown command: %s" % request.get('command'))
+
+            errors = field_errors(request)
+            if errors:
+                raise RequestError('; '.join(errors))
+
+            with self._lock:
+                if self.stopped:
+                    raise RequestError("Server is shutting down")
+
+                self._invalidate()
+                result = handler(request)
+        except (VersionnerError, VCSError, ValueError, TypeError, OSError) as exc:
+            return {'ok': False, 'error': exc.__class__.__name__, 'message': str(exc)}
+
+        return {
+            'ok': True,
+            'current_version': str(result.current_version),
+            'modifications': result.modifications,
+            'modified_files': result.modified_files,
+        }
+
+    def serve(self):
+        """Handle requests until shutdown is requested"""
+        while not self.stopped:
+            self.handle_request()
+
+    def server_close(self):
+        super().server_close()
+        with self._lock:
+            self.stopped = True
+            self._watcher.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
@@ -1,8 +1,16 @@
-"""Contains VCS class that is abstraction for VCS actions"""
+"""Contains VCS class that is abstraction for VCS actions
 
+Every action (except streamed `log_file`) has asynchronous counterpart (`create_tag_async` etc.)
+for use in asyncio event loop. Engines implement them with asyncio subprocesses, actions missing
+in engine are executed in executor.
+"""
+
+import functools
 import importlib
 import re
+import time
 
+from versionner import hooks
 from versionner.vcs import errors
 
 
@@ -10,8 +18,12 @@ class VCS:
     """VCS abstraction layer.
     Imports module engine, and proxy calls into it
     """
-    def __init__(self, engine):
-        """Import engine module."""
+    def __init__(self, engine, root=None):
+        """Import engine module.
+
+        :param engine:str: name of VCS engine
+        :param root: path to repository root, if known (allows to skip repository discovery)
+        """
         self._engine = engine
 
         if engine.startswith('_') or engine.endswith('_') or not re.match(r'^\w+$', engine, re.UNICODE):
@@ -22,7 +34,7 @@ class VCS:
         except ImportError:
             raise errors.UnknownVCSError("Unknown VCS engine: %s" % engine)
 
-        self._command = builder.VCSEngine()
+        self._command = builder.VCSEngine(root)
 
     def __enter__(self):
         return self
@@ -30,6 +42,58 @@ class VCS:
     def __exit__(self, exc_type, exc_val, exc_tb):
         return
 
+    def _call(self, action, *args):
+        """Call action of engine, and emit pre_vcs/post_vcs hooks around it
+
+        :param action: name of engine method
+        :param args: arguments for engine method
+        :return:
+        """
+        method = getattr(self._command, action)
+        if not hooks.enabled(hooks.PRE_VCS, hooks.POST_VCS):
+            return method(*args)
+
+        hooks.emit(hooks.PRE_VCS, action=action, args=args)
+
+        start = time.perf_counter()
+        error = None
+        try:
+            return method(*args)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            hooks.emit(hooks.POST_VCS, action=action, args=args, error=error, duration=time.perf_counter() - start)
+
+    async def _call_async(self, action, *args):
+        """Asynchronous version of VCS._call, uses `<action>_async` method of engine if it exists,
+        or runs `<action>` method in executor
+
+        :param action: name of engine method
+        :param args: arguments for engine method
+        :return:
+        """
+        method = getattr(self._command, action + '_async', None)
+        if method is None:
+            import asyncio
+
+            method = functools.partial(asyncio.get_running_loop().run_in_executor, None, getattr(self._command, action))
+
+        if not hooks.enabled(hooks.PRE_VCS, hooks.POST_VCS):
+            return await method(*args)
+
+        hooks.emit(hooks.PRE_VCS, action=action, args=args)
+
+        start = time.perf_counter()
+        error = None
+        try:
+            return await method(*args)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            hooks.emit(hooks.POST_VCS, action=action, args=args, error=error, duration=time.perf_counter() - start)
+
     def create_tag(self, version, params):
         """Create VCS tag
 
@@ -37,14 +101,14 @@ class VCS:
         :param params:
         :return:
         """
-        return self._command.create_tag(version, params)
+        return self._call('create_tag', version, params)
 
     def raise_if_cant_commit(self):
         """Verify VCS status and raise an error if commit is disallowed
 
         :return:
         """
-        return self._command.raise_if_cant_commit()
+        return self._call('raise_if_cant_commit')
 
     def create_commit(self, message):
         """Create commit
@@ -52,7 +116,7 @@ class VCS:
         :param message:
         :return:
         """
-        return self._command.create_commit(message)
+        return self._call('create_commit', message)
 
     def add_to_stage(self, paths):
         """Stage given files
@@ -60,4 +124,95 @@ class VCS:
         :param paths:
         :return:
         """
-        return self._command.add_to_stage(paths)
+        return self._call('add_to_stage', paths)
+
+    def list_files(self):
+        """List files in repository, excluding ignored ones
+
+        :return: list of paths
+        """
+        return self._call('list_files')
+
+    def list_submodules(self):
+        """List initialized submodules of repository
+
+        :return: list of paths
+        """
+        return self._call('list_submodules')
+
+    def head(self):
+        """Find current commit
+
+        :return: commit hash, or None if there are no commits yet
+        """
+        return self._call('head')
+
+    def is_ancestor(self, ancestor, revision):
+        """Check if commit is ancestor of (or the same as) other one
+
+        :param ancestor: commit hash
+        :param revision: commit hash
+        :return:bool
+        """
+        return self._call('is_ancestor', ancestor, revision)
+
+    def log_file(self, path, since=None):
+        """Iterate over commits changing given file, newest first; pre_vcs/post_vcs hooks are
+        emitted around the whole iteration
+
+        :param path: path to file
+        :param since: commit hash, only commits after this one are listed
+        :return: generator of (commit hash, timestamp, removed lines, added lines)
+        """
+        records = self._command.log_file(path, since)
+        if not hooks.enabled(hooks.PRE_VCS, hooks.POST_VCS):
+            return records
+
+        return self._iterate('log_file', (path, since), records)
+
+    @staticmethod
+    def _iterate(action, args, records):
+        """Iterate over results of streamed action, and emit pre_vcs/post_vcs hooks around it"""
+        hooks.emit(hooks.PRE_VCS, action=action, args=args)
+
+        start = time.perf_counter()
+        error = None
+        try:
+            yield from records
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            hooks.emit(hooks.POST_VCS, action=action, args=args, error=error, duration=time.perf_counter() - start)
+
+    async def create_tag_async(self, version, params):
+        """Asynchronous version of VCS.create_tag"""
+        return await self._call_async('create_tag', version, params)
+
+    async def raise_if_cant_commit_async(self):
+        """Asynchronous version of VCS.raise_if_cant_commit"""
+        return await self._call_async('raise_if_cant_commit')
+
+    async def create_commit_async(self, message):
+        """Asynchronous version of VCS.create_commit"""
+        return await self._call_async('create_commit', message)
+
+    async def add_to_stage_async(self, paths):
+        """Asynchronous version of VCS.add_to_stage"""
+        return await self._call_async('add_to_stage', paths)
+
+    async def list_files_async(self):
+        """Asynchronous version of VCS.list_files"""
+        return await self._call_async('list_files')
+
+    async def list_submodules_async(self):
+        """Asynchronous version of VCS.list_submodules"""
+        return await self._call_async('list_submodules')
+
+    async def head_async(self):
+        """Asynchronous version of VCS.head"""
+        return await self._call_async('head')
+
+    async def is_ancestor_async(self, ancestor, revision):
+        """Asynchronous version of VCS.is_ancestor"""
+        return await self._call_async('is_ancestor', ancestor, revision)
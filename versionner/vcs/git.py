@@ -1,57 +1,122 @@
 """Realize VCS action for git"""
 
+import os
+import re
 import subprocess
+import tempfile
 
 from versionner import defaults
+from versionner import profiling
 from versionner.vcs import errors
 
 
+# line of `git submodule status`: state, commit, path and optional description of commit
+_SUBMODULE_STATUS_RXP = re.compile(r'^([ +U-])[0-9a-f]+ (.+?)(?: \([^()]*\))?$')
+
+
 class VCSCommandsBuilder:
     """ Build shell VCS command"""
 
-    @staticmethod
-    def tag(version, params):
+    def __init__(self, root=None):
+        """
+        :param root: path to repository root, if known git is executed there and skips discovery
+        """
+        self._git = ['git']
+        if root:
+            self._git.extend(['-C', str(root)])
+
+    def tag(self, version, params):
         """Build and return full command to use with subprocess.Popen for 'git tag' command
 
         :param version:
         :param params:
         :return: list
         """
-        cmd = ['git', 'tag', '-a', '-m', 'v%s' % version, str(version)]
+        cmd = self._git + ['tag', '-a', '-m', 'v%s' % version, str(version)]
         if params:
             cmd.extend(params)
 
         return cmd
 
-    @staticmethod
-    def status():
+    def status(self):
         """Build and return full command to use with subprocess.Popen for 'git status' command
 
         :return: list
         """
-        cmd = ['git', 'status', '--porcelain']
+        cmd = self._git + ['status', '--porcelain']
 
         return cmd
 
-    @staticmethod
-    def commit(message):
+    def commit(self, message):
         """Build and return full command to use with subprocess.Popen for 'git commit' command
 
         :param message:
         :return: list
         """
-        cmd = ['git', 'commit', '-m', message]
+        cmd = self._git + ['commit', '-m', message]
 
         return cmd
 
-    @staticmethod
-    def add(paths):
+    def add(self, paths):
         """Build and return full command to use with subprocess.Popen for 'git add' command
 
         :param paths:
         :return: list
         """
-        cmd = ['git', 'add'] + list(paths)
+        cmd = self._git + ['add'] + list(paths)
+
+        return cmd
+
+    def ls_files(self):
+        """Build and return full command to use with subprocess.Popen for 'git ls-files' command
+        (lists tracked and untracked, but not ignored files)
+
+        :return: list
+        """
+        cmd = self._git + ['ls-files', '-z', '--cached', '--others', '--exclude-standard']
+
+        return cmd
+
+    def rev_parse(self, revision):
+        """Build and return full command to use with subprocess.Popen for 'git rev-parse' command
+
+        :param revision:
+        :return: list
+        """
+        cmd = self._git + ['rev-parse', '--verify', '--quiet', revision]
+
+        return cmd
+
+    def is_ancestor(self, ancestor, revision):
+        """Build and return full command to use with subprocess.Popen for 'git merge-base --is-ancestor' command
+
+        :param ancestor:
+        :param revision:
+        :return: list
+        """
+        cmd = self._git + ['merge-base', '--is-ancestor', ancestor, revision]
+
+        return cmd
+
+    def log_file(self, path, since=None):
+        """Build and return full command to use with subprocess.Popen for 'git log' command, listing
+        commits changing given file (following renames) with their diffs, without context lines
+
+        :param path:
+        :param since: list only commits after this one
+        :return: list
+        """
+        cmd = self._git + ['log', '--format=%x00%H %ct', '--patch', '--unified=0', '--no-color', '--no-ext-diff',
+            '--follow', 'HEAD' if since is None else '%s..HEAD' % since, '--', str(path)]
+
+        return cmd
+
+    def submodule_status(self):
+        """Build and return full command to use with subprocess.Popen for 'git submodule status' command
+
+        :return: list
+        """
+        cmd = self._git + ['submodule', 'status']
 
         return cmd
 
@@ -59,19 +124,56 @@ class VCSCommandsBuilder:
 class VCSEngine:
     """Main class for working with VCS"""
 
-    def __init__(self):
-        self._command = VCSCommandsBuilder()
+    def __init__(self, root=None):
+        self._root = root
+        self._command = VCSCommandsBuilder(root)
 
     @staticmethod
-    def _exec(cmd):
+    def _exec(cmd, timeout=defaults.DEFAULT_VCS_TIMEOUT):
         """Execute command using subprocess.Popen
         :param cmd:
+        :param timeout: seconds to wait for command, None to wait infinitely
         :return: (code, stdout, stderr)
         """
-        process = subprocess.Popen(cmd, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
+        subcommand = cmd[3] if cmd[1] == '-C' else cmd[1]
+        with profiling.span('git %s' % subcommand, 'vcs') as info:
+            process = subprocess.Popen(cmd, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
+
+            # pylint: disable=unexpected-keyword-arg
+            try:
+                (stdout, stderr) = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
 
-        # pylint: disable=unexpected-keyword-arg
-        (stdout, stderr) = process.communicate(timeout=defaults.DEFAULT_VCS_TIMEOUT)
+            if info is not None:
+                info['returncode'] = process.returncode
+
+        return process.returncode, stdout.decode(), stderr.decode()
+
+    @staticmethod
+    async def _exec_async(cmd, timeout=defaults.DEFAULT_VCS_TIMEOUT):
+        """Execute command as asyncio subprocess, without blocking event loop
+        :param cmd:
+        :param timeout: seconds to wait for command, None to wait infinitely
+        :return: (code, stdout, stderr)
+        """
+        import asyncio
+
+        subcommand = cmd[3] if cmd[1] == '-C' else cmd[1]
+        with profiling.span('git %s' % subcommand, 'vcs') as info:
+            process = await asyncio.create_subprocess_exec(*cmd, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
+
+            try:
+                (stdout, stderr) = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+
+            if info is not None:
+                info['returncode'] = process.returncode
 
         return process.returncode, stdout.decode(), stderr.decode()
 
@@ -82,10 +184,14 @@ class VCSEngine:
         :param params:
         :return:
         """
-        cmd = self._command.tag(version, params)
+        return self._tag_created(version, *self._exec(self._command.tag(version, params)))
 
-        (code, stdout, stderr) = self._exec(cmd)
+    async def create_tag_async(self, version, params):
+        """Asynchronous version of VCSEngine.create_tag"""
+        return self._tag_created(version, *await self._exec_async(self._command.tag(version, params)))
 
+    @staticmethod
+    def _tag_created(version, code, stdout, stderr):
         if code:
             raise errors.VCSError('Can\'t create VCS tag %s. Process exited with code %d and message: %s' % (
                 version, code, stderr or stdout))
@@ -95,10 +201,14 @@ class VCSEngine:
 
         :return:
         """
-        cmd = self._command.status()
+        return self._status_checked(*self._exec(self._command.status()))
 
-        (code, stdout, stderr) = self._exec(cmd)
+    async def raise_if_cant_commit_async(self):
+        """Asynchronous version of VCSEngine.raise_if_cant_commit"""
+        return self._status_checked(*await self._exec_async(self._command.status()))
 
+    @staticmethod
+    def _status_checked(code, stdout, stderr):
         if code:
             raise errors.VCSError('Can\'t verify VCS status. Process exited with code %d and message: %s' % (
                 code, stderr or stdout))
@@ -114,10 +224,14 @@ class VCSEngine:
         :param message:
         :return:
         """
-        cmd = self._command.commit(message)
+        return self._commit_created(*self._exec(self._command.commit(message)))
 
-        (code, stdout, stderr) = self._exec(cmd)
+    async def create_commit_async(self, message):
+        """Asynchronous version of VCSEngine.create_commit"""
+        return self._commit_created(*await self._exec_async(self._command.commit(message)))
 
+    @staticmethod
+    def _commit_created(code, stdout, stderr):
         if code:
             raise errors.VCSError('Commit failed. Process exited with code %d and message: %s' % (
                 code, stderr or stdout))
@@ -128,10 +242,148 @@ class VCSEngine:
         :param paths:
         :return:
         """
-        cmd = self._command.add(paths)
+        return self._staged(*self._exec(self._command.add(paths)))
 
-        (code, stdout, stderr) = self._exec(cmd)
+    async def add_to_stage_async(self, paths):
+        """Asynchronous version of VCSEngine.add_to_stage"""
+        return self._staged(*await self._exec_async(self._command.add(paths)))
 
+    @staticmethod
+    def _staged(code, stdout, stderr):
         if code:
             raise errors.VCSError('Can\'t add paths to VCS. Process exited with code %d and message: %s' % (
                 code, stderr + stdout))
+
+    def list_files(self):
+        """List files in repository, excluding ignored ones
+
+        :return: list of paths (relative to current directory if root of repository is unknown)
+        """
+        # time of listing grows with size of repository, so it's not limited like other commands
+        return self._files_listed(*self._exec(self._command.ls_files(), timeout=None))
+
+    async def list_files_async(self):
+        """Asynchronous version of VCSEngine.list_files"""
+        return self._files_listed(*await self._exec_async(self._command.ls_files(), timeout=None))
+
+    def _files_listed(self, code, stdout, stderr):
+        if code:
+            raise errors.VCSError('Can\'t list files. Process exited with code %d and message: %s' % (
+                code, stderr or stdout))
+
+        paths = stdout.split('\0')[:-1]
+        if self._root:
+            paths = [os.path.join(str(self._root), path) for path in paths]
+
+        return paths
+
+    def list_submodules(self):
+        """List initialized submodules of repository
+
+        :return: list of paths (relative to current directory if root of repository is unknown)
+        """
+        return self._submodules_listed(*self._exec(self._command.submodule_status()))
+
+    async def list_submodules_async(self):
+        """Asynchronous version of VCSEngine.list_submodules"""
+        return self._submodules_listed(*await self._exec_async(self._command.submodule_status()))
+
+    def _submodules_listed(self, code, stdout, stderr):
+        if code:
+            raise errors.VCSError('Can\'t list submodules. Process exited with code %d and message: %s' % (
+                code, stderr or stdout))
+
+        paths = []
+        for line in stdout.splitlines():
+            match = _SUBMODULE_STATUS_RXP.match(line)
+            # not initialized submodules ('-') and ones with merge conflicts ('U') are skipped
+            if match and match.group(1) in ' +':
+                paths.append(match.group(2))
+
+        if self._root:
+            paths = [os.path.join(str(self._root), path) for path in paths]
+
+        return paths
+
+    def head(self):
+        """Find current commit
+
+        :return: commit hash, or None if there are no commits yet
+        """
+        return self._head_found(*self._exec(self._command.rev_parse('HEAD')))
+
+    async def head_async(self):
+        """Asynchronous version of VCSEngine.head"""
+        return self._head_found(*await self._exec_async(self._command.rev_parse('HEAD')))
+
+    @staticmethod
+    def _head_found(code, stdout, _):
+        return None if code else stdout.strip()
+
+    def is_ancestor(self, ancestor, revision):
+        """Check if commit is ancestor of (or the same as) other one
+
+        :param ancestor: commit hash
+        :param revision: commit hash
+        :return:bool: False also if any of commits doesn't exist (ie. history was rewritten)
+        """
+        (code, _, _) = self._exec(self._command.is_ancestor(ancestor, revision))
+        return code == 0
+
+    async def is_ancestor_async(self, ancestor, revision):
+        """Asynchronous version of VCSEngine.is_ancestor"""
+        (code, _, _) = await self._exec_async(self._command.is_ancestor(ancestor, revision))
+        return code == 0
+
+    def log_file(self, path, since=None):
+        """Iterate over commits changing given file (following renames), newest first.
+        Output of `git log` is parsed while it's streamed, so it's never buffered as a whole.
+
+        :param path: path to file
+        :param since: commit hash, only commits after this one are listed
+        :return: generator of (commit hash, timestamp, removed lines, added lines)
+        """
+        cmd = self._command.log_file(path, since)
+        # stderr isn't read until stdout is consumed, pipe could fill up and block git
+        with profiling.span('git log', 'vcs') as info, tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(cmd, stderr=stderr_file, stdout=subprocess.PIPE)
+            commits = 0
+            try:
+                record = None
+                in_hunk = False
+                for line in process.stdout:
+                    if line.startswith(b'\0'):
+                        if record is not None:
+                            yield record
+                        (commit, timestamp) = line[1:].split()
+                        record = (commit.decode(), int(timestamp), [], [])
+                        commits += 1
+                        in_hunk = False
+                    elif record is None:
+                        continue
+                    elif line.startswith(b'@@'):
+                        in_hunk = True
+                    elif line.startswith(b'diff '):
+                        in_hunk = False
+                    elif in_hunk and line[:1] in (b'-', b'+'):
+                        record[2 if line[:1] == b'-' else 3].append(line[1:].decode(errors='replace').rstrip('\r\n'))
+
+                if record is not None:
+                    yield record
+            except GeneratorExit:
+                # consumer stopped reading
+                process.kill()
+                process.communicate()
+                raise
+
+            code = process.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+
+            if info is not None:
+                info['returncode'] = code
+                info['commits'] = commits
+
+        if code:
+            raise errors.VCSError('Can\'t read log of %s. Process exited with code %d and message: %s' % (
+                path, code, stderr.decode()))
@@ -1,13 +1,16 @@
 """Playing with versions and version file"""
 
-from collections import abc
+from collections import abc, OrderedDict
 import functools
+import os
 import pathlib
 import shutil
 import tempfile
+import threading
 
 import semver
 
+from versionner import defaults
 from versionner.errors import VersionnerError
 
 
@@ -15,6 +18,110 @@ class InvalidVersionError(VersionnerError):
     """Bad version string/value error"""
 
 
+class VersionMismatchError(VersionnerError):
+    """Current version is different than expected one"""
+    ret_code = 3
+
+
+class ParseCache:
+    """Bounded LRU cache for parsed version strings.
+    Maps version string into tuple of fields: (major, minor, patch, prerelease, build).
+    It's shared by threads (ie. `ver serve`, asynchronous API), so entries are changed under lock.
+    """
+
+    __slots__ = ('_data', '_maxsize', '_lock', 'hits', 'misses')
+
+    def __init__(self, maxsize):
+        """Initialisation
+
+        :param maxsize:int: max number of cached entries, 0 disables cache
+        """
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        """Max number of cached entries
+
+        :return:int
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        """Set max number of cached entries, evict the oldest ones if required
+
+        :param maxsize:int
+        """
+        if maxsize < 0:
+            raise ValueError("Cache size cannot be negative: %d" % maxsize)
+
+        with self._lock:
+            self._maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, version):
+        """Return fields parsed from version string, parse it if not cached
+
+        :param version:str
+        :return:tuple
+        :raise ValueError:
+        """
+        with self._lock:
+            fields = self._data.get(version)
+            if fields is not None:
+                self.hits += 1
+                self._data.move_to_end(version)
+                return fields
+
+            self.misses += 1
+
+        # parsed outside of lock, the same version can be parsed by many threads at once
+        parsed = semver.parse(version)
+        fields = (
+            parsed['major'], parsed['minor'], parsed['patch'],
+            parsed.get('prerelease', ''), parsed.get('build', ''),
+        )
+
+        with self._lock:
+            if self._maxsize:
+                self._data[version] = fields
+                if len(self._data) > self._maxsize:
+                    self._data.popitem(last=False)
+
+        return fields
+
+    def clear(self):
+        """Remove all cached entries and reset statistics"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return cache statistics
+
+        :return:dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'maxsize': self._maxsize,
+                'currsize': len(self._data),
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+PARSE_CACHE = ParseCache(defaults.DEFAULT_PARSE_CACHE_SIZE)
+
+
 @functools.total_ordering
 class Version:
     """Parse and manipulate version string"""
@@ -69,8 +176,9 @@ class Version:
         :param version:
         :return:
         """
-        version = semver.parse(version)
-        self._parse_dict(version)
+        (self.major, self.minor, self.patch, prerelease, build) = PARSE_CACHE.get(version)
+        self.prerelease = prerelease or ''
+        self.build = build or ''
 
     def _parse(self, version):
         """Recognize version type and dispatch it to self._parse_*
@@ -190,40 +298,105 @@ class Version:
         return result == -1
 
 
+# absolute path of version file -> (stat key, Version), shared by all VersionFile instances
+_READ_CACHE = {}
+
+
+def stat_key(stat):
+    """Build key identifying content of file: replaced file has new inode, modified one new size or mtime
+
+    :param stat: os.stat_result
+    :return:tuple
+    """
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def clear_read_cache():
+    """Forget all versions read from version files"""
+    _READ_CACHE.clear()
+
+
+def replace_file(path, data):
+    """Replace content of file in safe way (using temporary file in the same directory,
+    so file is replaced atomically and readers never see partially written file)
+
+    :param path: path to file
+    :param data:bytes: new content
+    :return: stat key of new file
+    """
+    path = pathlib.Path(path)
+    with tempfile.NamedTemporaryFile(mode='wb', dir=str(path.parent), prefix='.%s.' % path.name,
+            delete=False) as fh:
+        fh.write(data)
+
+    try:
+        if path.exists():
+            shutil.copystat(str(path), fh.name)
+            # keep permissions only, content is new (and tools comparing mtime must notice it)
+            os.utime(fh.name)
+        key = stat_key(os.stat(fh.name))
+        os.replace(fh.name, str(path))
+    except OSError:
+        os.unlink(fh.name)
+        raise
+
+    # renamed file keeps inode and mtime, so key is valid without calling stat again
+    return key
+
+
 class VersionFile():
     """Manipulate project version file"""
 
-    __slots__ = ('_path', )
+    __slots__ = ('_path', '_manifest')
 
-    def __init__(self, path):
+    def __init__(self, path, fmt=None):
         """Initialisation
 
         :param path:pathlib.Path
+        :param fmt:str: format of version file: 'plain' (default) or one of `versionner.manifests.FORMATS`
         """
         self._path = path
+        self._manifest = None
+        if fmt and fmt != defaults.DEFAULT_VERSION_FORMAT:
+            # manifests are imported lazily, plain version file is the most common case
+            from versionner import manifests
+            self._manifest = manifests.get(fmt, path)
 
     def read(self):
-        """Read version from version file
+        """Read version from version file, file is read and parsed again only if it was changed
+        since last read or write
 
         :rtype : Version
         :return:
         """
-        with self._path.open(mode='r') as fh:
-            version = fh.read().strip()
+        path = os.path.abspath(str(self._path))
+        cached = _READ_CACHE.get(path)
+        if cached is not None and cached[0] == stat_key(os.stat(path)):
+            return Version(cached[1])
+
+        if self._manifest is not None:
+            (key, version) = self._manifest.read()
+            version = Version(version)
+        else:
+            with open(path, mode='r') as fh:
+                # stat of opened file, to not cache new content with key of file replaced in the meantime
+                key = stat_key(os.fstat(fh.fileno()))
+                version = Version(fh.read().strip())
+
+        _READ_CACHE[path] = (key, version)
         return Version(version)
 
     def write(self, version):
-        """Save new version into self._path in safe way (using temporary file)
+        """Save new version into self._path (file is replaced atomically, see `replace_file`)
 
         :param version:Version
         """
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as fh:
-            fh.write(str(version))
-
-        if self._path.exists():
-            shutil.copystat(str(self._path), fh.name)
+        if self._manifest is not None:
+            key = self._manifest.write(str(version))
+        else:
+            key = replace_file(self._path, str(version).encode())
 
-        shutil.move(fh.name, self._path)
+        _READ_CACHE[os.path.abspath(str(self._path))] = (key, Version(version))
 
     def __str__(self):
         return str(self._path)
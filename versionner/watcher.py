@@ -0,0 +1,233 @@
+"""Watching files for changes
+Uses inotify on Linux, and falls back to polling files with stat on other systems.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from versionner import defaults
+
+# inotify constants, see: inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+IN_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _stat_signature(path):
+    """Return data identifying state of file: (inode, size, mtime) or None if file doesn't exist
+
+    :param path:str
+    :return:tuple|None
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class PollingWatcher:
+    """Watch files for changes by comparing results of stat"""
+
+    def __init__(self, paths, interval=defaults.DEFAULT_WATCH_INTERVAL):
+        """Initialisation
+
+        :param paths: list of paths to watch
+        :param interval:float: how often (in seconds) files are checked in Watcher.wait
+        """
+        self._interval = interval
+        self._signatures = {str(os.path.abspath(str(path))): None for path in paths}
+        for path in self._signatures:
+            self._signatures[path] = _stat_signature(path)
+
+    def changed(self):
+        """Return paths changed since last call, doesn't block
+
+        :return:set
+        """
+        changed = set()
+        for path, signature in self._signatures.items():
+            current = _stat_signature(path)
+            if current != signature:
+                self._signatures[path] = current
+                changed.add(path)
+
+        return changed
+
+    def wait(self, timeout=None):
+        """Wait until any path is changed, or timeout (in seconds) is reached
+
+        :param timeout:float|None
+        :return:set: changed paths (empty on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self.changed()
+            if changed:
+                return changed
+
+            if deadline is None:
+                time.sleep(self._interval)
+            else:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return changed
+                time.sleep(min(self._interval, left))
+
+    def close(self):
+        """Stop watching"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class InotifyWatcher:
+    """Watch files for changes using Linux inotify
+    Parent directories are watched, not files itself, because files are usually
+    replaced (saved to temporary file and moved), what breaks watches on files.
+    """
+
+    def __init__(self, paths, libc):
+        """Initialisation
+
+        :param paths: list of paths to watch
+        :param libc: ctypes handler for libc
+        :raise OSError:
+        """
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._paths = {str(os.path.abspath(str(path))) for path in paths}
+        self._dirs = {}
+        try:
+            for directory in {os.path.dirname(path) for path in self._paths}:
+                wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), IN_WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), "inotify_add_watch failed for %s" % directory)
+                self._dirs[wd] = directory
+        except OSError:
+            self.close()
+            raise
+
+    def fileno(self):
+        """Inotify file descriptor, for use with select
+
+        :return:int
+        """
+        return self._fd
+
+    def _read_events(self):
+        """Read all pending events, doesn't block
+
+        :return:set: changed paths
+        """
+        changed = set()
+        while self._fd >= 0:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(data):
+                (wd, _, _, length) = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if wd in self._dirs and name:
+                    path = os.path.join(self._dirs[wd], os.fsdecode(name))
+                    if path in self._paths:
+                        changed.add(path)
+
+        return changed
+
+    def changed(self):
+        """Return paths changed since last call, doesn't block
+
+        :return:set
+        """
+        return self._read_events()
+
+    def wait(self, timeout=None):
+        """Wait until any path is changed, or timeout (in seconds) is reached
+
+        :param timeout:float|None
+        :return:set: changed paths (empty on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            left = None if deadline is None else max(0, deadline - time.monotonic())
+            (ready, _, _) = select.select([self._fd], [], [], left)
+            changed = self._read_events() if ready else set()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        """Stop watching"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _load_libc():
+    """Load libc with inotify support
+
+    :return: ctypes handler or None if inotify is not available
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+
+    return libc
+
+
+def create(paths, interval=defaults.DEFAULT_WATCH_INTERVAL, polling=False):
+    """Create the best watcher available on current system
+
+    :param paths: list of paths to watch
+    :param interval:float: polling interval, used only by PollingWatcher
+    :param polling:bool: force using PollingWatcher
+    :return: InotifyWatcher|PollingWatcher
+    """
+    libc = None if polling else _load_libc()
+    if libc:
+        try:
+            return InotifyWatcher(paths, libc)
+        except OSError:
+            pass
+
+    return PollingWatcher(paths, interval)